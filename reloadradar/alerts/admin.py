@@ -0,0 +1,8 @@
+# Django Libraries
+from django.contrib import admin
+
+# App Modules
+from .models import Alert, AlertRule
+
+admin.site.register(AlertRule)
+admin.site.register(Alert)
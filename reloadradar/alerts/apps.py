@@ -0,0 +1,12 @@
+# Django Libraries
+from django.apps import AppConfig
+
+
+class AlertsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "alerts"
+
+    def ready(self):
+        # Connect the rule index cache invalidation signals
+        # App Modules
+        from . import engine  # noqa: F401
@@ -0,0 +1,238 @@
+# Standard Libraries
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from statistics import median
+
+# Django Libraries
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+# Project Modules
+from core.cache import bump_versions, version
+from core.models import Pricing, Propellant
+
+# App Modules
+from .models import Alert, AlertRule
+from .sinks import SINKS
+
+logger = logging.getLogger(__name__)
+
+
+class RuleIndex:
+    """Active rules keyed by what they watch, so a price only meets its own rules."""
+
+    def __init__(self):
+        self.by_product: dict[int, list[AlertRule]] = defaultdict(list)
+        self.by_manufacturer: dict[int, list[AlertRule]] = defaultdict(list)
+        self.unscoped: list[AlertRule] = []
+        for rule in AlertRule.objects.filter(active=True):
+            if rule.product_id:
+                self.by_product[rule.product_id].append(rule)
+            elif rule.manufacturer_id:
+                self.by_manufacturer[rule.manufacturer_id].append(rule)
+            else:
+                self.unscoped.append(rule)
+
+    def __bool__(self) -> bool:
+        return bool(self.by_product or self.by_manufacturer or self.unscoped)
+
+    def rules_for(self, product, supplier_id: int | None) -> list[AlertRule]:
+        rules = (
+            self.by_product.get(product.id, [])
+            + self.by_manufacturer.get(product.manufacturer_id, [])
+            + self.unscoped
+        )
+        return [rule for rule in rules if rule.supplier_id in (None, supplier_id)]
+
+
+RULES_VERSION_KEY = "alert-rules-version"
+
+# The index with the rules version it was built from, shared between processes
+_index: tuple[int, RuleIndex] | None = None
+
+
+def get_index() -> RuleIndex:
+    """The rule index, rebuilt when a rule changed in this or another process."""
+    global _index
+    rules_version = version(RULES_VERSION_KEY)
+    cached = _index
+    if cached is None or cached[0] != rules_version:
+        cached = _index = (rules_version, RuleIndex())
+    return cached[1]
+
+
+@receiver([post_save, post_delete], sender=AlertRule)
+def invalidate_index(**kwargs):
+    bump_versions(RULES_VERSION_KEY)
+
+
+def medians(pricings: list[Pricing], rules: Iterable[AlertRule]) -> dict:
+    """Median price per (product id, window) over the history before ``pricings``."""
+    windows = {rule.window for rule in rules if rule.condition == AlertRule.MEDIAN_DROP}
+    if not windows:
+        return {}
+
+    now = timezone.now()
+    history = (
+        Pricing.objects.filter(
+            content_type=ContentType.objects.get_for_model(Propellant),
+            object_id__in={pricing.object_id for pricing in pricings},
+            retrieved__gte=now - max(windows),
+        )
+        .exclude(id__in=[pricing.id for pricing in pricings])
+        .values_list("object_id", "price", "retrieved")
+    )
+    prices = defaultdict(list)
+    for product_id, price, retrieved in history:
+        for window in windows:
+            if retrieved >= now - window:
+                prices[product_id, window].append(price)
+    return {key: Decimal(median(values)) for key, values in prices.items()}
+
+
+def evaluate_prices(product_model, pricings: list[Pricing]) -> list[Alert]:
+    """Fire the rules watching the products of freshly recorded prices.
+
+    Only rules indexed under the touched products, their manufacturers or no
+    product at all are evaluated. A rule fires once per product, supplier and
+    price, and at most once per product within its cooldown.
+    """
+    index = get_index()
+    if product_model is not Propellant or not pricings or not index:
+        return []
+
+    candidates = [
+        (pricing, rule)
+        for pricing in pricings
+        for rule in index.rules_for(pricing.content_object, pricing.supplier_id)
+    ]
+    if not candidates:
+        return []
+
+    rules = {rule.id: rule for _, rule in candidates}
+    product_ids = {pricing.object_id for pricing, _ in candidates}
+    history = Alert.objects.filter(rule__in=rules, product__in=product_ids).values_list(
+        "rule", "product", "supplier", "price", "created"
+    )
+    sent = set()
+    last_sent = {}
+    for rule_id, product_id, supplier_id, price, created in history:
+        sent.add((rule_id, product_id, supplier_id, price))
+        key = (rule_id, product_id)
+        last_sent[key] = max(created, last_sent.get(key, created))
+
+    now = timezone.now()
+    window_medians = medians(pricings, rules.values())
+    alerts = []
+    for pricing, rule in candidates:
+        product_id = pricing.object_id
+        if (rule.id, product_id, pricing.supplier_id, pricing.price) in sent:
+            continue
+        if (rule.id, product_id) in last_sent and (
+            now - last_sent[rule.id, product_id] < rule.cooldown
+        ):
+            continue
+
+        median_price = window_medians.get((product_id, rule.window))
+        if not rule.matches(pricing.price, median_price):
+            continue
+
+        alerts.append(
+            Alert(
+                rule=rule,
+                product=pricing.content_object,
+                supplier_id=pricing.supplier_id,
+                pricing=pricing,
+                price=pricing.price,
+                reference=rule.reference(median_price),
+            )
+        )
+        sent.add((rule.id, product_id, pricing.supplier_id, pricing.price))
+        last_sent[rule.id, product_id] = now
+
+    alerts = save_alerts(alerts)
+    deliver(alerts)
+    return alerts
+
+
+def save_alerts(alerts: list[Alert]) -> list[Alert]:
+    """Insert ``alerts``, leaving out any another worker raised for the same price.
+
+    Only the inserted alerts are returned, so each alert is delivered once.
+    """
+    try:
+        with transaction.atomic():
+            return Alert.objects.bulk_create(alerts)
+    except IntegrityError:
+        pass
+
+    saved = []
+    for alert in alerts:
+        try:
+            with transaction.atomic():
+                alert.save(force_insert=True)
+        except IntegrityError:
+            continue
+        saved.append(alert)
+    return saved
+
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def delivery_pool() -> ThreadPoolExecutor | None:
+    """The shared threads delivering alerts, or None to deliver them right away."""
+    global _pool
+    if not settings.ALERT_DELIVERY_WORKERS:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.ALERT_DELIVERY_WORKERS,
+                thread_name_prefix="alerts",
+            )
+    return _pool
+
+
+def deliver(alerts: list[Alert]):
+    """Send ``alerts`` through their sinks, off the calling thread if there is a pool.
+
+    Background deliveries start once the alerts are committed, so a slow sink
+    never holds up the scrape that raised them.
+    """
+    if not alerts:
+        return
+    pool = delivery_pool()
+    if pool is None:
+        send(alerts)
+    else:
+        transaction.on_commit(lambda: pool.submit(send_in_background, alerts))
+
+
+def send(alerts: list[Alert]):
+    for alert in alerts:
+        try:
+            SINKS[alert.rule.sink]().send(alert)
+        except Exception as e:
+            alert.error = repr(e)
+        else:
+            alert.delivered = True
+    Alert.objects.bulk_update(alerts, ["delivered", "error"])
+
+
+def send_in_background(alerts: list[Alert]):
+    try:
+        send(alerts)
+    except Exception:
+        logger.exception("Delivering %d alerts failed", len(alerts))
+    finally:
+        close_old_connections()
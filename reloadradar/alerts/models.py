@@ -0,0 +1,128 @@
+# Standard Libraries
+from datetime import timedelta
+from decimal import Decimal
+
+# Django Libraries
+from django.db import models
+
+# Project Modules
+from core.models import Manufacturer, Pricing, Propellant, Supplier
+
+# App Modules
+from .sinks import SINKS
+
+
+class AlertRule(models.Model):
+    """Watch on the prices of one product, a manufacturer's products or all of them.
+
+    ``supplier`` narrows any of those to the prices of a single supplier.
+    """
+
+    BELOW = "below"
+    MEDIAN_DROP = "median_drop"
+    CONDITIONS = [
+        (BELOW, "Price below threshold"),
+        (MEDIAN_DROP, "Percent below the median price over the window"),
+    ]
+
+    name = models.CharField(max_length=128)
+    product = models.ForeignKey(
+        Propellant,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="alert_rules",
+    )
+    manufacturer = models.ForeignKey(
+        Manufacturer,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="alert_rules",
+    )
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="alert_rules",
+    )
+
+    condition = models.CharField(max_length=16, choices=CONDITIONS, default=BELOW)
+    # A price for BELOW, a percentage for MEDIAN_DROP
+    threshold = models.DecimalField(decimal_places=3, max_digits=8)
+    window = models.DurationField(default=timedelta(days=30))
+
+    sink = models.CharField(
+        max_length=16, choices=[(name, name) for name in SINKS], default="log"
+    )
+    # Email address or webhook URL, depending on the sink
+    target = models.CharField(max_length=256, blank=True)
+    # Minimum time between two alerts of this rule for the same product
+    cooldown = models.DurationField(default=timedelta(days=1))
+    active = models.BooleanField(default=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def reference(self, median: Decimal | None) -> Decimal | None:
+        """The price at or below which the rule fires."""
+        if self.condition == self.BELOW:
+            return self.threshold
+        if median is None:
+            return None
+        return median * (1 - self.threshold / 100)
+
+    def matches(self, price: Decimal, median: Decimal | None) -> bool:
+        reference = self.reference(median)
+        return reference is not None and price <= reference
+
+
+class Alert(models.Model):
+    """A fired rule, kept to deduplicate and rate limit later alerts."""
+
+    rule = models.ForeignKey(AlertRule, on_delete=models.CASCADE, related_name="alerts")
+    product = models.ForeignKey(
+        Propellant, on_delete=models.CASCADE, related_name="alerts"
+    )
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, null=True, related_name="alerts"
+    )
+    pricing = models.ForeignKey(Pricing, on_delete=models.SET_NULL, null=True)
+    price = models.DecimalField(decimal_places=3, max_digits=8)
+    reference = models.DecimalField(decimal_places=3, max_digits=8)
+    created = models.DateTimeField(auto_now_add=True)
+
+    delivered = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rule", "product", "supplier", "price"], name="alert_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["rule", "product", "created"]),
+        ]
+
+    def __str__(self) -> str:
+        return self.message
+
+    @property
+    def message(self) -> str:
+        return (
+            f"{self.product} at {self.supplier} is {self.price}, "
+            f"at or below {self.reference:.3f} ({self.rule})"
+        )
+
+    def payload(self) -> dict:
+        return {
+            "rule": self.rule.name,
+            "product": self.product_id,
+            "name": self.product.name,
+            "supplier": self.supplier_id,
+            "price": str(self.price),
+            "reference": str(self.reference),
+            "url": self.pricing.price_url if self.pricing else None,
+        }
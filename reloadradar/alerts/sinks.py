@@ -0,0 +1,61 @@
+# Standard Libraries
+import logging
+from typing import ClassVar
+
+# Third Party Libraries
+import requests
+
+# Django Libraries
+from django.conf import settings
+from django.core.mail import send_mail
+
+logger = logging.getLogger(__name__)
+
+
+class Sink:
+    """Delivers an alert somewhere, raising when delivery fails."""
+
+    def send(self, alert):
+        raise NotImplementedError
+
+
+class LogSink(Sink):
+    def send(self, alert):
+        logger.warning(alert.message)
+
+
+class EmailSink(Sink):
+    def send(self, alert):
+        send_mail(
+            f"Price alert: {alert.rule}",
+            alert.message,
+            None,
+            [alert.rule.target],
+        )
+
+
+class WebhookSink(Sink):
+    def send(self, alert):
+        response = requests.post(
+            alert.rule.target,
+            json=alert.payload(),
+            timeout=settings.ALERT_WEBHOOK_TIMEOUT,
+        )
+        response.raise_for_status()
+
+
+class LocalSink(Sink):
+    """Keeps alerts in memory, for tests and trying out rules."""
+
+    outbox: ClassVar[list] = []
+
+    def send(self, alert):
+        self.outbox.append(alert)
+
+
+SINKS = {
+    "log": LogSink,
+    "email": EmailSink,
+    "webhook": WebhookSink,
+    "local": LocalSink,
+}
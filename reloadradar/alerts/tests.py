@@ -0,0 +1,141 @@
+# Standard Libraries
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+# Django Libraries
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+# Project Modules
+from core.cache import bump_versions
+from core.models import Manufacturer, Pricing, Propellant, Supplier
+from scraper.ingest import ingest_prices
+
+# App Modules
+from .engine import RULES_VERSION_KEY, evaluate_prices
+from .models import Alert, AlertRule
+from .sinks import SINKS, LocalSink
+
+
+@override_settings(ALERT_DELIVERY_WORKERS=0)
+class AlertEngineTests(TestCase):
+    def setUp(self):
+        LocalSink.outbox.clear()
+        manufacturer = Manufacturer.objects.create(name="Hodgdon")
+        self.supplier = Supplier.objects.create(name="Zimbi")
+        self.h4350 = Propellant.objects.create(name="H4350", manufacturer=manufacturer)
+        self.varget = Propellant.objects.create(
+            name="Varget", manufacturer=manufacturer
+        )
+        self.products = {"H4350": self.h4350, "Varget": self.varget}
+
+    def ingest(self, **prices):
+        items = [
+            {"name": name, "price": price, "url": f"https://example.com/{name}"}
+            for name, price in prices.items()
+        ]
+        result = ingest_prices(Propellant, self.supplier, items, self.products.get)
+        return evaluate_prices(Propellant, result.new_prices)
+
+    def test_threshold_deduplicated(self):
+        AlertRule.objects.create(
+            name="Cheap H4350", product=self.h4350, threshold=40, sink="local"
+        )
+        self.assertEqual(len(self.ingest(H4350=39, Varget=10)), 1)
+        self.assertEqual(len(LocalSink.outbox), 1)
+        self.assertTrue(Alert.objects.get().delivered)
+
+        # A new low within the cooldown is rate limited
+        self.assertEqual(self.ingest(H4350=38), [])
+
+        # After the cooldown, back up and down to the same price is the same alert
+        Alert.objects.update(created=timezone.now() - timedelta(days=2))
+        self.ingest(H4350=45)
+        self.assertEqual(self.ingest(H4350=39), [])
+        self.assertEqual(len(LocalSink.outbox), 1)
+
+    def test_median_drop(self):
+        AlertRule.objects.create(
+            name="Hodgdon sale",
+            manufacturer=self.h4350.manufacturer,
+            condition=AlertRule.MEDIAN_DROP,
+            threshold=10,
+            sink="local",
+        )
+        for price in (50, 52, 48):
+            self.ingest(Varget=price)
+        Pricing.objects.update(retrieved=timezone.now() - timedelta(days=1))
+
+        alerts = self.ingest(Varget=44)
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0].reference, Decimal("45"))
+
+    def test_rule_added_in_another_process(self):
+        self.assertEqual(self.ingest(H4350=39), [])
+        # Sends no signal here, as if written by another process
+        AlertRule.objects.bulk_create(
+            [AlertRule(name="Cheap H4350", product=self.h4350, threshold=40)]
+        )
+        self.assertEqual(self.ingest(H4350=38), [])
+
+        # That process bumps the shared version, this one only reads it
+        bump_versions(RULES_VERSION_KEY)
+        self.assertEqual(len(self.ingest(H4350=37)), 1)
+
+    def test_alert_raised_concurrently(self):
+        rule = AlertRule.objects.create(name="Cheap", threshold=40, sink="local")
+
+        def other_worker(pricings, rules):
+            # Another worker raises the same alert after this one read the history
+            Alert.objects.create(
+                rule=rule,
+                product=self.h4350,
+                supplier=self.supplier,
+                price=39,
+                reference=40,
+            )
+            return {}
+
+        with mock.patch("alerts.engine.medians", side_effect=other_worker):
+            alerts = self.ingest(H4350=39, Varget=30)
+        self.assertEqual([alert.product for alert in alerts], [self.varget])
+        self.assertEqual(Alert.objects.count(), 2)
+        self.assertEqual(len(LocalSink.outbox), 1)
+
+
+class BlockingSink(LocalSink):
+    release = threading.Event()
+
+    def send(self, alert):
+        self.release.wait(5)
+        super().send(alert)
+
+
+@override_settings(ALERT_DELIVERY_WORKERS=1)
+class AlertDeliveryTests(TransactionTestCase):
+    def test_delivered_in_background(self):
+        LocalSink.outbox.clear()
+        SINKS["blocking"] = BlockingSink
+        self.addCleanup(SINKS.pop, "blocking")
+        manufacturer = Manufacturer.objects.create(name="Hodgdon")
+        supplier = Supplier.objects.create(name="Zimbi")
+        h4350 = Propellant.objects.create(name="H4350", manufacturer=manufacturer)
+        AlertRule.objects.create(
+            name="Cheap H4350", product=h4350, threshold=40, sink="blocking"
+        )
+
+        item = {"name": "H4350", "price": 39, "url": "https://example.com"}
+        result = ingest_prices(Propellant, supplier, [item], {"H4350": h4350}.get)
+        self.assertEqual(len(evaluate_prices(Propellant, result.new_prices)), 1)
+        # The sink is still waiting, the scrape has already moved on
+        self.assertEqual(LocalSink.outbox, [])
+
+        BlockingSink.release.set()
+        deadline = time.monotonic() + 5
+        while not Alert.objects.filter(delivered=True).exists():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(len(LocalSink.outbox), 1)
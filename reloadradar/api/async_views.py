@@ -0,0 +1,295 @@
+"""Async versions of the read-heavy price endpoints, for serving under ASGI.
+
+They query through Django's async ORM interface and return the same JSON as
+their DRF counterparts, which cannot run as coroutines. The price change
+stream is refused with 501 outside ASGI, a WSGI worker would be held for its
+length.
+"""
+# Standard Libraries
+import asyncio
+import json
+import logging
+import time
+import weakref
+from functools import wraps
+
+# Third Party Libraries
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+# Django Libraries
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.db.models import F
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+
+# Project Modules
+from core.cache import cache_by_version
+from core.models import LatestPrice, PriceChange, Propellant, Supplier
+
+# App Modules
+from .views import PriceHistoryQuerySerializer, history_queries, history_series
+
+logger = logging.getLogger(__name__)
+
+
+class PriceRowSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    name = serializers.CharField()
+    supplier = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=8, decimal_places=3)
+    unit_price = serializers.DecimalField(
+        max_digits=12, decimal_places=5, allow_null=True
+    )
+    last_seen = serializers.DateTimeField()
+
+
+class SupplierPriceRowSerializer(PriceRowSerializer):
+    supplier = None
+    url = serializers.URLField()
+
+
+class PriceStreamQuerySerializer(serializers.Serializer):
+    product = serializers.ListField(child=serializers.IntegerField(), required=False)
+    manufacturer = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+    # For clients that cannot send a Last-Event-ID header
+    last_event_id = serializers.IntegerField(min_value=0, required=False)
+
+
+def json_response(data, status: int = 200) -> HttpResponse:
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+def require_safe(view):
+    # Django's own decorator only learns to wrap coroutines in 5.0
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        return await view(request, *args, **kwargs)
+
+    return wrapped
+
+
+async def get_content_type(model) -> ContentType:
+    # Cached in memory after the first lookup, which is a query
+    return await sync_to_async(ContentType.objects.get_for_model)(model)
+
+
+@require_safe
+@cache_by_version
+async def cheapest_prices(request):
+    """The cheapest current offer per propellant, by price per unit weight."""
+    rows = (
+        LatestPrice.objects.filter(content_type=await get_content_type(Propellant))
+        .cheapest_per_product()
+        .values(
+            "supplier",
+            "price",
+            "unit_price",
+            "last_seen",
+            product=F("object_id"),
+            name=F("propellant__name"),
+        )
+    )
+    return json_response(
+        PriceRowSerializer([row async for row in rows], many=True).data
+    )
+
+
+@require_safe
+@cache_by_version
+async def supplier_prices(request, pk: int):
+    """Current prices of every propellant a supplier lists, cheapest per gram first."""
+    if not await Supplier.objects.filter(pk=pk).aexists():
+        raise Http404("No such supplier.")
+
+    rows = (
+        LatestPrice.objects.filter(
+            supplier_id=pk, content_type=await get_content_type(Propellant)
+        )
+        .order_by("unit_price", "id")
+        .values(
+            "price",
+            "unit_price",
+            "last_seen",
+            product=F("object_id"),
+            name=F("propellant__name"),
+            url=F("pricing__price_url"),
+        )
+    )
+    return json_response(
+        SupplierPriceRowSerializer([row async for row in rows], many=True).data
+    )
+
+
+@require_safe
+@cache_by_version
+async def price_history(request, pk: int):
+    """Price series of one propellant, like ``/api/propellants/<pk>/history/``."""
+    query = PriceHistoryQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return json_response(query.errors, status=400)
+    try:
+        propellant = await Propellant.objects.aget(pk=pk)
+    except Propellant.DoesNotExist:
+        raise Http404("No such propellant.") from None
+
+    buckets, last_prices, summaries = history_queries(
+        [propellant], query.validated_data, await get_content_type(Propellant)
+    )
+    series = history_series(
+        [propellant],
+        query.validated_data,
+        [row async for row in buckets],
+        {pricing_id: price async for pricing_id, price in last_prices},
+        [row async for row in summaries],
+    )
+    return json_response(series[0])
+
+
+class PriceChangeFeed:
+    """Polls for new price changes and fans them out to every open stream.
+
+    There is one per event loop, so an ASGI worker process runs a single
+    query per ``PRICE_STREAM_POLL`` however many clients are connected, and
+    none while nobody is.
+    """
+
+    def __init__(self):
+        self.subscribers: set[asyncio.Queue] = set()
+        self.last_id = 0
+        self.lock = asyncio.Lock()
+        self.poller: asyncio.Task | None = None
+
+    async def subscribe(self) -> tuple[asyncio.Queue, int]:
+        """A queue of the changes polled from now on, and the last id polled before."""
+        async with self.lock:
+            if self.poller is None:
+                latest = PriceChange.objects.order_by("-id").values_list(
+                    "id", flat=True
+                )
+                self.last_id = await latest.afirst() or 0
+                self.poller = asyncio.create_task(self.poll())
+            queue = asyncio.Queue()
+            self.subscribers.add(queue)
+            return queue, self.last_id
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self.poller is not None:
+            self.poller.cancel()
+            self.poller = None
+
+    async def poll(self):
+        while True:
+            await asyncio.sleep(settings.PRICE_STREAM_POLL)
+            changes = PriceChange.objects.stream(self.last_id)[:500]
+            try:
+                async for change in changes:
+                    self.last_id = change.id
+                    for queue in self.subscribers:
+                        queue.put_nowait(change)
+            except DatabaseError:
+                # Streams stay open on keep-alives until the next poll succeeds
+                logger.exception("Could not poll for price changes")
+
+
+_feeds: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def price_change_feed() -> PriceChangeFeed:
+    loop = asyncio.get_running_loop()
+    if loop not in _feeds:
+        _feeds[loop] = PriceChangeFeed()
+    return _feeds[loop]
+
+
+def price_event(change: PriceChange) -> str:
+    data = json.dumps(change.event(), cls=DjangoJSONEncoder)
+    return f"id: {change.id}\nevent: price\ndata: {data}\n\n"
+
+
+async def price_change_events(after: int, products, manufacturers):
+    """Server-sent events of the price changes after event id ``after``.
+
+    Changes up to the feed's position when the stream opens are read once, the
+    ones after it arrive from the feed.
+    """
+    yield f"retry: {int(settings.PRICE_STREAM_POLL * 1000)}\n\n"
+    closing = time.monotonic() + settings.PRICE_STREAM_SECONDS
+    feed = price_change_feed()
+    queue, polled = await feed.subscribe()
+    try:
+        missed = PriceChange.objects.stream(after, products, manufacturers)
+        async for change in missed.filter(id__lte=polled).aiterator():
+            after = change.id
+            yield price_event(change)
+
+        while (remaining := closing - time.monotonic()) > 0:
+            try:
+                change = await asyncio.wait_for(
+                    queue.get(), min(remaining, settings.PRICE_STREAM_KEEPALIVE)
+                )
+            except asyncio.TimeoutError:
+                if time.monotonic() < closing:
+                    yield ": keep-alive\n\n"
+                continue
+            if change.id > after and change.matches(products, manufacturers):
+                after = change.id
+                yield price_event(change)
+    finally:
+        feed.unsubscribe(queue)
+
+
+@require_safe
+async def price_change_stream(request):
+    """Live price changes, filtered by ``product`` and ``manufacturer`` ids.
+
+    Without a Last-Event-ID only changes from now on are sent. The stream
+    closes after ``PRICE_STREAM_SECONDS``; browsers reconnect on their own and
+    resume from the last event they saw.
+    """
+    if not isinstance(request, ASGIRequest):
+        return json_response(
+            {"detail": "The price change stream is only served under ASGI."},
+            status=501,
+        )
+    query = PriceStreamQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return json_response(query.errors, status=400)
+
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    if last_event_id.isdigit():
+        after = int(last_event_id)
+    elif "last_event_id" in query.validated_data:
+        after = query.validated_data["last_event_id"]
+    else:
+        latest = PriceChange.objects.order_by("-id").values_list("id", flat=True)
+        after = await latest.afirst() or 0
+
+    response = StreamingHttpResponse(
+        price_change_events(
+            after,
+            query.validated_data.get("product"),
+            query.validated_data.get("manufacturer"),
+        ),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keep proxies such as nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
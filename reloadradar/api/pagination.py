@@ -0,0 +1,15 @@
+# Third Party Libraries
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Stable cursor pagination for models without a creation timestamp."""
+
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class UnitPriceCursorPagination(IdCursorPagination):
+    ordering = ("unit_price", "id")
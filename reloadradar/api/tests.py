@@ -0,0 +1,353 @@
+# Standard Libraries
+import asyncio
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+# Third Party Libraries
+from asgiref.sync import sync_to_async
+from rest_framework.test import APITestCase
+
+# Django Libraries
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone as django_timezone
+
+# Project Modules
+from core.cache import CATALOGUE_VERSION_KEY, bump_versions
+from core.models import (
+    DailyPrice,
+    LatestPrice,
+    Link,
+    Manufacturer,
+    Pricing,
+    Propellant,
+    Supplier,
+)
+from core.tests import LOCMEM_CACHE
+from scraper.ingest import ingest_prices
+from scraper.search import get_index
+
+# App Modules
+from .async_views import PriceChangeFeed
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryBudgetTests(APITestCase):
+    """List endpoints must run a fixed number of queries regardless of row count."""
+
+    def create_catalogue(self, size: int):
+        offset = Propellant.objects.count()
+        manufacturer = Manufacturer.objects.create(name=f"Manufacturer {offset}")
+        for i in range(offset, offset + size):
+            supplier = Supplier.objects.create(name=f"Supplier {i}")
+            Link.objects.create(
+                link_type="propellant",
+                link_url=f"https://example.com/{i}",
+                content_object=supplier,
+            )
+            propellant = Propellant.objects.create(
+                name=f"Powder {i}", manufacturer=manufacturer
+            )
+            for price in (100, 110):
+                pricing = Pricing.objects.create(
+                    content_object=propellant,
+                    price=Decimal(price + i),
+                    supplier=supplier,
+                    price_url=f"https://example.com/{i}/{price}",
+                )
+            LatestPrice.objects.record([pricing], seen=pricing.retrieved)
+
+    def assertConstantQueries(self, url: str, budget: int):
+        for size in (2, 20):
+            self.create_catalogue(size)
+            with self.assertNumQueries(budget):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data["results"])
+
+    def test_propellants(self):
+        self.assertConstantQueries("/api/propellants/", 2)
+
+    def test_suppliers(self):
+        self.assertConstantQueries("/api/suppliers/", 2)
+
+    def test_manufacturers(self):
+        self.assertConstantQueries("/api/manufacturers/", 1)
+
+    def test_latest_prices(self):
+        self.assertConstantQueries("/api/latest-prices/", 2)
+
+    def test_cursor_pagination(self):
+        self.create_catalogue(3)
+        response = self.client.get("/api/propellants/", {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PriceHistoryTests(APITestCase):
+    def setUp(self):
+        manufacturer = Manufacturer.objects.create(name="Hodgdon")
+        self.supplier = Supplier.objects.create(name="Zimbi")
+        self.other_supplier = Supplier.objects.create(name="Safari Outdoor")
+        self.propellant = Propellant.objects.create(
+            name="H4350", weight=500, manufacturer=manufacturer
+        )
+
+        for supplier, day, hour, price in [
+            (self.supplier, 1, 8, 1000),
+            (self.supplier, 1, 12, 900),
+            (self.supplier, 1, 16, 950),
+            (self.supplier, 2, 8, 1100),
+            (self.other_supplier, 1, 8, 800),
+        ]:
+            pricing = Pricing.objects.create(
+                content_object=self.propellant,
+                price=price,
+                supplier=supplier,
+                price_url="https://example.com",
+            )
+            Pricing.objects.filter(id=pricing.id).update(
+                retrieved=datetime(2023, 10, day, hour, tzinfo=timezone.utc)
+            )
+
+    def test_daily_buckets(self):
+        response = self.client.get(
+            f"/api/propellants/{self.propellant.id}/history/",
+            {"supplier": self.supplier.id},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        first, second = response.data["series"]
+        self.assertEqual(
+            (first["min"], first["max"], first["last"], first["unit_price"]),
+            ("900.000", "1000.000", "950.000", "1.90000"),
+        )
+        self.assertEqual(second["last"], "1100.000")
+
+    def test_compacted_history(self):
+        for day, low, high in [
+            (date(2023, 9, 30), 700, 750),
+            (date(2023, 10, 1), 850, 1200),
+        ]:
+            DailyPrice.objects.create(
+                content_object=self.propellant,
+                supplier=self.supplier,
+                day=day,
+                open=high,
+                low=low,
+                high=high,
+                close=low,
+                samples=2,
+            )
+
+        response = self.client.get(
+            f"/api/propellants/{self.propellant.id}/history/",
+            {"supplier": self.supplier.id},
+        )
+        compacted, merged, _ = response.data["series"]
+        self.assertEqual(compacted["last"], "700.000")
+        self.assertEqual(
+            (merged["min"], merged["max"], merged["last"]),
+            ("850.000", "1200.000", "950.000"),
+        )
+
+    def test_bulk_history(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                "/api/propellants/history/",
+                {"product": [self.propellant.id], "bucket": "week"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data[0]["series"]), 3)
+
+    async def test_async_endpoints_match_sync(self):
+        await sync_to_async(LatestPrice.objects.rebuild)()
+        for sync_path, async_path in [
+            (
+                f"/api/propellants/{self.propellant.id}/history/?bucket=week",
+                f"/api/async/propellants/{self.propellant.id}/history/?bucket=week",
+            ),
+            ("/api/latest-prices/cheapest/", "/api/async/latest-prices/cheapest/"),
+        ]:
+            expected = await sync_to_async(self.client.get)(sync_path)
+            response = await self.async_client.get(async_path)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), expected.json())
+
+        response = await self.async_client.get(
+            f"/api/async/suppliers/{self.supplier.id}/prices/"
+        )
+        self.assertEqual(
+            [(row["name"], row["price"]) for row in response.json()],
+            [("H4350", "1100.000")],
+        )
+        # Revalidation is answered from the data version alone
+        response = await self.async_client.get(
+            f"/api/async/suppliers/{self.supplier.id}/prices/",
+            headers={"If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_async_endpoints_for_logged_in_users(self):
+        user = await User.objects.acreate(username="reloader")
+        await sync_to_async(self.async_client.force_login)(user)
+        path = f"/api/async/suppliers/{self.supplier.id}/prices/"
+        response = await self.async_client.get(path)
+        self.assertEqual(response.status_code, 200)
+
+        # Cached per user, an anonymous client gets its own response and ETag
+        anonymous = await self.async_client_class().get(path)
+        self.assertEqual(anonymous.json(), response.json())
+        self.assertNotEqual(anonymous["ETag"], response["ETag"])
+        response = await self.async_client.get(
+            path, headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_history_without_weight(self):
+        Propellant.objects.filter(id=self.propellant.id).update(weight=0)
+        response = self.client.get(f"/api/propellants/{self.propellant.id}/history/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data["series"][0]["unit_price"])
+
+    def test_invalid_bucket(self):
+        response = self.client.get(
+            f"/api/propellants/{self.propellant.id}/history/", {"bucket": "year"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchTests(APITestCase):
+    def setUp(self):
+        alliant = Manufacturer.objects.create(name="Alliant")
+        hodgdon = Manufacturer.objects.create(name="Hodgdon")
+        for name in ("Reloder 15", "Reloder 16", "Reloder 23"):
+            Propellant.objects.create(name=name, manufacturer=alliant)
+        self.h4350 = Propellant.objects.create(name="H4350", manufacturer=hodgdon)
+        Propellant.objects.create(name="H4895", manufacturer=hodgdon)
+
+        for price in (900, 850):
+            pricing = Pricing.objects.create(
+                content_object=self.h4350,
+                price=price,
+                supplier=Supplier.objects.create(name=f"Supplier {price}"),
+                price_url="https://example.com",
+            )
+            LatestPrice.objects.record([pricing], django_timezone.now())
+
+    def search(self, q: str) -> list[dict]:
+        response = self.client.get("/api/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_aliases_and_sizes(self):
+        self.assertEqual(self.search("rl 16")[0]["name"], "Reloder 16")
+        self.assertEqual(self.search("ALLIANT RL-23 1lb")[0]["name"], "Reloder 23")
+
+    def test_fuzzy_match_with_cheapest_price(self):
+        results = self.search("h 4350")
+        self.assertEqual([result["id"] for result in results], [self.h4350.id])
+        self.assertEqual(results[0]["cheapest"]["price"], "850.000")
+        self.assertIsNone(self.search("reloder")[0]["cheapest"])
+
+    def test_missing_query(self):
+        self.assertEqual(self.client.get("/api/search/").status_code, 400)
+
+    def test_catalogue_changed_in_another_process(self):
+        index = get_index(Propellant)
+        # Sends no signal here, as if imported by another process
+        Propellant.objects.bulk_create(
+            [Propellant(name="Varget", manufacturer=self.h4350.manufacturer)]
+        )
+        self.assertIs(get_index(Propellant), index)
+
+        # That process bumps the shared version, this one only reads it
+        bump_versions(CATALOGUE_VERSION_KEY)
+        results = get_index(Propellant).search("varget")
+        self.assertEqual(results[0].product.name, "Varget")
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PRICE_STREAM_SECONDS=0)
+class PriceChangeStreamTests(APITestCase):
+    def setUp(self):
+        supplier = self.supplier = Supplier.objects.create(name="Zimbi")
+        self.products = {}
+        for manufacturer, name in [("Hodgdon", "H4350"), ("Alliant", "Reloder 16")]:
+            self.products[name] = Propellant.objects.create(
+                name=name, manufacturer=Manufacturer.objects.create(name=manufacturer)
+            )
+        for prices in ([900, 500], [850, 500], [800, 550]):
+            items = [
+                {"name": name, "price": price, "url": "https://example.com"}
+                for name, price in zip(self.products, prices)
+            ]
+            ingest_prices(Propellant, supplier, items, self.products.get)
+
+    async def events(self, **params) -> list[dict]:
+        headers = params.pop("headers", {})
+        response = await self.async_client.get(
+            "/api/async/price-changes/", params, headers=headers
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = b"".join([chunk async for chunk in response.streaming_content])
+        return [
+            {
+                "id": int(event.split("\n")[0].removeprefix("id: ")),
+                **json.loads(event.split("data: ")[1]),
+            }
+            for event in stream.decode().split("\n\n")
+            if event.startswith("id: ")
+        ]
+
+    async def test_filter_and_resume(self):
+        events = await self.events(last_event_id=0)
+        self.assertEqual(
+            [(event["old"], event["new"]) for event in events],
+            [
+                (None, "900.000"),
+                (None, "500.000"),
+                ("900.000", "850.000"),
+                ("850.000", "800.000"),
+                ("500.000", "550.000"),
+            ],
+        )
+
+        hodgdon = self.products["H4350"].manufacturer_id
+        resumed = await self.events(
+            manufacturer=hodgdon, headers={"Last-Event-ID": str(events[2]["id"])}
+        )
+        self.assertEqual([event["new"] for event in resumed], ["800.000"])
+        # Without a cursor only changes from now on are sent
+        self.assertEqual(await self.events(), [])
+
+    @override_settings(PRICE_STREAM_POLL=0.01)
+    async def test_streams_share_one_poller(self):
+        feed = PriceChangeFeed()
+        first, polled = await feed.subscribe()
+        second, _ = await feed.subscribe()
+        poller = feed.poller
+
+        item = {"name": "H4350", "price": 700, "url": "https://example.com"}
+        await sync_to_async(ingest_prices)(
+            Propellant, self.supplier, [item], self.products.get
+        )
+        for queue in (first, second):
+            change = await asyncio.wait_for(queue.get(), timeout=5)
+            self.assertGreater(change.id, polled)
+            self.assertEqual(change.new_price, Decimal("700.000"))
+        self.assertIs(feed.poller, poller)
+
+        feed.unsubscribe(first)
+        self.assertIs(feed.poller, poller)
+        feed.unsubscribe(second)
+        self.assertIsNone(feed.poller)
+
+    def test_only_served_under_asgi(self):
+        response = self.client.get("/api/async/price-changes/")
+        self.assertEqual(response.status_code, 501)
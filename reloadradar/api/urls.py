@@ -5,18 +5,50 @@ from rest_framework import routers
 from django.urls import include, path
 
 # App Modules
-from .views import ManufacturerViewSet, PropellantViewSet, SupplierViewSet
+from . import async_views
+from .views import (
+    LatestPriceViewSet,
+    ManufacturerViewSet,
+    PriceAnalyticsView,
+    PropellantViewSet,
+    SearchView,
+    SupplierViewSet,
+)
 
 # Routers provide an easy way of automatically determining the URL conf.
 router = routers.DefaultRouter()
 router.register(r"suppliers", SupplierViewSet)
 router.register(r"manufacturers", ManufacturerViewSet)
 router.register(r"propellants", PropellantViewSet)
+router.register(r"latest-prices", LatestPriceViewSet)
 
 
 # Wire up our API using automatic URL routing.
 # Additionally, we include login URLs for the browsable API.
 urlpatterns = [
     path("", include(router.urls)),
+    path("analytics/", PriceAnalyticsView.as_view(), name="analytics"),
+    path("search/", SearchView.as_view(), name="search"),
+    # Async variants of the hot read paths, for serving under ASGI
+    path(
+        "async/latest-prices/cheapest/",
+        async_views.cheapest_prices,
+        name="async-cheapest-prices",
+    ),
+    path(
+        "async/suppliers/<int:pk>/prices/",
+        async_views.supplier_prices,
+        name="async-supplier-prices",
+    ),
+    path(
+        "async/propellants/<int:pk>/history/",
+        async_views.price_history,
+        name="async-price-history",
+    ),
+    path(
+        "async/price-changes/",
+        async_views.price_change_stream,
+        name="async-price-changes",
+    ),
     path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
 ]
@@ -1,8 +1,35 @@
 # Third Party Libraries
 from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Django Libraries
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+
+# Data Science Libraries
+import pandas as pd
 
 # Project Modules
-from core.models import Link, Manufacturer, Pricing, Propellant, Supplier
+from core import analytics
+from core.cache import cache_by_version
+from core.models import (
+    DailyPrice,
+    DailyPriceQuerySet,
+    LatestPrice,
+    Link,
+    Manufacturer,
+    Pricing,
+    PricingQuerySet,
+    Propellant,
+    Supplier,
+)
+from scraper.search import get_index
+
+# App Modules
+from .pagination import UnitPriceCursorPagination
 
 
 class LinkSerializer(serializers.ModelSerializer):
@@ -31,6 +58,15 @@ class PricingSerializer(serializers.ModelSerializer):
         fields = ["id", "price", "retrieved", "supplier"]
 
 
+class LatestPriceSerializer(serializers.ModelSerializer):
+    product = serializers.IntegerField(source="object_id")
+    name = serializers.CharField(source="content_object.name")
+
+    class Meta:
+        model = LatestPrice
+        fields = ["product", "name", "supplier", "price", "unit_price", "last_seen"]
+
+
 class PropellantSerializer(serializers.ModelSerializer):
     prices = PricingSerializer(many=True, read_only=True)
 
@@ -39,16 +75,242 @@ class PropellantSerializer(serializers.ModelSerializer):
         fields = ["url", "id", "name", "weight", "manufacturer", "prices"]
 
 
+@method_decorator(cache_by_version, name="dispatch")
 class SupplierViewSet(viewsets.ModelViewSet):
-    queryset = Supplier.objects.all()
+    queryset = Supplier.objects.prefetch_related("urls")
     serializer_class = SupplierSerializer
 
 
+@method_decorator(cache_by_version, name="dispatch")
 class ManufacturerViewSet(viewsets.ModelViewSet):
     queryset = Manufacturer.objects.all()
     serializer_class = ManufacturerSerializer
 
 
+class PriceHistoryQuerySerializer(serializers.Serializer):
+    bucket = serializers.ChoiceField(
+        choices=list(PricingQuerySet.BUCKETS), default="day"
+    )
+    supplier = serializers.IntegerField(required=False)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+
+class BulkPriceHistoryQuerySerializer(PriceHistoryQuerySerializer):
+    product = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=100
+    )
+
+
+class PriceBucketSerializer(serializers.Serializer):
+    supplier = serializers.IntegerField()
+    bucket = serializers.DateTimeField()
+    min = serializers.DecimalField(max_digits=8, decimal_places=3)
+    max = serializers.DecimalField(max_digits=8, decimal_places=3)
+    last = serializers.DecimalField(max_digits=8, decimal_places=3)
+    unit_price = serializers.DecimalField(
+        max_digits=12, decimal_places=5, allow_null=True
+    )
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class CheapestPriceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LatestPrice
+        fields = ["supplier", "price", "unit_price", "last_seen"]
+
+
+class SearchResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="product.id")
+    name = serializers.CharField(source="product.name")
+    weight = serializers.DecimalField(
+        source="product.weight", max_digits=10, decimal_places=2
+    )
+    manufacturer = serializers.CharField(source="product.manufacturer.name")
+    score = serializers.FloatField()
+    cheapest = serializers.SerializerMethodField()
+
+    def get_cheapest(self, result):
+        cheapest = self.context["cheapest"].get(result.product.id)
+        return CheapestPriceSerializer(cheapest).data if cheapest else None
+
+
+def history_queries(propellants: list[Propellant], query: dict, content_type):
+    """Lazy querysets of a price history: buckets, their last prices, daily summaries.
+
+    History compacted into DailyPrice rows is folded into the same buckets; a
+    range includes the summaries of every day it overlaps.
+    """
+    filters = {
+        "content_type": content_type,
+        "object_id__in": [propellant.id for propellant in propellants],
+    }
+    if "supplier" in query:
+        filters["supplier_id"] = query["supplier"]
+    pricings = Pricing.objects.filter(**filters)
+    summaries = DailyPrice.objects.filter(**filters)
+    if "start" in query:
+        pricings = pricings.filter(retrieved__gte=query["start"])
+        summaries = summaries.filter(day__gte=timezone.localdate(query["start"]))
+    if "end" in query:
+        pricings = pricings.filter(retrieved__lt=query["end"])
+        summaries = summaries.filter(day__lte=timezone.localdate(query["end"]))
+
+    buckets = pricings.bucketed(query["bucket"])
+    last_prices = Pricing.objects.filter(id__in=buckets.values("last_id")).values_list(
+        "id", "price"
+    )
+    return buckets, last_prices, summaries.summaries()
+
+
+def history_series(
+    propellants: list[Propellant],
+    query: dict,
+    buckets: list[dict],
+    last_prices: dict,
+    summaries: list[dict],
+) -> list[dict]:
+    """Merge the fetched results of ``history_queries`` into one series per product."""
+    # Raw prices are newer than any summary of the same product and supplier
+    merged = {
+        (row["object_id"], row["supplier"], row["bucket"]): row
+        for row in DailyPriceQuerySet.fold(summaries, query["bucket"])
+    }
+    for row in buckets:
+        row["last"] = last_prices[row["last_id"]]
+        key = (row["object_id"], row["supplier"], row["bucket"])
+        if key in merged:
+            row["low"] = min(row["low"], merged[key]["low"])
+            row["high"] = max(row["high"], merged[key]["high"])
+        merged[key] = row
+
+    weights = {propellant.id: propellant.weight for propellant in propellants}
+    series = {propellant.id: [] for propellant in propellants}
+    for key in sorted(merged, key=lambda key: (key[0], key[1] or 0, key[2])):
+        row = merged[key]
+        weight = weights[row["object_id"]]
+        series[row["object_id"]].append(
+            {
+                "supplier": row["supplier"],
+                "bucket": row["bucket"],
+                "min": row["low"],
+                "max": row["high"],
+                "last": row["last"],
+                "unit_price": row["last"] / weight if weight else None,
+            }
+        )
+
+    return [
+        {
+            "product": propellant.id,
+            "name": propellant.name,
+            "weight": propellant.weight,
+            "bucket": query["bucket"],
+            "series": PriceBucketSerializer(series[propellant.id], many=True).data,
+        }
+        for propellant in propellants
+    ]
+
+
+def price_history(propellants: list[Propellant], query: dict) -> list[dict]:
+    """Downsample the Pricing history of ``propellants`` into time buckets in the DB."""
+    buckets, last_prices, summaries = history_queries(
+        propellants, query, ContentType.objects.get_for_model(Propellant)
+    )
+    return history_series(
+        propellants, query, list(buckets), dict(last_prices), list(summaries)
+    )
+
+
+@method_decorator(cache_by_version, name="dispatch")
 class PropellantViewSet(viewsets.ModelViewSet):
-    queryset = Propellant.objects.all()
+    queryset = Propellant.objects.select_related("manufacturer").prefetch_related(
+        "prices"
+    )
     serializer_class = PropellantSerializer
+
+    def get_queryset(self):
+        # History is aggregated separately, so skip prefetching every raw price
+        if self.action in ("history", "bulk_history"):
+            return Propellant.objects.all()
+        return super().get_queryset()
+
+    @action(detail=True)
+    def history(self, request, pk=None):
+        """Price series of one propellant, bucketed by hour, day or week."""
+        query = PriceHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(price_history([self.get_object()], query.validated_data)[0])
+
+    @action(detail=False, url_path="history")
+    def bulk_history(self, request):
+        """Price series of every propellant passed as a ``product`` parameter."""
+        query = BulkPriceHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        propellants = list(
+            self.get_queryset().filter(id__in=query.validated_data["product"])
+        )
+        return Response(price_history(propellants, query.validated_data))
+
+
+@method_decorator(cache_by_version, name="dispatch")
+class LatestPriceViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = LatestPrice.objects.prefetch_related("content_object")
+    serializer_class = LatestPriceSerializer
+    pagination_class = UnitPriceCursorPagination
+
+    @action(detail=False)
+    def cheapest(self, request):
+        """The cheapest current offer per product, by price per unit weight."""
+        queryset = self.get_queryset().cheapest_per_product()
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
+def records(frame: pd.DataFrame) -> list[dict]:
+    # JSON has no NaN, so missing values become null
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+@method_decorator(cache_by_version, name="dispatch")
+class SearchView(APIView):
+    """Propellants ranked by how well their names match ``q``, with their best offer."""
+
+    queryset = Propellant.objects.all()
+
+    def get(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        results = get_index(Propellant).search(
+            query.validated_data["q"], query.validated_data["limit"]
+        )
+
+        cheapest = LatestPrice.objects.filter(
+            content_type=ContentType.objects.get_for_model(Propellant),
+            object_id__in=[result.product.id for result in results],
+        ).cheapest_per_product()
+        context = {"cheapest": {price.object_id: price for price in cheapest}}
+        return Response(
+            SearchResultSerializer(results, many=True, context=context).data
+        )
+
+
+@method_decorator(cache_by_version, name="dispatch")
+class PriceAnalyticsView(APIView):
+    """Cheapest supplier, supplier spread and the latest price drops per propellant."""
+
+    # Used by the model permission check, the data itself comes from pandas
+    queryset = Pricing.objects.all()
+
+    def get(self, request):
+        frame = analytics.load_prices()
+        return Response(
+            {
+                "cheapest": records(analytics.cheapest_suppliers(frame)),
+                "spread": records(analytics.supplier_spread(frame)),
+                "drops": records(analytics.price_drops(frame).tail(100)),
+            }
+        )
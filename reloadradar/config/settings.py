@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 # Standard Libraries
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,8 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "core",
+    "scraper",
+    "alerts",
     "rest_framework",
 ]
 
@@ -80,6 +83,8 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Wait for the lock instead of failing when scheduler workers write at once
+        "OPTIONS": {"timeout": 20},
     }
 }
 
@@ -115,6 +120,39 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {"format": "{asctime} {levelname} {name}: {message}", "style": "{"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "simple"},
+    },
+    "loggers": {
+        "scraper": {"handlers": ["console"], "level": "INFO"},
+        "alerts": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# File based so the data version bumped by scraper processes reaches the web
+# server. Cached responses are dropped when the data changes, the timeout only
+# bounds how stale untracked fields such as LatestPrice.last_seen can get.
+# The backend unpickles what it reads, keep it out of shared directories.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+    }
+}
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
@@ -130,5 +168,66 @@ REST_FRAMEWORK = {
     # or allow read-only access for unauthenticated users.
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly"
-    ]
+    ],
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.IdCursorPagination",
 }
+
+# Scraper
+# Upper bound on simultaneous connections to a single supplier host, and the
+# per-request timeout in seconds.
+SCRAPER_PER_HOST_CONCURRENCY = 4
+SCRAPER_TIMEOUT = 30
+# Seconds between requests to the same host, by "host[:port]" in the overrides.
+# A longer Crawl-delay or Request-rate in the host's robots.txt takes precedence,
+# robots.txt is read again after SCRAPER_ROBOTS_TTL.
+SCRAPER_HOST_DELAY = 0.5
+SCRAPER_HOST_DELAYS = {}
+SCRAPER_ROBOTS_TTL = timedelta(hours=12)
+# Connection errors and 429/5xx responses are retried this many times, waiting
+# SCRAPER_RETRY_BACKOFF seconds doubled on each further attempt.
+SCRAPER_RETRIES = 3
+SCRAPER_RETRY_BACKOFF = 1.0
+# An unchanged first page skips a paginated listing until it was last scraped
+# in full this long ago.
+SCRAPER_LISTING_REFRESH = timedelta(hours=6)
+# HTML parsing backend for the supplier parsers, "lxml" or "requests-html"
+SCRAPER_PARSER_BACKEND = "lxml"
+# Worker processes parsing listing pages off the main process, 0 to parse in it
+SCRAPER_PARSE_WORKERS = 0
+# Every scrape run is written to the snapshot store under this directory
+SCRAPER_SNAPSHOTS = True
+SCRAPER_SNAPSHOT_DIR = BASE_DIR / "scraper" / "output" / "snapshots"
+
+# Scrape metrics
+# Addresses or networks allowed to read /metrics, besides logged in staff
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
+# Scrape scheduler
+# Default time between scrapes of a link, overridden per supplier name. Each
+# delay is randomised by +/- SCRAPER_JITTER of itself, and failing links back
+# off exponentially from SCRAPER_BACKOFF up to SCRAPER_MAX_BACKOFF.
+SCRAPER_INTERVAL = timedelta(hours=1)
+SCRAPER_SUPPLIER_INTERVALS = {}
+SCRAPER_JITTER = 0.1
+SCRAPER_BACKOFF = timedelta(minutes=5)
+SCRAPER_MAX_BACKOFF = timedelta(hours=12)
+SCRAPER_WORKERS = 4
+
+# Pricing retention
+# Raw prices older than this are archived under SCRAPER_SNAPSHOT_DIR and kept
+# only as daily summaries, see the compact_prices command.
+PRICING_RETENTION = timedelta(days=180)
+
+# Price change stream
+# Seconds between each worker process's checks for new events, shared by all
+# its streams, between keep-alive comments on a quiet stream, and before a
+# stream is closed for the client to resume elsewhere.
+PRICE_STREAM_POLL = 1
+PRICE_STREAM_KEEPALIVE = 15
+PRICE_STREAM_SECONDS = 300
+
+# Alerts
+# Seconds to wait for a webhook sink to accept an alert, and the threads sending
+# alerts in the background, 0 to send them before the scrape goes on
+ALERT_WEBHOOK_TIMEOUT = 10
+ALERT_DELIVERY_WORKERS = 2
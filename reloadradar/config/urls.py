@@ -21,9 +21,11 @@ from django.urls import include, path
 # Project Modules
 from api import urls as api_urls
 from core import urls as core_urls
+from scraper import urls as scraper_urls
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include(core_urls), name="core"),
     path("api/", include(api_urls), name="api"),
+    path("", include(scraper_urls), name="scraper"),
 ]
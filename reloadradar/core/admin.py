@@ -2,10 +2,40 @@
 from django.contrib import admin
 
 # Project Modules
-from core.models import Link, Manufacturer, Pricing, Propellant, Supplier
+from core.cache import bump_data_version
+from core.models import (
+    DailyPrice,
+    LatestPrice,
+    Link,
+    Manufacturer,
+    PriceChange,
+    Pricing,
+    Propellant,
+    Supplier,
+)
+
+
+class PriceAdmin(admin.ModelAdmin):
+    """Bumps the data version itself, prices have no receivers doing it."""
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_data_version()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_data_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_data_version()
+
 
 admin.site.register(Manufacturer)
 admin.site.register(Supplier)
 admin.site.register(Propellant)
-admin.site.register(Pricing)
+admin.site.register(Pricing, PriceAdmin)
 admin.site.register(Link)
+admin.site.register(LatestPrice, PriceAdmin)
+admin.site.register(DailyPrice)
+admin.site.register(PriceChange)
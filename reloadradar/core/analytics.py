@@ -0,0 +1,112 @@
+"""Vectorised price analytics over the Pricing history.
+
+Every function takes and returns plain DataFrames. ``load_prices`` builds the
+input frame from the database in one query per table, and snapshot files can
+be turned into the same shape by ``SnapshotStore.prices_frame``.
+"""
+# Django Libraries
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+# Data Science Libraries
+import pandas as pd
+
+# Project Modules
+from core.models import Pricing, Propellant, Supplier
+
+PRICE_COLUMNS = ["product", "supplier", "price", "retrieved"]
+
+
+def products_frame() -> pd.DataFrame:
+    return pd.DataFrame.from_records(
+        Propellant.objects.annotate(
+            weight_g=Cast("weight", FloatField()),
+            manufacturer_name=F("manufacturer__name"),
+        ).values_list("id", "name", "manufacturer_name", "weight_g"),
+        columns=["product", "name", "manufacturer", "weight"],
+    )
+
+
+def load_prices(pricings=None) -> pd.DataFrame:
+    """Load the propellant price history joined to products and suppliers."""
+    if pricings is None:
+        pricings = Pricing.objects.all()
+    pricings = pricings.filter(
+        content_type=ContentType.objects.get_for_model(Propellant)
+    )
+
+    # Skip the ORM's per-row value conversion, pandas converts whole columns
+    sql, params = pricings.values_list(
+        "object_id", "supplier_id", "price", "retrieved"
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        frame = pd.DataFrame.from_records(cursor.fetchall(), columns=PRICE_COLUMNS)
+    return with_products(frame.astype({"price": float}))
+
+
+def with_products(frame: pd.DataFrame) -> pd.DataFrame:
+    """Join product and supplier details and derive the per-gram unit price."""
+    suppliers = pd.DataFrame.from_records(
+        Supplier.objects.values_list("id", "name"),
+        columns=["supplier", "supplier_name"],
+    )
+    frame = frame.merge(products_frame(), on="product").merge(
+        suppliers, on="supplier", how="left"
+    )
+    frame["retrieved"] = pd.to_datetime(frame["retrieved"], utc=True, format="ISO8601")
+    frame["unit_price"] = frame["price"] / frame["weight"]
+    return frame.sort_values("retrieved", kind="stable", ignore_index=True)
+
+
+def current_prices(frame: pd.DataFrame) -> pd.DataFrame:
+    """The most recent price of every product at every supplier."""
+    return frame.drop_duplicates(["product", "supplier"], keep="last").reset_index(
+        drop=True
+    )
+
+
+def rolling_stats(frame: pd.DataFrame, window: str = "30D") -> pd.DataFrame:
+    """Rolling minimum and median unit price per product across all suppliers."""
+    rolling = (
+        frame.set_index("retrieved")
+        .groupby("product")["unit_price"]
+        .rolling(window)
+        .agg(["min", "median"])
+        .rename(columns={"min": "rolling_min", "median": "rolling_median"})
+        .reset_index()
+    )
+    # Rows come back grouped by product but keep their order within a product
+    rows = frame.sort_values("product", kind="stable", ignore_index=True)
+    return pd.concat([rows, rolling[["rolling_min", "rolling_median"]]], axis=1)
+
+
+def supplier_spread(frame: pd.DataFrame) -> pd.DataFrame:
+    """How far apart the current supplier prices of each product are."""
+    current = current_prices(frame)
+    spread = current.groupby(["product", "name", "manufacturer"], as_index=False).agg(
+        suppliers=("supplier", "nunique"),
+        min_unit_price=("unit_price", "min"),
+        max_unit_price=("unit_price", "max"),
+    )
+    spread["spread"] = spread["max_unit_price"] - spread["min_unit_price"]
+    spread["spread_pct"] = spread["spread"] / spread["min_unit_price"]
+    return spread.sort_values("spread_pct", ascending=False, ignore_index=True)
+
+
+def price_drops(frame: pd.DataFrame, threshold: float = 0.05) -> pd.DataFrame:
+    """Price changes at a supplier that cut the previous price by ``threshold`` or more."""
+    previous = frame.groupby(["product", "supplier"])["price"].shift()
+    changes = frame.assign(
+        previous_price=previous, change_pct=frame["price"] / previous - 1
+    )
+    return changes[changes["change_pct"] <= -threshold].reset_index(drop=True)
+
+
+def cheapest_suppliers(frame: pd.DataFrame) -> pd.DataFrame:
+    """The supplier with the lowest current unit price for each product."""
+    current = current_prices(frame)
+    cheapest = current.loc[current.groupby("product")["unit_price"].idxmin()]
+    return cheapest.sort_values("unit_price", ignore_index=True)
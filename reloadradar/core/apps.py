@@ -5,3 +5,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Connect the data version signals of the response cache
+        # App Modules
+        from . import cache  # noqa: F401
@@ -0,0 +1,177 @@
+"""Response caching for read paths, keyed by a global data version.
+
+The version is a nanosecond timestamp kept in the shared cache and replaced
+whenever catalogue or price data changes, so cached responses of an older
+version are simply never read again. It doubles as the ETag and
+Last-Modified of every cached page, which lets clients revalidate without
+the view touching the database.
+
+A second version covers only the catalogue, for in-process structures built
+from it such as the product matchers. It lives in the same cache, so a change
+made in one process, e.g. in the admin, reaches every other one.
+"""
+# Standard Libraries
+import hashlib
+import time
+from asyncio import iscoroutinefunction
+from datetime import datetime, timezone
+from functools import wraps
+
+# Third Party Libraries
+from asgiref.sync import sync_to_async
+
+# Django Libraries
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+# App Modules
+from .models import Manufacturer, Propellant, Supplier
+
+VERSION_KEY = "data-version"
+CATALOGUE_VERSION_KEY = "catalogue-version"
+
+
+def version(key: str) -> int:
+    """The version stored under ``key``, starting one if there is none yet."""
+    value = cache.get(key)
+    if value is None:
+        value = time.time_ns()
+        # Another process may have set it meanwhile, and a dummy cache keeps nothing
+        if not cache.add(key, value, timeout=None):
+            value = cache.get(key, value)
+    return value
+
+
+def bump_versions(*keys: str):
+    cache.set_many(dict.fromkeys(keys, time.time_ns()), timeout=None)
+
+
+def data_version() -> int:
+    return version(VERSION_KEY)
+
+
+def catalogue_version() -> int:
+    return version(CATALOGUE_VERSION_KEY)
+
+
+async def adata_version() -> int:
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not await cache.aadd(VERSION_KEY, version, timeout=None):
+            version = await cache.aget(VERSION_KEY, version)
+    return version
+
+
+def bump_data_version(**kwargs):
+    """Invalidate every cached response. Bulk writes have to call this themselves."""
+    bump_versions(VERSION_KEY)
+
+
+# Prices are written in bulk and bump once per write. Receivers on them would
+# also stop Django from deleting them without loading each row first.
+@receiver([post_save, post_delete], sender=Propellant)
+@receiver([post_save, post_delete], sender=Manufacturer)
+@receiver([post_save, post_delete], sender=Supplier)
+def bump_catalogue_version(**kwargs):
+    """Invalidate cached responses and everything built from the catalogue."""
+    bump_versions(VERSION_KEY, CATALOGUE_VERSION_KEY)
+
+
+def request_user_id(request):
+    user = getattr(request, "user", None)
+    return user.pk if user is not None and user.is_authenticated else ""
+
+
+def variant(request, user_id) -> str:
+    """What besides the URL a response depends on: content negotiation and user."""
+    key = f"{request.get_full_path()}|{request.headers.get('Accept', '')}|{user_id}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def version_etag(request, *args, **kwargs) -> str:
+    return f'"{data_version()}-{variant(request, request_user_id(request))[:8]}"'
+
+
+def version_last_modified(request, *args, **kwargs) -> datetime:
+    return datetime.fromtimestamp(data_version() / 1e9, tz=timezone.utc)
+
+
+def cache_by_version(view):
+    """Cache successful GET responses of ``view`` until the data version changes.
+
+    Requests carrying a matching If-None-Match or If-Modified-Since get a 304
+    before the view or the response cache is consulted.
+    """
+    if iscoroutinefunction(view):
+        return acache_by_version(view)
+
+    @wraps(view)
+    def cached(request, *args, **kwargs):
+        key = f"response:{data_version()}:{variant(request, request_user_id(request))}"
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = settings.RESPONSE_CACHE_TIMEOUT
+            if callable(getattr(response, "render", None)):
+                # Template and DRF responses can only be pickled once rendered
+                response.add_post_render_callback(lambda r: cache.set(key, r, timeout))
+            else:
+                cache.set(key, response, timeout)
+        return response
+
+    conditional = condition(
+        etag_func=version_etag, last_modified_func=version_last_modified
+    )(cached)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+        return conditional(request, *args, **kwargs)
+
+    return wrapped
+
+
+def acache_by_version(view):
+    """``cache_by_version`` for async views, through the async cache interface."""
+
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await view(request, *args, **kwargs)
+
+        version = await adata_version()
+        # The lazy request.user loads the session and user with sync queries, and
+        # Django 4.2 has no request.auser() yet
+        request_variant = variant(
+            request, await sync_to_async(request_user_id)(request)
+        )
+        etag = f'"{version}-{request_variant[:8]}"'
+        last_modified = version // 10**9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+
+        key = f"response:{version}:{request_variant}"
+        response = await cache.aget(key)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+            if response.status_code == 200:
+                await cache.aset(key, response, settings.RESPONSE_CACHE_TIMEOUT)
+        if response.status_code == 200:
+            response.headers.setdefault("ETag", etag)
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+        return response
+
+    return wrapped
@@ -0,0 +1,46 @@
+# Django Libraries
+from django.core.management.base import BaseCommand
+
+# Data Science Libraries
+import pandas as pd
+
+# Project Modules
+from core import analytics
+
+METRICS = {
+    "cheapest": analytics.cheapest_suppliers,
+    "spread": analytics.supplier_spread,
+    "drops": analytics.price_drops,
+    "rolling": analytics.rolling_stats,
+}
+
+
+class Command(BaseCommand):
+    help = "Report price analytics computed over the whole price history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("metric", choices=METRICS)
+        parser.add_argument(
+            "--snapshots",
+            action="store_true",
+            help="Read prices from the scrape snapshots instead of the database.",
+        )
+        parser.add_argument("--csv", help="Write the report to this CSV file.")
+
+    def handle(self, *args, **options):
+        if options["snapshots"]:
+            # Project Modules
+            from scraper.models import Snapshot
+            from scraper.snapshots import SnapshotStore
+
+            frame = SnapshotStore().prices_frame(Snapshot.objects.all())
+        else:
+            frame = analytics.load_prices()
+
+        report = METRICS[options["metric"]](frame)
+        if options["csv"]:
+            report.to_csv(options["csv"], index=False)
+            self.stdout.write(f"Wrote {len(report)} rows to {options['csv']}")
+        else:
+            with pd.option_context("display.width", 200, "display.max_rows", None):
+                self.stdout.write(report.to_string(index=False))
@@ -0,0 +1,18 @@
+# Django Libraries
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Project Modules
+from core.cache import bump_data_version
+from core.models import LatestPrice
+
+
+class Command(BaseCommand):
+    help = "Rebuild the LatestPrice table from the full Pricing history."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = LatestPrice.objects.rebuild()
+        bump_data_version()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rows)} latest prices."))
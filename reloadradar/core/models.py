@@ -1,7 +1,14 @@
+# Standard Libraries
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
 # Django Libraries
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.db.models.functions import TruncDay, TruncHour, TruncWeek
+from django.utils import timezone
 
 
 class Link(models.Model):
@@ -29,6 +36,19 @@ class Supplier(models.Model):
         return self.name
 
 
+class PricingQuerySet(models.QuerySet):
+    BUCKETS = {"hour": TruncHour, "day": TruncDay, "week": TruncWeek}
+
+    def bucketed(self, bucket: str):
+        """Aggregate into one row per product, supplier and time bucket."""
+        return (
+            self.annotate(bucket=self.BUCKETS[bucket]("retrieved"))
+            .values("object_id", "supplier", "bucket")
+            .annotate(low=Min("price"), high=Max("price"), last_id=Max("id"))
+            .order_by("object_id", "supplier", "bucket")
+        )
+
+
 class Pricing(models.Model):
     price = models.DecimalField(decimal_places=3, max_digits=8)
     retrieved = models.DateTimeField(auto_now_add=True)
@@ -46,16 +66,268 @@ class Pricing(models.Model):
         related_name="prices",
         related_query_name="price",
     )
+    # Id of the scraper's ScrapeRun that recorded the price, at most one price per
+    # product and supplier in a run so a resumed run cannot record duplicates.
+    # A plain integer, core knows nothing of the scraper app.
+    run_id = models.PositiveIntegerField(null=True, blank=True)
+
+    objects = PricingQuerySet.as_manager()
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run_id", "content_type", "object_id", "supplier"],
+                name="pricing_run_unique",
+            ),
+        ]
         indexes = [
-            models.Index(fields=["content_type", "object_id"]),
+            # Latest and historic prices of a product, optionally at one supplier
+            models.Index(fields=["content_type", "object_id", "supplier", "retrieved"]),
+            models.Index(fields=["retrieved"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.content_object.name}: {self.price}"
 
 
+class DailyPriceQuerySet(models.QuerySet):
+    def summaries(self):
+        return self.order_by("day").values(
+            "object_id", "supplier", "day", "low", "high", "close"
+        )
+
+    @staticmethod
+    def fold(summaries, bucket: str) -> list[dict]:
+        """Fold rows of ``summaries()`` into rows shaped like ``PricingQuerySet.bucketed``.
+
+        The rows have no last_id but a last price. Summaries cover whole days,
+        so hourly buckets get them at midnight.
+        """
+        buckets = {}
+        for row in summaries:
+            day = row["day"]
+            if bucket == "week":
+                day -= timedelta(days=day.weekday())
+            start = timezone.make_aware(datetime.combine(day, time()))
+            summary = buckets.setdefault(
+                (row["object_id"], row["supplier"], start),
+                {
+                    "object_id": row["object_id"],
+                    "supplier": row["supplier"],
+                    "bucket": start,
+                    "low": row["low"],
+                    "high": row["high"],
+                },
+            )
+            summary["low"] = min(summary["low"], row["low"])
+            summary["high"] = max(summary["high"], row["high"])
+            summary["last"] = row["close"]
+        return list(buckets.values())
+
+    def bucketed(self, bucket: str) -> list[dict]:
+        return self.fold(self.summaries(), bucket)
+
+
+class DailyPrice(models.Model):
+    """Daily summary of Pricing history that was compacted away."""
+
+    day = models.DateField()
+    open = models.DecimalField(decimal_places=3, max_digits=8)
+    low = models.DecimalField(decimal_places=3, max_digits=8)
+    high = models.DecimalField(decimal_places=3, max_digits=8)
+    close = models.DecimalField(decimal_places=3, max_digits=8)
+    # Raw Pricing rows summarised
+    samples = models.PositiveIntegerField()
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name="daily_prices",
+    )
+
+    objects = DailyPriceQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "supplier", "day"],
+                name="daily_price_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_object.name} on {self.day}: {self.low}-{self.high}"
+
+
+class LatestPriceQuerySet(models.QuerySet):
+    def record(self, pricings: list[Pricing], seen):
+        """Upsert the current price of each product/supplier pair from ``pricings``."""
+        return self.bulk_create(
+            [LatestPrice.from_pricing(pricing, seen) for pricing in pricings],
+            update_conflicts=True,
+            unique_fields=["content_type", "object_id", "supplier"],
+            update_fields=["pricing", "price", "unit_price", "last_seen"],
+        )
+
+    def rebuild(self):
+        """Recreate every row from the Pricing history."""
+        latest_ids = (
+            Pricing.objects.values("content_type", "object_id", "supplier")
+            .annotate(latest=Max("id"))
+            .values("latest")
+        )
+        pricings = Pricing.objects.filter(id__in=latest_ids).prefetch_related(
+            "content_object"
+        )
+
+        self.all().delete()
+        return self.bulk_create(
+            [LatestPrice.from_pricing(pricing) for pricing in pricings],
+            batch_size=1000,
+        )
+
+    def cheapest_per_product(self):
+        """Limit to the lowest unit price per product across all suppliers."""
+        cheapest = (
+            self.model.objects.filter(
+                content_type=OuterRef("content_type"), object_id=OuterRef("object_id")
+            )
+            .order_by("unit_price", "price", "id")
+            .values("id")[:1]
+        )
+        return self.filter(id=Subquery(cheapest)).order_by("unit_price")
+
+
+class LatestPrice(models.Model):
+    """Current price of a product at a supplier, kept in step with Pricing inserts."""
+
+    pricing = models.ForeignKey(Pricing, on_delete=models.CASCADE, related_name="+")
+    price = models.DecimalField(decimal_places=3, max_digits=8)
+    # Price per unit of the product's weight, i.e. per gram for propellants
+    unit_price = models.DecimalField(
+        decimal_places=5, max_digits=12, null=True, blank=True
+    )
+    last_seen = models.DateTimeField()
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="latest_prices",
+        related_query_name="latest_price",
+    )
+
+    objects = LatestPriceQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "supplier"],
+                name="latest_price_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["content_type", "unit_price"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_object.name} at {self.supplier}: {self.price}"
+
+    @classmethod
+    def from_pricing(cls, pricing: Pricing, seen=None) -> "LatestPrice":
+        weight = getattr(pricing.content_object, "weight", None)
+        return cls(
+            pricing=pricing,
+            price=pricing.price,
+            unit_price=(Decimal(pricing.price) / weight) if weight else None,
+            last_seen=seen or pricing.retrieved,
+            content_type_id=pricing.content_type_id,
+            object_id=pricing.object_id,
+            supplier_id=pricing.supplier_id,
+        )
+
+
+class PriceChangeQuerySet(models.QuerySet):
+    def stream(self, after: int, products=(), manufacturers=()):
+        """Changes after event id ``after``, oldest first, optionally narrowed."""
+        changes = self.filter(id__gt=after)
+        if products:
+            changes = changes.filter(object_id__in=products)
+        if manufacturers:
+            changes = changes.filter(manufacturer_id__in=manufacturers)
+        return changes.order_by("id")
+
+
+class PriceChange(models.Model):
+    """Event of a product's price at a supplier changing, written on ingestion.
+
+    The id doubles as the event id clients resume from.
+    """
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    old_price = models.DecimalField(
+        decimal_places=3, max_digits=8, null=True, blank=True
+    )
+    new_price = models.DecimalField(decimal_places=3, max_digits=8)
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    product = GenericForeignKey("content_type", "object_id")
+    # Copied from the product so streams can filter on it without a join
+    manufacturer = models.ForeignKey(
+        "Manufacturer",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="price_changes",
+    )
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="price_changes",
+    )
+
+    objects = PriceChangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["object_id", "id"]),
+            models.Index(fields=["manufacturer", "id"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product}: {self.old_price} -> {self.new_price}"
+
+    def matches(self, products=(), manufacturers=()) -> bool:
+        """Whether the change passes the filters of ``PriceChangeQuerySet.stream``."""
+        return (not products or self.object_id in products) and (
+            not manufacturers or self.manufacturer_id in manufacturers
+        )
+
+    def event(self) -> dict:
+        return {
+            "product": self.object_id,
+            "manufacturer": self.manufacturer_id,
+            "supplier": self.supplier_id,
+            "old": self.old_price,
+            "new": self.new_price,
+            "at": self.created,
+        }
+
+
 class Manufacturer(models.Model):
     name = models.CharField(max_length=128)
     urls = GenericRelation(Link)
@@ -75,6 +347,7 @@ class Propellant(models.Model):
         related_query_name="propellant",
     )
     prices = GenericRelation(Pricing)
+    latest_prices = GenericRelation(LatestPrice, related_query_name="propellant")
 
     class Meta:
         constraints = [
@@ -1 +1,135 @@
-# from django.test import TestCase
+# Django Libraries
+from django.test import SimpleTestCase, TestCase, override_settings
+
+# Data Science Libraries
+import pandas as pd
+
+# Project Modules
+from core.analytics import (
+    cheapest_suppliers,
+    price_drops,
+    rolling_stats,
+    supplier_spread,
+)
+from core.models import Manufacturer, Propellant
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class OverviewCacheTests(TestCase):
+    def setUp(self):
+        for i in range(3):
+            manufacturer = Manufacturer.objects.create(name=f"Manufacturer {i}")
+            for j in range(3):
+                Propellant.objects.create(
+                    name=f"Powder {i}{j}", manufacturer=manufacturer
+                )
+
+    def test_cached_until_data_changes(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/overview")
+        self.assertContains(response, "Powder 22")
+
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get("/overview"), "Powder 22")
+
+        Propellant.objects.filter(name="Powder 22").get().delete()
+        self.assertNotContains(self.client.get("/overview"), "Powder 22")
+
+    def test_revalidation(self):
+        etag = self.client.get("/overview").headers["ETag"]
+        response = self.client.get("/overview", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Manufacturer.objects.create(name="Manufacturer 3")
+        response = self.client.get("/overview", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class AnalyticsTests(SimpleTestCase):
+    def setUp(self):
+        products = {
+            1: ("H4350", "Hodgdon"),
+            2: ("N140", "Vihtavuori"),
+            3: ("Varget", "Hodgdon"),
+        }
+        # Every product weighs 100 g, so the unit price is the price / 100
+        rows = [
+            (1, 1, 50.0, 0),
+            (1, 2, 50.0, 0),
+            (3, 1, 30.0, 5),
+            (3, 2, 30.0, 5),
+            (1, 1, 45.0, 10),
+            (2, 1, 60.0, 20),
+            (1, 2, 48.0, 38),
+            (1, 2, 47.5, 40),
+        ]
+        start = pd.Timestamp("2026-01-01", tz="UTC")
+        self.frame = pd.DataFrame(
+            [
+                {
+                    "product": product,
+                    "supplier": supplier,
+                    "price": price,
+                    "retrieved": start + pd.Timedelta(days=day),
+                    "name": products[product][0],
+                    "manufacturer": products[product][1],
+                    "weight": 100.0,
+                    "unit_price": price / 100,
+                }
+                for product, supplier, price, day in rows
+            ]
+        )
+
+    def test_rolling_stats(self):
+        stats = rolling_stats(self.frame, window="30D").round(6)
+        h4350 = stats[stats["product"] == 1]
+        self.assertEqual(
+            list(zip(h4350["rolling_min"], h4350["rolling_median"])),
+            [
+                (0.5, 0.5),
+                (0.5, 0.5),
+                (0.45, 0.5),
+                (0.45, 0.465),
+                # Day 10 is exactly 30 days before day 40 and out of its window
+                (0.475, 0.4775),
+            ],
+        )
+        n140 = stats[stats["product"] == 2]
+        self.assertEqual(
+            list(zip(n140["rolling_min"], n140["rolling_median"])), [(0.6, 0.6)]
+        )
+
+    def test_price_drops(self):
+        drops = price_drops(self.frame, threshold=0.05)
+        # The 4% cut on day 38 is below the threshold, the 1% one after it too
+        self.assertEqual(
+            list(zip(drops["product"], drops["supplier"], drops["previous_price"])),
+            [(1, 1, 50.0)],
+        )
+        self.assertAlmostEqual(drops["change_pct"][0], -0.1)
+        self.assertEqual(
+            len(price_drops(self.frame, threshold=0.04)), 2, "cuts of exactly 4%"
+        )
+
+    def test_cheapest_suppliers(self):
+        cheapest = cheapest_suppliers(self.frame)
+        self.assertEqual(
+            list(zip(cheapest["product"], cheapest["supplier"], cheapest["price"])),
+            # Varget costs the same at both, the first one seen wins the tie
+            [(3, 1, 30.0), (1, 1, 45.0), (2, 1, 60.0)],
+        )
+
+    def test_supplier_spread(self):
+        spread = supplier_spread(self.frame).set_index("product")
+        self.assertEqual(spread.index[0], 1)
+        self.assertEqual(spread.loc[1, "suppliers"], 2)
+        self.assertAlmostEqual(spread.loc[1, "min_unit_price"], 0.45)
+        self.assertAlmostEqual(spread.loc[1, "max_unit_price"], 0.475)
+        self.assertAlmostEqual(spread.loc[1, "spread_pct"], 0.025 / 0.45)
+        # A product with a single price, and one priced the same everywhere
+        self.assertEqual(spread.loc[2, "suppliers"], 1)
+        self.assertEqual(spread.loc[2, "spread"], 0)
+        self.assertEqual(spread.loc[3, "suppliers"], 2)
+        self.assertEqual(spread.loc[3, "spread_pct"], 0)
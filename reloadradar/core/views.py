@@ -1,15 +1,23 @@
 # Django Libraries
+from django.db.models import Prefetch
 from django.shortcuts import render
 
 # Project Modules
-from core.models import Manufacturer
+from core.models import Manufacturer, Propellant
+
+# App Modules
+from .cache import cache_by_version
 
 
 def home(request):
     return render(request, "core/home.html", None)
 
 
+@cache_by_version
 def propellant_overview(request):
-    context = {"manufacturers": [m for m in Manufacturer.objects.all()]}
+    manufacturers = Manufacturer.objects.order_by("name").prefetch_related(
+        Prefetch("propellants", queryset=Propellant.objects.order_by("name"))
+    )
+    context = {"manufacturers": manufacturers}
 
     return render(request, "core/overview.html", context)
@@ -1,2 +1,79 @@
 # Django Libraries
-# from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.template.response import TemplateResponse
+
+# App Modules
+from .models import (
+    LinkState,
+    ProductAlias,
+    ScrapeRun,
+    ScrapeTask,
+    ScrapeTotal,
+    Snapshot,
+    UnmatchedItem,
+)
+
+admin.site.register(LinkState)
+admin.site.register(Snapshot)
+admin.site.register(ScrapeRun)
+admin.site.register(ScrapeTask)
+admin.site.register(ScrapeTotal)
+admin.site.register(ProductAlias)
+
+
+class MapToProductForm(forms.Form):
+    product = forms.ModelChoiceField(queryset=None)
+
+    def __init__(self, product_model, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["product"].queryset = product_model.objects.order_by("name")
+
+
+@admin.register(UnmatchedItem)
+class UnmatchedItemAdmin(admin.ModelAdmin):
+    list_display = [
+        "raw_name",
+        "supplier",
+        "occurrences",
+        "last_seen",
+        "error",
+        "product",
+    ]
+    list_filter = ["supplier", "content_type"]
+    search_fields = ["name"]
+    ordering = ["-occurrences"]
+    actions = ["map_to_product"]
+
+    @admin.action(description="Map to a product and add as matcher aliases")
+    def map_to_product(self, request, queryset):
+        content_types = queryset.values_list("content_type", flat=True).distinct()
+        if len(content_types) != 1:
+            self.message_user(
+                request, "Select items of a single product type.", messages.ERROR
+            )
+            return None
+
+        product_model = queryset.first().content_type.model_class()
+        form = MapToProductForm(
+            product_model, request.POST if "apply" in request.POST else None
+        )
+        if form.is_valid():
+            product = form.cleaned_data["product"]
+            count = queryset.map_to(product)
+            self.message_user(request, f"Mapped {count} items to {product}.")
+            return None
+
+        return TemplateResponse(
+            request,
+            "admin/scraper/unmatcheditem/map_to_product.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Map unmatched items to a product",
+                "opts": self.model._meta,
+                "items": queryset,
+                "form": form,
+                "action_checkbox_name": ACTION_CHECKBOX_NAME,
+            },
+        )
@@ -5,3 +5,8 @@ from django.apps import AppConfig
 class ScraperConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "scraper"
+
+    def ready(self):
+        # Connect the matcher cache invalidation signals
+        # App Modules
+        from . import matcher  # noqa: F401
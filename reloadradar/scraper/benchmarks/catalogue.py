@@ -0,0 +1,114 @@
+# Standard Libraries
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+# Django Libraries
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+# Project Modules
+from core.models import LatestPrice, Link, Manufacturer, Pricing, Propellant, Supplier
+
+# App Modules
+from ..ingest import batched
+
+
+def fixture_products(pages: dict[str, list]) -> dict[str, set[str]]:
+    """Manufacturer and product names listed on the saved supplier pages.
+
+    The saved pages list items as "<manufacturer> <product> <size>".
+    """
+    products: dict[str, set[str]] = {}
+    for items in pages.values():
+        for item in items:
+            manufacturer, product, *_ = item.name.split()
+            products.setdefault(manufacturer, set()).add(product)
+    return products
+
+
+def generate_catalogue(
+    manufacturers: int = 10,
+    propellants: int = 200,
+    suppliers: int = 5,
+    years: float = 1,
+    interval: timedelta = timedelta(days=7),
+    extra_products: dict[str, set[str]] | None = None,
+    seed: int = 0,
+) -> dict[str, int]:
+    """Fill the database with a synthetic catalogue and its price history.
+
+    Every supplier gets a propellant Link and a price for every propellant each
+    ``interval`` over ``years``. ``extra_products`` adds real names, so saved
+    supplier pages match part of the catalogue.
+    """
+    rng = random.Random(seed)
+
+    makers = Manufacturer.objects.bulk_create(
+        Manufacturer(name=f"Maker{i}") for i in range(manufacturers)
+    )
+    products = [
+        Propellant(name=f"P{i:05}", manufacturer=makers[i % manufacturers])
+        for i in range(propellants)
+    ]
+    # Propellant names are unique regardless of manufacturer and case
+    seen = {product.name.lower() for product in products}
+    for name, names in (extra_products or {}).items():
+        maker, _ = Manufacturer.objects.get_or_create(name=name)
+        for product in sorted(names):
+            if product.lower() not in seen:
+                seen.add(product.lower())
+                products.append(Propellant(name=product, manufacturer=maker))
+    products = Propellant.objects.bulk_create(products)
+
+    shops = Supplier.objects.bulk_create(
+        Supplier(name=f"Shop{i}") for i in range(suppliers)
+    )
+    Link.objects.bulk_create(
+        Link(
+            link_type="propellant",
+            link_url=f"https://shop{i}.example/propellants",
+            content_object=shop,
+        )
+        for i, shop in enumerate(shops)
+    )
+
+    base = {
+        (product.id, shop.id): rng.uniform(300, 2000)
+        for product in products
+        for shop in shops
+    }
+    steps = int(timedelta(days=365) * years / interval) if base else 0
+    start = timezone.now() - interval * steps
+    content_type = ContentType.objects.get_for_model(Propellant)
+    rows = 0
+    for step in range(steps):
+        pricings = [
+            Pricing(
+                content_type=content_type,
+                object_id=product.id,
+                supplier_id=shop.id,
+                price=Decimal(
+                    f"{base[product.id, shop.id] * rng.uniform(0.8, 1.2):.2f}"
+                ),
+                price_url=f"https://shop{shop.id}.example/{product.id}",
+            )
+            for product in products
+            for shop in shops
+        ]
+        ids = []
+        for batch in batched(pricings, 5000):
+            ids += [pricing.id for pricing in Pricing.objects.bulk_create(batch)]
+        # auto_now_add overwrites retrieved on insert, so backdate afterwards
+        Pricing.objects.filter(id__range=(min(ids), max(ids))).update(
+            retrieved=start + interval * step
+        )
+        rows += len(ids)
+    LatestPrice.objects.rebuild()
+
+    return {
+        "manufacturers": Manufacturer.objects.count(),
+        "propellants": len(products),
+        "suppliers": len(shops),
+        "pricings": rows,
+    }
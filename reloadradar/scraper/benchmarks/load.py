@@ -0,0 +1,97 @@
+"""Concurrent HTTP load against a running server.
+
+Every client thread keeps one connection open and sends its share of the
+requests back to back, so the server, not connection setup, is what limits
+throughput. The client is plain ``http.client`` to need nothing extra.
+"""
+# Standard Libraries
+import http.client
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    target: str
+    path: str
+    seconds: float
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.seconds if self.seconds else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return float("nan")
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def connect(base_url: str, timeout: float) -> http.client.HTTPConnection:
+    url = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection
+        if url.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    return connection_class(url.hostname, url.port, timeout=timeout)
+
+
+def client(base_url: str, path: str, requests: int, timeout: float):
+    """Send ``requests`` GETs over one connection, reconnecting after errors."""
+    target = urlsplit(base_url).path.rstrip("/") + path
+    connection = connect(base_url, timeout)
+    latencies, errors = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            connection.request("GET", target)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = connect(base_url, timeout)
+            errors += 1
+            continue
+        if response.status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors += 1
+    connection.close()
+    return latencies, errors
+
+
+def run_load(
+    target: str,
+    base_url: str,
+    path: str,
+    requests: int = 1000,
+    concurrency: int = 20,
+    timeout: float = 30,
+    warmup: int = 10,
+) -> LoadResult:
+    client(base_url, path, warmup, timeout)
+
+    shares = [
+        requests // concurrency + (i < requests % concurrency)
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        outcomes = list(
+            executor.map(lambda share: client(base_url, path, share, timeout), shares)
+        )
+    result = LoadResult(target, path, time.perf_counter() - start)
+
+    for latencies, errors in outcomes:
+        result.latencies += latencies
+        result.errors += errors
+    return result
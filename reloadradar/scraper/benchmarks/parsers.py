@@ -0,0 +1,59 @@
+# Standard Libraries
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# App Modules
+from ..parsers import BACKENDS
+from ..scrapers import Scraper
+
+# Saved listing pages, named after the normalised supplier name of their scraper
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@dataclass
+class ParserBenchmark:
+    supplier: str
+    backend: str
+    items: int
+    repeat: int
+    seconds: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items * self.repeat / self.seconds
+
+    def as_dict(self) -> dict:
+        return asdict(self) | {"items_per_second": self.items_per_second}
+
+
+def benchmark_parsers(repeat: int = 20, backends=tuple(BACKENDS)):
+    """Time every parser backend over each saved supplier page.
+
+    All backends must extract identical items from a page, otherwise the
+    comparison would be meaningless and an AssertionError is raised.
+    """
+    results = []
+    for path in sorted(FIXTURES.glob("*.html")):
+        parser_class = Scraper.registry[path.stem].parser_class
+        raw = path.read_bytes()
+        url = f"https://{path.stem}.example/"
+
+        reference = None
+        for backend in backends:
+            parser = parser_class(backend)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                items = list(parser.parse(raw, url))
+            seconds = time.perf_counter() - start
+
+            if reference is None:
+                reference = items
+            elif items != reference:
+                raise AssertionError(f"{backend} parsed {path.name} differently")
+
+            results.append(
+                ParserBenchmark(path.stem, backend, len(items), repeat, seconds)
+            )
+
+    return results
@@ -0,0 +1,63 @@
+# Standard Libraries
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+class StubSupplierServer:
+    """Local HTTP server replaying saved supplier pages.
+
+    ``/<name>.html`` serves ``<name>.html`` from ``root`` for any query string,
+    after ``latency`` seconds, so pagination parameters hit the same page.
+    Pages carry an ETag and are answered with 304 when it is sent back.
+    Absolute links to ``https://<name>.example`` are rewritten to the server.
+    """
+
+    def __init__(self, root: Path, latency: float = 0.0):
+        pages = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                page = pages.get(urlsplit(self.path).path.lstrip("/"))
+                time.sleep(latency)
+                if page is None:
+                    self.send_error(404)
+                    return
+                etag = f'"{hashlib.sha256(page).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        host, port = self.server.server_address
+        for path in Path(root).glob("*.html"):
+            pages[path.name] = path.read_bytes().replace(
+                f"https://{path.stem}.example".encode(),
+                f"http://{host}:{port}".encode(),
+            )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, name: str) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/{name}.html"
+
+    def __enter__(self) -> "StubSupplierServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
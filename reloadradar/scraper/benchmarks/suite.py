@@ -0,0 +1,310 @@
+"""End-to-end benchmarks against a throwaway database.
+
+``run_suite`` creates a test database, fills it with a synthetic catalogue and
+measures the scrape pipeline and the API on it. The results are plain dicts so
+runs of different versions can be stored and compared.
+"""
+# Standard Libraries
+import math
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+# Django Libraries
+import django
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+# Project Modules
+from core.cache import bump_data_version
+from core.models import Link, Manufacturer, Propellant, Supplier
+
+# App Modules
+from ..catalogue import PropellantImport
+from ..ingest import ingest_prices
+from ..matcher import ProductMatcher, invalidate_matchers
+from ..orchestrator import sweep
+from ..scrapers import Scraper
+from .catalogue import fixture_products, generate_catalogue
+from .parsers import FIXTURES, benchmark_parsers
+from .server import StubSupplierServer
+
+API_PATHS = [
+    "/api/propellants/",
+    "/api/suppliers/",
+    "/api/manufacturers/",
+    "/api/latest-prices/",
+    "/api/latest-prices/cheapest/",
+    "/overview",
+]
+
+
+@dataclass
+class Measurement:
+    name: str
+    value: float
+    unit: str
+    extra: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@contextmanager
+def scratch_database():
+    """Run against a fresh test database and test environment for the duration."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fixture_pages() -> dict[str, list]:
+    return {
+        path.stem: list(
+            Scraper.registry[path.stem]
+            .parser_class()
+            .parse(path.read_bytes(), f"https://{path.stem}.example/")
+        )
+        for path in sorted(FIXTURES.glob("*.html"))
+    }
+
+
+def benchmark_matcher(names: list[str], repeat: int) -> list[Measurement]:
+    start = time.perf_counter()
+    matcher = ProductMatcher(Propellant)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        found = [matcher.find(name) for name in names]
+    seconds = time.perf_counter() - start
+
+    misses = found.count(None)
+    return [
+        Measurement("matcher.build", build, "s"),
+        Measurement(
+            "find_product",
+            len(names) * repeat / seconds,
+            "names/s",
+            {"names": len(names), "misses": misses},
+        ),
+    ]
+
+
+def benchmark_ingest(rng: random.Random) -> list[Measurement]:
+    products = {product.name: product for product in Propellant.objects.all()}
+    supplier = Supplier.objects.create(name="Ingest benchmark")
+    items = [
+        {"name": name, "price": round(rng.uniform(300, 2000), 2), "url": "https://x"}
+        for name in products
+    ]
+
+    results = []
+    # The first pass inserts every price, the second finds them all unchanged
+    for name in ("ingest.insert", "ingest.unchanged"):
+        start = time.perf_counter()
+        result = ingest_prices(Propellant, supplier, items, products.get)
+        seconds = time.perf_counter() - start
+        results.append(
+            Measurement(
+                name, len(items) / seconds, "rows/s", {"inserted": result.inserted}
+            )
+        )
+    return results
+
+
+def benchmark_import(rows: int, rng: random.Random) -> list[Measurement]:
+    manufacturers = list(Manufacturer.objects.values_list("name", flat=True))
+    catalogue = [
+        {
+            "name": f"Import{i:05}",
+            "weight": rng.choice(["", "454", "500", "1000"]),
+            "manufacturer": rng.choice(manufacturers).upper(),
+        }
+        for i in range(rows)
+    ]
+
+    results = []
+    # The first pass creates every propellant, the second finds them all unchanged
+    for name in ("import.create", "import.unchanged"):
+        start = time.perf_counter()
+        result = PropellantImport().run(catalogue)
+        seconds = time.perf_counter() - start
+        results.append(
+            Measurement(
+                name,
+                rows / seconds,
+                "rows/s",
+                {"created": result.created, "rejected": len(result.rejects)},
+            )
+        )
+    return results
+
+
+def benchmark_sweep(pages: dict[str, list]) -> list[Measurement]:
+    with StubSupplierServer(FIXTURES) as server:
+        links = []
+        for name in pages:
+            supplier = Supplier.objects.create(name=name)
+            links.append(
+                Link.objects.create(
+                    link_type="propellant",
+                    link_url=server.url(name),
+                    content_object=supplier,
+                )
+            )
+
+        start = time.perf_counter()
+        results = sweep(links, conditional=False)
+        seconds = time.perf_counter() - start
+
+    items = sum(
+        result.scraper.ingest_result.items
+        for result in results
+        if result.ok and result.scraper.ingest_result
+    )
+    return [
+        Measurement(
+            "sweep",
+            seconds,
+            "s",
+            {
+                "links": len(results),
+                "failed": sum(not result.ok for result in results),
+                "items": items,
+            },
+        )
+    ]
+
+
+def nearest_rank(ordered: list[float], fraction: float) -> float:
+    """The ``fraction`` percentile of sorted samples, by the nearest rank method."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def benchmark_api(repeat: int) -> list[Measurement]:
+    client = Client()
+    results = []
+    for path in API_PATHS:
+        latencies = []
+        for _ in range(repeat):
+            # Measure the work behind each response, not the response cache
+            bump_data_version()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.get(path)
+                latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        results.append(
+            Measurement(
+                f"api {path}",
+                statistics.median(latencies) * 1000,
+                "ms",
+                {
+                    "status": response.status_code,
+                    "p95_ms": nearest_rank(latencies, 0.95) * 1000,
+                    "queries": len(queries),
+                    "bytes": len(response.content),
+                },
+            )
+        )
+    return results
+
+
+def run_suite(
+    manufacturers: int = 10,
+    propellants: int = 200,
+    suppliers: int = 5,
+    years: float = 1,
+    repeat: int = 5,
+    seed: int = 0,
+) -> dict:
+    """Run every benchmark on a fresh synthetic catalogue."""
+    rng = random.Random(seed)
+    pages = fixture_pages()
+    # Versions have to persist for the matchers, but nothing outside the run
+    local_cache = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+    with (
+        scratch_database(),
+        tempfile.TemporaryDirectory() as snapshots,
+        # All stub suppliers share one host, which a crawl delay would serialise
+        override_settings(
+            CACHES=local_cache, SCRAPER_SNAPSHOT_DIR=snapshots, SCRAPER_HOST_DELAY=0
+        ),
+    ):
+        start = time.perf_counter()
+        catalogue = generate_catalogue(
+            manufacturers,
+            propellants,
+            suppliers,
+            years,
+            extra_products=fixture_products(pages),
+            seed=seed,
+        )
+        catalogue["seconds"] = time.perf_counter() - start
+        # Bulk inserts send no signals, drop any matcher built before them
+        invalidate_matchers()
+
+        names = [item.name for items in pages.values() for item in items]
+        names += [f"Maker{i % manufacturers} P{i:05} 1lb" for i in range(propellants)]
+        names += [f"Unknown powder {i}" for i in range(propellants // 10)]
+
+        measurements = benchmark_matcher(names, repeat)
+        measurements += [
+            Measurement(
+                f"parse {result.supplier} {result.backend}",
+                result.items_per_second,
+                "items/s",
+            )
+            for result in benchmark_parsers(repeat)
+        ]
+        measurements += benchmark_ingest(rng)
+        measurements += benchmark_sweep(pages)
+        measurements += benchmark_api(repeat)
+        # Last, as the imported propellants would change what the others measure
+        measurements += benchmark_import(propellants, rng)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "timestamp": timezone.now().isoformat(),
+        },
+        "catalogue": catalogue,
+        "results": [measurement.as_dict() for measurement in measurements],
+    }
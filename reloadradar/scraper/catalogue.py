@@ -0,0 +1,301 @@
+"""Bulk import of the catalogue: propellants, suppliers and their links.
+
+Rows are streamed from any iterable of dicts such as a ``csv.DictReader`` and
+resolved against maps preloaded once per import. Each batch costs one lookup
+query plus at most one insert and one update. Invalid rows are collected as
+rejects with a reason instead of aborting the import.
+"""
+# Standard Libraries
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import ClassVar
+
+# Django Libraries
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import models, transaction
+from django.db.models.functions import Lower
+
+# Project Modules
+from core.cache import bump_catalogue_version
+from core.models import Link, Manufacturer, Propellant, Supplier
+
+# App Modules
+from .matcher import WHITESPACE, normalise
+
+
+class RowError(ValueError):
+    """A row that cannot be imported, the message says why."""
+
+
+@dataclass
+class Reject:
+    line: int
+    row: dict
+    reason: str
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    rejects: list[Reject] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.created} created, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {len(self.rejects)} rejected"
+        )
+
+
+def clean(value: str | None) -> str:
+    return WHITESPACE.sub(" ", value or "").strip()
+
+
+def required(row: dict, column: str, model: type[models.Model], name: str) -> str:
+    value = clean(row.get(column))
+    if not value:
+        raise RowError(f"missing {column}")
+    max_length = model._meta.get_field(name).max_length
+    if len(value) > max_length:
+        raise RowError(f"{column} is longer than {max_length} characters")
+    return value
+
+
+class ManufacturerMap:
+    """Manufacturers by normalised name, with the scrapers' aliases applied.
+
+    Like the ``name__icontains`` lookup it replaces, a part of a name is enough
+    as long as it belongs to a single manufacturer.
+    """
+
+    def __init__(self):
+        self.names: dict[str, Manufacturer] = {}
+        for manufacturer in Manufacturer.objects.order_by("id"):
+            self.names.setdefault(normalise(manufacturer.name), manufacturer)
+        self.resolved: dict[str, Manufacturer] = dict(self.names)
+
+    def get(self, name: str) -> Manufacturer:
+        key = normalise(name)
+        if not key:
+            raise RowError("missing manufacturer")
+        if key not in self.resolved:
+            candidates = {m.id: m for full, m in self.names.items() if key in full}
+            if len(candidates) != 1:
+                problem = "ambiguous" if candidates else "unknown"
+                raise RowError(f"{problem} manufacturer {name!r}")
+            self.resolved[key] = candidates.popitem()[1]
+        return self.resolved[key]
+
+
+class CatalogueImport:
+    """Upsert ``model`` rows identified by ``key``, ``batch_size`` rows at a time.
+
+    Rows whose key already exists have their ``update_fields`` overwritten,
+    rows repeating an earlier key of the same import are rejected.
+    """
+
+    model: ClassVar[type[models.Model]]
+    update_fields: ClassVar[list[str]] = []
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def parse(self, row: dict) -> models.Model:
+        raise NotImplementedError
+
+    def key(self, instance: models.Model) -> tuple:
+        raise NotImplementedError
+
+    def existing(self, instances: list[models.Model]) -> dict[tuple, models.Model]:
+        raise NotImplementedError
+
+    def run(self, rows: Iterable[dict]) -> ImportResult:
+        result = ImportResult()
+        seen: dict[tuple, int] = {}
+        batch = []
+
+        for number, row in enumerate(rows, start=1):
+            # A DictReader knows the file line, which differs once a field spans lines
+            line = getattr(rows, "line_num", number)
+            try:
+                instance = self.parse(row)
+            except RowError as error:
+                result.rejects.append(Reject(line, row, str(error)))
+                continue
+
+            key = self.key(instance)
+            if key in seen:
+                result.rejects.append(Reject(line, row, f"repeats line {seen[key]}"))
+                continue
+            seen[key] = line
+
+            batch.append(instance)
+            if len(batch) >= self.batch_size:
+                self.flush(batch, result)
+                batch = []
+        if batch:
+            self.flush(batch, result)
+
+        # Bulk writes send no signals, so drop whatever was built from the old data
+        if result.created or result.updated:
+            bump_catalogue_version()
+        return result
+
+    @transaction.atomic
+    def flush(self, batch: list[models.Model], result: ImportResult):
+        existing = self.existing(batch)
+        attnames = [
+            self.model._meta.get_field(name).attname for name in self.update_fields
+        ]
+
+        created, updated = [], []
+        for instance in batch:
+            current = existing.get(self.key(instance))
+            if current is None:
+                created.append(instance)
+            elif any(getattr(current, a) != getattr(instance, a) for a in attnames):
+                for attname in attnames:
+                    setattr(current, attname, getattr(instance, attname))
+                updated.append(current)
+            else:
+                result.unchanged += 1
+
+        self.model.objects.bulk_create(created)
+        if updated:
+            self.model.objects.bulk_update(updated, self.update_fields)
+        result.created += len(created)
+        result.updated += len(updated)
+
+
+class PropellantImport(CatalogueImport):
+    """Columns ``name``, ``manufacturer`` and optionally ``weight`` in grams.
+
+    Propellants are identified like the ``name_weight_unique`` constraint, by
+    name regardless of case and weight. That constraint is on an expression,
+    which ``bulk_create(update_conflicts=True)`` cannot target, so existing rows
+    are looked up first and updated separately.
+    """
+
+    model = Propellant
+    update_fields = ["name", "manufacturer"]
+
+    def __init__(self, batch_size: int = 1000):
+        super().__init__(batch_size)
+        self.manufacturers = ManufacturerMap()
+        weight = Propellant._meta.get_field("weight")
+        self.weight_quantum = Decimal(1).scaleb(-weight.decimal_places)
+        self.default_weight = Decimal(weight.default).quantize(self.weight_quantum)
+        self.max_weight = Decimal(10) ** (weight.max_digits - weight.decimal_places)
+
+    def parse_weight(self, value: str | None) -> Decimal:
+        value = clean(value)
+        if not value:
+            return self.default_weight
+        try:
+            weight = Decimal(value).quantize(self.weight_quantum)
+        except InvalidOperation:
+            raise RowError(f"invalid weight {value!r}") from None
+        if weight.is_nan() or not 0 < weight < self.max_weight:
+            raise RowError(f"weight {value} out of range")
+        return weight
+
+    def parse(self, row: dict) -> Propellant:
+        return Propellant(
+            name=required(row, "name", Propellant, "name"),
+            weight=self.parse_weight(row.get("weight")),
+            manufacturer=self.manufacturers.get(row.get("manufacturer") or ""),
+        )
+
+    def key(self, propellant: Propellant) -> tuple:
+        return propellant.name.lower(), propellant.weight
+
+    def existing(self, propellants: list[Propellant]) -> dict[tuple, Propellant]:
+        found = Propellant.objects.annotate(lower_name=Lower("name")).filter(
+            lower_name__in={propellant.name.lower() for propellant in propellants}
+        )
+        return {self.key(propellant): propellant for propellant in found}
+
+
+class SupplierImport(CatalogueImport):
+    """Column ``name``, suppliers that already exist regardless of case are kept."""
+
+    model = Supplier
+
+    def parse(self, row: dict) -> Supplier:
+        return Supplier(name=required(row, "name", Supplier, "name"))
+
+    def key(self, supplier: Supplier) -> tuple:
+        return (supplier.name.lower(),)
+
+    def existing(self, suppliers: list[Supplier]) -> dict[tuple, Supplier]:
+        found = (
+            Supplier.objects.annotate(lower_name=Lower("name"))
+            .filter(lower_name__in={supplier.name.lower() for supplier in suppliers})
+            .order_by("-id")
+        )
+        # The oldest supplier wins when several share a name
+        return {self.key(supplier): supplier for supplier in found}
+
+
+class LinkImport(CatalogueImport):
+    """Columns ``owner``, ``link_type`` and ``link_url``.
+
+    ``owner`` names a supplier, or a manufacturer if ``owner_type`` says so.
+    """
+
+    model = Link
+    validate_url = URLValidator()
+
+    def __init__(self, batch_size: int = 1000):
+        super().__init__(batch_size)
+        self.manufacturers = ManufacturerMap()
+        self.suppliers: dict[str, Supplier] = {}
+        for supplier in Supplier.objects.order_by("id"):
+            self.suppliers.setdefault(supplier.name.lower(), supplier)
+        self.content_types = ContentType.objects.get_for_models(Supplier, Manufacturer)
+
+    def owner(self, row: dict) -> models.Model:
+        owner_type = clean(row.get("owner_type")).lower() or "supplier"
+        name = clean(row.get("owner"))
+        if owner_type == "manufacturer":
+            return self.manufacturers.get(name)
+        if owner_type != "supplier":
+            raise RowError(f"unknown owner_type {owner_type!r}")
+        if not name:
+            raise RowError("missing owner")
+        if name.lower() not in self.suppliers:
+            raise RowError(f"unknown supplier {name!r}")
+        return self.suppliers[name.lower()]
+
+    def parse(self, row: dict) -> Link:
+        url = required(row, "link_url", Link, "link_url")
+        try:
+            self.validate_url(url)
+        except ValidationError:
+            raise RowError(f"invalid link_url {url!r}") from None
+
+        owner = self.owner(row)
+        return Link(
+            link_type=required(row, "link_type", Link, "link_type").lower(),
+            link_url=url,
+            content_type=self.content_types[type(owner)],
+            object_id=owner.id,
+        )
+
+    def key(self, link: Link) -> tuple:
+        return link.content_type_id, link.object_id, link.link_type, link.link_url
+
+    def existing(self, links: list[Link]) -> dict[tuple, Link]:
+        found = Link.objects.filter(link_url__in={link.link_url for link in links})
+        return {self.key(link): link for link in found}
+
+
+IMPORTS: dict[str, type[CatalogueImport]] = {
+    "propellants": PropellantImport,
+    "suppliers": SupplierImport,
+    "links": LinkImport,
+}
@@ -0,0 +1,191 @@
+"""Shared HTTP client for every request made to supplier sites.
+
+One pooled session serves all scrapes in a process, so links on the same host
+reuse keep-alive connections instead of opening one each. Requests to a host
+are spaced by its crawl delay, the larger of ``SCRAPER_HOST_DELAY`` (or its
+``SCRAPER_HOST_DELAYS`` override) and what the host's robots.txt asks for.
+Connection errors and throttling or server error responses are retried with
+exponential backoff, honouring Retry-After. Responses are compressed with
+whatever urllib3 can decode, brotli needs the ``brotli`` package installed.
+"""
+# Standard Libraries
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+# Third Party Libraries
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from requests_html import HTMLSession
+from urllib3.util.retry import Retry
+
+# Django Libraries
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class HostState:
+    # Held while reading robots.txt and reserving the next request slot
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    next_slot: float = 0.0
+    robots: RobotFileParser | None = None
+    robots_expires: float = 0.0
+
+
+class FetchClient(HTMLSession):
+    """``HTMLSession`` with per host connection pools, crawl delays and retries.
+
+    At most ``SCRAPER_PER_HOST_CONCURRENCY`` connections are open to a host,
+    further threads wait for one to be free. The session is safe to share
+    between threads, use ``get_client`` rather than creating one per scrape.
+    """
+
+    def __init__(self, timeout: float | None = None):
+        super().__init__()
+        self.timeout = timeout or settings.SCRAPER_TIMEOUT
+        retries = Retry(
+            total=settings.SCRAPER_RETRIES,
+            backoff_factor=settings.SCRAPER_RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["GET", "HEAD"],
+            # Hand the last response back rather than raising, like without retries
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_maxsize=settings.SCRAPER_PER_HOST_CONCURRENCY,
+            pool_block=True,
+            max_retries=retries,
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.hosts: dict[str, HostState] = {}
+        self.hosts_lock = threading.Lock()
+
+    def host_state(self, host: str) -> HostState:
+        with self.hosts_lock:
+            return self.hosts.setdefault(host, HostState())
+
+    def robots(self, url: str, state: HostState) -> RobotFileParser | None:
+        """The host's robots.txt rules, read again every ``SCRAPER_ROBOTS_TTL``."""
+        if time.monotonic() < state.robots_expires:
+            return state.robots
+
+        parts = urlsplit(url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        try:
+            # Bypasses request(), the caller already holds the host's lock
+            response = super().request("GET", robots_url, timeout=self.timeout)
+        except RequestException as e:
+            logger.warning("Could not read %s: %r", robots_url, e)
+            state.robots = None
+        else:
+            if response.ok:
+                state.robots = RobotFileParser(robots_url)
+                state.robots.parse(response.text.splitlines())
+            else:
+                state.robots = None
+        state.robots_expires = (
+            time.monotonic() + settings.SCRAPER_ROBOTS_TTL.total_seconds()
+        )
+        return state.robots
+
+    def crawl_delay(self, url: str, state: HostState) -> float:
+        host = urlsplit(url).netloc
+        delay = settings.SCRAPER_HOST_DELAYS.get(host, settings.SCRAPER_HOST_DELAY)
+        if (robots := self.robots(url, state)) is not None:
+            agent = self.headers["User-Agent"]
+            if (crawl_delay := robots.crawl_delay(agent)) is not None:
+                delay = max(delay, float(crawl_delay))
+            if (rate := robots.request_rate(agent)) is not None and rate.requests:
+                delay = max(delay, rate.seconds / rate.requests)
+        return delay
+
+    def wait_turn(self, url: str):
+        """Sleep until the host of ``url`` may be sent another request."""
+        state = self.host_state(urlsplit(url).netloc)
+        with state.lock:
+            delay = self.crawl_delay(url, state)
+            now = time.monotonic()
+            start = max(now, state.next_slot)
+            state.next_slot = start + delay
+        if start > now:
+            time.sleep(start - now)
+
+    def request(self, method: str, url: str, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        self.wait_turn(url)
+        return super().request(method, url, **kwargs)
+
+
+_client: FetchClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FetchClient:
+    """Return the process wide client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FetchClient()
+        return _client
+
+
+class AsyncFetcher:
+    """Fetch many supplier pages at once through the shared client.
+
+    Requests run on a thread pool, so keep-alive connections are reused, while a
+    semaphore per host caps how many requests hit the same supplier concurrently.
+    """
+
+    def __init__(
+        self,
+        per_host_limit: int | None = None,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+        client: FetchClient | None = None,
+    ):
+        self.per_host_limit = per_host_limit or settings.SCRAPER_PER_HOST_CONCURRENCY
+        self.timeout = timeout or settings.SCRAPER_TIMEOUT
+        self.max_workers = max_workers
+        self.client = client or get_client()
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.thread_pool.shutdown(wait=False)
+
+    def host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def fetch(self, url: str, headers: dict[str, str] | None = None):
+        get = partial(self.client.get, url, headers=headers, timeout=self.timeout)
+        async with self.host_limit(url):
+            return await asyncio.get_running_loop().run_in_executor(
+                self.thread_pool, get
+            )
+
+    async def fetch_all(
+        self, urls: list[str], headers: list[dict[str, str]] | None = None
+    ) -> list:
+        """Fetch all ``urls`` concurrently, returning responses or raised exceptions in order."""
+        headers = headers or [None] * len(urls)
+        return await asyncio.gather(
+            *(self.fetch(url, extra) for url, extra in zip(urls, headers)),
+            return_exceptions=True,
+        )
@@ -0,0 +1,245 @@
+# Standard Libraries
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+# Django Libraries
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+# Project Modules
+from core.cache import bump_data_version
+from core.models import LatestPrice, PriceChange, Pricing, Supplier
+
+# App Modules
+from .matcher import normalise
+from .models import UnmatchedItem
+
+# Matches the decimal_places of Pricing.price
+PRICE_QUANTUM = Decimal("0.001")
+
+
+@dataclass
+class IngestResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    unmatched_items: list[dict] = field(default_factory=list)
+    # Matched items whose price could not be read, with the reason as "error"
+    failed_items: list[dict] = field(default_factory=list)
+    product_ids: list[int] = field(default_factory=list)
+    new_prices: list[Pricing] = field(default_factory=list)
+
+    @property
+    def unmatched(self) -> int:
+        return len(self.unmatched_items)
+
+    @property
+    def failed(self) -> int:
+        return len(self.failed_items)
+
+    @property
+    def items(self) -> int:
+        return (
+            self.inserted + self.updated + self.unchanged + self.unmatched + self.failed
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged, "
+            f"{self.unmatched} unmatched, {self.failed} failed"
+        )
+
+
+def to_price(value) -> Decimal:
+    # Go through str so scraped floats such as 12.99 compare equal to the stored value
+    return Decimal(str(value)).quantize(PRICE_QUANTUM)
+
+
+def latest_prices(product_model, supplier: Supplier, products) -> dict[int, Pricing]:
+    """Return the most recent Pricing per product id for ``supplier`` in one query."""
+    products = {product.id: product for product in products}
+    pricings = Pricing.objects.filter(
+        content_type=ContentType.objects.get_for_model(product_model),
+        supplier=supplier,
+        object_id__in=products,
+    )
+    latest_ids = (
+        pricings.values("object_id").annotate(latest=Max("id")).values("latest")
+    )
+
+    latest = {}
+    for pricing in Pricing.objects.filter(id__in=latest_ids):
+        pricing.content_object = products[pricing.object_id]
+        latest[pricing.object_id] = pricing
+    return latest
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ingest_prices(
+    product_model,
+    supplier: Supplier,
+    items: Iterable[dict],
+    find_product: Callable,
+    batch_size: int = 500,
+    run=None,
+) -> IngestResult:
+    """Record a price for every scraped item whose price differs from the last one seen.
+
+    Items are consumed in batches so a streamed listing never has to be held in
+    memory. Each batch is matched in memory, compared against the latest prices
+    fetched in a single query and the changed ones written with one
+    ``bulk_create``, together with the LatestPrice rows of its products and a
+    PriceChange event per product whose price changed.
+
+    Within a ``run`` there is at most one price per product: a price the run
+    already recorded, before a crash or earlier in the listing, is updated.
+    """
+    result = IngestResult()
+    current: dict[int, Pricing] = {}
+    content_type = ContentType.objects.get_for_model(product_model)
+    for batch in batched(items, batch_size):
+        matched = []
+        for item in batch:
+            product = find_product(item["name"])
+            if product is None:
+                result.unmatched_items.append(item)
+            else:
+                matched.append((product, item))
+
+        with transaction.atomic():
+            unseen = {
+                product.id: product
+                for product, _ in matched
+                if product.id not in current
+            }
+            current.update(latest_prices(product_model, supplier, unseen.values()))
+
+            new_prices, updated, changes = [], {}, {}
+            for product, item in matched:
+                try:
+                    price = to_price(item["price"])
+                except (InvalidOperation, KeyError):
+                    error = f"invalid price {item.get('price')!r}"
+                    result.failed_items.append({**item, "error": error})
+                    continue
+                last = current.get(product.id)
+                if last and last.price == price:
+                    result.unchanged += 1
+                    continue
+
+                # A product listed twice in a batch changes once, from the first price
+                if product.id in changes:
+                    changes[product.id].new_price = price
+                else:
+                    changes[product.id] = PriceChange(
+                        content_type=content_type,
+                        object_id=product.id,
+                        manufacturer_id=getattr(product, "manufacturer_id", None),
+                        supplier=supplier,
+                        old_price=last.price if last else None,
+                        new_price=price,
+                    )
+
+                if run is not None and last and last.run_id == run.id:
+                    last.price, last.price_url = price, item["url"]
+                    result.updated += 1
+                    # Unsaved prices are still waiting in new_prices
+                    if last.pk is not None:
+                        updated[last.pk] = last
+                    continue
+
+                current[product.id] = Pricing(
+                    content_object=product,
+                    price=price,
+                    supplier=supplier,
+                    price_url=item["url"],
+                    run_id=run.id if run is not None else None,
+                )
+                new_prices.append(current[product.id])
+
+            Pricing.objects.bulk_create(new_prices)
+            Pricing.objects.bulk_update(updated.values(), ["price", "price_url"])
+            PriceChange.objects.bulk_create(changes.values())
+            LatestPrice.objects.record(
+                list(
+                    {
+                        product.id: current[product.id]
+                        for product, _ in matched
+                        # A product whose only price failed to parse has none
+                        if product.id in current
+                    }.values()
+                ),
+                seen=timezone.now(),
+            )
+            result.inserted += len(new_prices)
+            result.new_prices.extend(new_prices + list(updated.values()))
+
+    if result.inserted or result.updated:
+        bump_data_version()
+    result.product_ids = list(current)
+    return result
+
+
+def record_misses(
+    product_model,
+    supplier: Supplier,
+    items: Iterable[dict],
+    seen=None,
+    batch_size: int = 500,
+) -> int:
+    """Add unmatched and failed items to the UnmatchedItem ledger in one go.
+
+    Items are counted per normalised name, so a name listed on every page of
+    every run stays one row. Returns the number of distinct names.
+    """
+    seen = seen or timezone.now()
+    content_type = ContentType.objects.get_for_model(product_model)
+    misses: dict[str, tuple[int, dict]] = {}
+    for item in items:
+        name = normalise(str(item.get("name") or ""))[:256]
+        count = misses[name][0] if name in misses else 0
+        misses[name] = (count + 1, item)
+
+    with transaction.atomic():
+        for names in batched(misses, batch_size):
+            existing = {
+                row.name: row
+                for row in UnmatchedItem.objects.filter(
+                    supplier=supplier, content_type=content_type, name__in=names
+                )
+            }
+            created, updated = [], []
+            for name in names:
+                count, item = misses[name]
+                row = existing.get(name)
+                if row is None:
+                    row = UnmatchedItem(
+                        supplier=supplier,
+                        content_type=content_type,
+                        name=name,
+                        first_seen=seen,
+                    )
+                    created.append(row)
+                else:
+                    updated.append(row)
+                row.occurrences += count
+                row.raw_name = str(item.get("name") or "")[:256]
+                row.url = str(item.get("url") or "")[:512]
+                row.error = item.get("error", "")[:256]
+                row.last_seen = seen
+
+            UnmatchedItem.objects.bulk_create(created)
+            UnmatchedItem.objects.bulk_update(
+                updated, ["occurrences", "raw_name", "url", "error", "last_seen"]
+            )
+    return len(misses)
@@ -0,0 +1,60 @@
+# Standard Libraries
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+
+# Django Libraries
+from django.db import connection
+
+STAGES = ("fetch", "parse", "match", "persist")
+
+
+@dataclass
+class ScrapeMetrics:
+    """Counters and accumulated stage timings of scraping one link."""
+
+    timings: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(STAGES, 0.0)
+    )
+    http_status: int | None = None
+    bytes: int = 0
+    pages: int = 0
+    queries: int = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += perf_counter() - start
+
+    @contextmanager
+    def exclusive_stage(self, name: str) -> Iterator[None]:
+        """Time ``name`` minus the other stages that run inside it.
+
+        Items are streamed, so persisting a batch also pulls in the fetching,
+        parsing and matching of the next one.
+        """
+        start, nested = perf_counter(), sum(self.timings.values())
+        try:
+            yield
+        finally:
+            inner = sum(self.timings.values()) - nested
+            self.timings[name] += perf_counter() - start - inner
+
+    def record_response(self, response):
+        if self.http_status is None:
+            self.http_status = response.status_code
+        self.bytes += len(response.content)
+        self.pages += 1
+
+    @contextmanager
+    def count_queries(self) -> Iterator[None]:
+        def count(execute, sql, params, many, context):
+            self.queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            yield
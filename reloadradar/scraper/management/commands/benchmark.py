@@ -0,0 +1,80 @@
+# Standard Libraries
+import json
+import logging
+
+# Django Libraries
+from django.core.management.base import BaseCommand
+
+# App Modules
+from ...benchmarks.suite import run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark matching, parsing, ingestion, a sweep of the saved supplier pages "
+        "and the API on a synthetic catalogue in a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--manufacturers", type=int, default=10)
+        parser.add_argument("--propellants", type=int, default=200)
+        parser.add_argument("--suppliers", type=int, default=5)
+        parser.add_argument(
+            "--years", type=float, default=1, help="Years of weekly price history."
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", help="Also write the JSON results to this file."
+        )
+        parser.add_argument(
+            "--compare", help="JSON results of an earlier run to show changes against."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the results as JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["verbosity"] < 2:
+            logging.getLogger("scraper").setLevel(logging.WARNING)
+
+        report = run_suite(
+            manufacturers=options["manufacturers"],
+            propellants=options["propellants"],
+            suppliers=options["suppliers"],
+            years=options["years"],
+            repeat=options["repeat"],
+            seed=options["seed"],
+        )
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                results = json.load(file)["results"]
+            baseline = {result["name"]: result["value"] for result in results}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        catalogue = report["catalogue"]
+        self.stdout.write(
+            f"Catalogue: {catalogue['propellants']} propellants, "
+            f"{catalogue['suppliers']} suppliers, {catalogue['pricings']} prices "
+            f"generated in {catalogue['seconds']:.1f}s"
+        )
+        for result in report["results"]:
+            extra = ", ".join(
+                f"{key}={value}" for key, value in result["extra"].items()
+            )
+            change = ""
+            if baseline.get(result["name"]):
+                change = f"{result['value'] / baseline[result['name']] - 1:+.1%}"
+            self.stdout.write(
+                f"{result['name']:<40} {result['value']:>14,.3f} {result['unit']:<8} "
+                f"{change:>8} {extra}"
+            )
@@ -0,0 +1,31 @@
+# Standard Libraries
+import json
+
+# Django Libraries
+from django.core.management.base import BaseCommand
+
+# App Modules
+from ...benchmarks.parsers import benchmark_parsers
+
+
+class Command(BaseCommand):
+    help = "Compare the HTML parsing backends on the saved supplier pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--json", action="store_true", help="Print the results as JSON."
+        )
+
+    def handle(self, *args, **options):
+        results = benchmark_parsers(repeat=options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps([r.as_dict() for r in results], indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result.supplier:<16} {result.backend:<14} {result.items:>4} items "
+                f"{result.items_per_second:>12,.0f} items/s"
+            )
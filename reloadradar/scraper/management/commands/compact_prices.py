@@ -0,0 +1,36 @@
+# Standard Libraries
+from datetime import timedelta
+
+# Django Libraries
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# App Modules
+from ...retention import compact_prices, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = "Archive old raw prices and replace them with daily summaries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.PRICING_RETENTION.days,
+            metavar="DAYS",
+            help="Compact prices retrieved more than this many days ago.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the prices that would be compacted.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(timedelta(days=options["older_than"]))
+        result = compact_prices(cutoff, dry_run=options["dry_run"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{result.archived} prices before {cutoff} to compact.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Compacted: {result}."))
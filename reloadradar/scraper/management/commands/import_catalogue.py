@@ -0,0 +1,50 @@
+# Standard Libraries
+import csv
+import sys
+
+# Django Libraries
+from django.core.management.base import BaseCommand
+
+# App Modules
+from ...catalogue import IMPORTS
+
+
+class Command(BaseCommand):
+    help = "Create or update propellants, suppliers or links from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=list(IMPORTS))
+        parser.add_argument("path", help="CSV file with a header row, - for stdin.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows written per insert and update.",
+        )
+        parser.add_argument(
+            "--rejects",
+            help="Write rejected rows, with the reason, to this CSV file.",
+        )
+
+    def handle(self, *args, **options):
+        importer = IMPORTS[options["kind"]](batch_size=options["batch_size"])
+        if options["path"] == "-":
+            result = importer.run(csv.DictReader(sys.stdin))
+        else:
+            with open(options["path"], newline="") as csv_file:
+                result = importer.run(csv.DictReader(csv_file))
+
+        if result.rejects and options["rejects"]:
+            columns = ["line", "reason", *result.rejects[0].row]
+            with open(options["rejects"], "w", newline="") as csv_file:
+                writer = csv.DictWriter(csv_file, columns, extrasaction="ignore")
+                writer.writeheader()
+                for reject in result.rejects:
+                    writer.writerow(
+                        {**reject.row, "line": reject.line, "reason": reject.reason}
+                    )
+        else:
+            for reject in result.rejects:
+                self.stderr.write(f"Line {reject.line}: {reject.reason}")
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {options['kind']}: {result}."))
@@ -0,0 +1,66 @@
+# Standard Libraries
+import csv
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Django Libraries
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Project Modules
+from core.models import Supplier
+
+# App Modules
+from ...models import Snapshot
+from ...snapshots import SnapshotStore
+
+
+class Command(BaseCommand):
+    help = "Move the hourly scrape CSV files into the snapshot store."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            type=Path,
+            default=settings.BASE_DIR / "scraper" / "output",
+            help="Directory holding <product>/<supplier id>/<hour>.csv files.",
+        )
+        parser.add_argument(
+            "--delete", action="store_true", help="Remove each CSV once imported."
+        )
+
+    def handle(self, *args, **options):
+        store = SnapshotStore()
+        suppliers = Supplier.objects.in_bulk()
+        imported = 0
+
+        for path in sorted(options["source"].glob("*/*/*.csv")):
+            # Error logs and catalogue files are not named after the hour
+            try:
+                taken = datetime.strptime(path.stem, "%Y-%m-%d-%H")
+            except ValueError:
+                continue
+            taken = taken.replace(tzinfo=timezone.utc)
+            product_type = path.parent.parent.name
+            try:
+                supplier = suppliers.get(int(path.parent.name))
+            except ValueError:
+                self.stderr.write(f"Skipping {path}, not under a supplier id")
+                continue
+            if supplier is None:
+                self.stderr.write(f"Skipping {path}, unknown supplier")
+                continue
+
+            if not Snapshot.objects.filter(
+                supplier=supplier, product_type=product_type, taken=taken
+            ).exists():
+                with open(path, newline="") as csv_file:
+                    store.write(
+                        supplier, product_type, csv.DictReader(csv_file), taken=taken
+                    )
+                imported += 1
+
+            if options["delete"]:
+                path.unlink()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} CSV files."))
@@ -0,0 +1,74 @@
+# Django Libraries
+from django.core.management.base import BaseCommand, CommandError
+
+# Project Modules
+from core.models import LatestPrice
+
+# App Modules
+from ...benchmarks.load import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running servers on the same paths and compare throughput and "
+        "latency, e.g. the WSGI app under gunicorn against the ASGI app under "
+        "uvicorn: --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            metavar="NAME=URL",
+            help="Server to load, repeat to compare several.",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, by default the async price endpoints.",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def default_paths(self) -> list[str]:
+        """The async endpoints, for a supplier and product with current prices."""
+        latest = LatestPrice.objects.order_by("id").first()
+        if latest is None:
+            raise CommandError("No prices recorded yet, pass --path instead.")
+        return [
+            "/api/async/latest-prices/cheapest/",
+            f"/api/async/suppliers/{latest.supplier_id}/prices/",
+            f"/api/async/propellants/{latest.object_id}/history/",
+        ]
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, _, url = target.partition("=")
+            if not url:
+                raise CommandError(f"Expected NAME=URL, got {target!r}.")
+            targets.append((name, url))
+        paths = options["paths"] or self.default_paths()
+
+        self.stdout.write(
+            f"{'target':<8} {'path':<48} {'req/s':>9} {'p50 ms':>9} "
+            f"{'p99 ms':>9} {'errors':>7}"
+        )
+        for path in paths:
+            for name, url in targets:
+                result = run_load(
+                    name,
+                    url,
+                    path,
+                    requests=options["requests"],
+                    concurrency=options["concurrency"],
+                    timeout=options["timeout"],
+                )
+                self.stdout.write(
+                    f"{name:<8} {path:<48} {result.throughput:>9,.1f} "
+                    f"{result.percentile(0.5) * 1000:>9.2f} "
+                    f"{result.percentile(0.99) * 1000:>9.2f} {result.errors:>7}"
+                )
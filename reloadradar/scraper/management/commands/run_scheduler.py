@@ -0,0 +1,32 @@
+# Standard Libraries
+import signal
+
+# Django Libraries
+from django.core.management.base import BaseCommand
+
+# App Modules
+from ...scheduler import Scheduler
+
+
+class Command(BaseCommand):
+    help = "Scrape every link continuously, each on its own schedule."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, help="Maximum number of links scraped at once."
+        )
+        parser.add_argument(
+            "--refresh",
+            type=float,
+            default=300,
+            help="Seconds between checks for added or removed links.",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler(workers=options["workers"], refresh=options["refresh"])
+        signal.signal(signal.SIGINT, scheduler.stop)
+        signal.signal(signal.SIGTERM, scheduler.stop)
+
+        self.stdout.write(f"Scheduler started with {scheduler.workers} workers.")
+        scheduler.run()
+        self.stdout.write("Scheduler stopped.")
@@ -0,0 +1,95 @@
+# Standard Libraries
+import time
+
+# Django Libraries
+from django.core.management.base import BaseCommand, CommandError
+
+# Project Modules
+from core.models import Link
+
+# App Modules
+from ...models import ScrapeRun
+from ...orchestrator import sweep
+
+
+class Command(BaseCommand):
+    help = "Fetch every supplier link concurrently and process the scraped prices."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--link",
+            type=int,
+            nargs="+",
+            dest="links",
+            help="Only scrape these Link ids.",
+        )
+        parser.add_argument(
+            "--per-host",
+            type=int,
+            help="Maximum concurrent requests per supplier host.",
+        )
+        parser.add_argument("--timeout", type=float, help="Request timeout in seconds.")
+        parser.add_argument(
+            "--no-process",
+            action="store_false",
+            dest="process",
+            help="Fetch and parse only, without recording prices.",
+        )
+        parser.add_argument(
+            "--resume",
+            nargs="?",
+            type=int,
+            const=0,
+            metavar="RUN",
+            help="Retry the unfinished and failed links of a sweep, by default the latest.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_false",
+            dest="conditional",
+            help="Re-process every page, even when it is unchanged since the last run.",
+        )
+
+    def handle(self, *args, **options):
+        links = Link.objects.select_related("scrape_state").prefetch_related(
+            "content_object"
+        )
+        if options["links"]:
+            links = links.filter(id__in=options["links"])
+
+        run = None
+        if options["resume"] is not None:
+            runs = ScrapeRun.objects.filter(trigger=ScrapeRun.SWEEP)
+            if options["resume"]:
+                runs = runs.filter(id=options["resume"])
+            # An older sweep is superseded by the latest, even if links of it failed
+            run = runs.order_by("-started", "-id").first()
+            if run is None or not run.remaining().exists():
+                raise CommandError("No unfinished sweep to resume.")
+            self.stdout.write(f"Resuming {run}, {run.remaining().count()} links left.")
+
+        start = time.perf_counter()
+        results = sweep(
+            links,
+            process=options["process"],
+            conditional=options["conditional"],
+            run=run,
+            per_host_limit=options["per_host"],
+            timeout=options["timeout"],
+        )
+        elapsed = time.perf_counter() - start
+
+        for result in results:
+            if result.ok and result.scraper.unchanged:
+                self.stdout.write(f"SAME {result.scraper}")
+            elif result.ok:
+                self.stdout.write(self.style.SUCCESS(f"OK   {result.scraper}"))
+            else:
+                self.stdout.write(
+                    self.style.ERROR(f"FAIL {result.link}: {result.error!r}")
+                )
+
+        failed = sum(not result.ok for result in results)
+        self.stdout.write(
+            f"Scraped {len(results)} links in {elapsed:.2f}s, {failed} failed."
+        )
@@ -0,0 +1,157 @@
+# Standard Libraries
+import re
+from collections import deque
+
+# Django Libraries
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Project Modules
+from core.cache import bump_catalogue_version, catalogue_version
+from core.models import Manufacturer
+
+# App Modules
+from .models import ProductAlias
+
+# Common misspellings seen on supplier sites, applied before matching
+MANUFACTURER_ALIASES = {
+    "VIHTAVOURI": "VIHTAVUORI",
+}
+
+# Abbreviated product lines, expanded when they start a word, e.g. "RL16"
+PRODUCT_ALIASES = {
+    "RL": "RELODER",
+    "RELOADER": "RELODER",
+}
+
+WHITESPACE = re.compile(r"\s+")
+PRODUCT_ALIAS = re.compile(rf"\b({'|'.join(PRODUCT_ALIASES)})[\s-]*(?=\d)")
+
+
+def normalise(name: str) -> str:
+    name = name.upper()
+    for alias, manufacturer in MANUFACTURER_ALIASES.items():
+        name = name.replace(alias, manufacturer)
+    name = PRODUCT_ALIAS.sub(lambda match: PRODUCT_ALIASES[match[1]] + " ", name)
+    return WHITESPACE.sub(" ", name).strip().lower()
+
+
+class Automaton:
+    """Aho-Corasick automaton returning the longest pattern contained in a text."""
+
+    def __init__(self, patterns: dict[str, object]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.match: list[tuple[int, object] | None] = [None]
+
+        for pattern, value in patterns.items():
+            if pattern:
+                self._insert(pattern, value)
+        self._link()
+
+    def _insert(self, pattern: str, value):
+        node = 0
+        for char in pattern:
+            if char not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.match.append(None)
+                self.goto[node][char] = len(self.goto) - 1
+            node = self.goto[node][char]
+        if self.match[node] is None:
+            self.match[node] = (len(pattern), value)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # A node without its own pattern reports the longest suffix pattern
+                if self.match[child] is None:
+                    self.match[child] = self.match[self.fail[child]]
+
+    def longest(self, text: str):
+        node, best = 0, None
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            found = self.match[node]
+            if found and (best is None or found[0] > best[0]):
+                best = found
+        return best[1] if best else None
+
+
+class ProductMatcher:
+    """Prebuilt index mapping scraped item names to products without hitting the DB."""
+
+    def __init__(self, product_model):
+        products = list(product_model.objects.order_by("id"))
+        self.manufacturers = Automaton(
+            {normalise(m.name): m for m in Manufacturer.objects.order_by("id")}
+        )
+
+        # The oldest product wins when several share a name, e.g. different weights
+        everything: dict[str, object] = {}
+        by_manufacturer: dict[int, dict[str, object]] = {}
+        for product in products:
+            key = normalise(product.name)
+            everything.setdefault(key, product)
+            by_manufacturer.setdefault(product.manufacturer_id, {}).setdefault(
+                key, product
+            )
+        # Aliases, such as mapped unmatched items, after the real names
+        aliases = ProductAlias.objects.filter(
+            content_type=ContentType.objects.get_for_model(product_model)
+        ).values_list("name", "object_id")
+        by_id = {product.id: product for product in products}
+        for alias, product_id in aliases:
+            product = by_id.get(product_id)
+            if product is not None:
+                everything.setdefault(alias, product)
+                by_manufacturer.setdefault(product.manufacturer_id, {}).setdefault(
+                    alias, product
+                )
+
+        self.products = {
+            manufacturer_id: Automaton(patterns)
+            for manufacturer_id, patterns in by_manufacturer.items()
+        }
+        self.all_products = Automaton(everything)
+
+    def find(self, name: str):
+        name = normalise(name)
+        manufacturer = self.manufacturers.longest(name)
+        if manufacturer:
+            automaton = self.products.get(manufacturer.id)
+            return automaton.longest(name) if automaton else None
+        return self.all_products.longest(name)
+
+
+# Matchers by product model, with the catalogue version they were built from
+_matchers: dict[type, tuple[int, ProductMatcher]] = {}
+
+
+def get_matcher(product_model) -> ProductMatcher:
+    """Return the matcher for ``product_model``, rebuilt when the catalogue changed.
+
+    The catalogue version is shared between processes, so the scheduler picks up
+    products and aliases added through the web process too.
+    """
+    version = catalogue_version()
+    cached = _matchers.get(product_model)
+    if cached is None or cached[0] != version:
+        cached = _matchers[product_model] = (version, ProductMatcher(product_model))
+    return cached[1]
+
+
+@receiver([post_save, post_delete], sender=ProductAlias)
+def invalidate_matchers(**kwargs):
+    """Have every process rebuild its matchers on next use."""
+    bump_catalogue_version()
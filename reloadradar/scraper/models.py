@@ -1,7 +1,335 @@
+# Standard Libraries
+import hashlib
+
 # Django Libraries
-# from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+# Project Modules
+from core.cache import bump_catalogue_version
+from core.models import Link, Pricing, Supplier
+
+
+class LinkState(models.Model):
+    """HTTP validators, body hash and schedule of a Link."""
+
+    link = models.OneToOneField(
+        Link, on_delete=models.CASCADE, related_name="scrape_state"
+    )
+    etag = models.CharField(max_length=256, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+
+    last_changed = models.DateTimeField(null=True, blank=True)
+    last_confirmed = models.DateTimeField(null=True, blank=True)
+    # Products found on the page last time it changed, re-confirmed when it has not
+    product_ids = models.JSONField(default=list, blank=True)
+
+    # Scheduling, persisted so a restarted scheduler resumes where it left off
+    next_due = models.DateTimeField(null=True, blank=True, db_index=True)
+    failures = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self) -> str:
+        return f"State of {self.link}"
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def is_unchanged(self, response) -> bool:
+        if response.status_code == 304:
+            return True
+        return bool(self.content_hash) and (
+            self.content_hash == self.hash_content(response.content)
+        )
+
+
+class SnapshotQuerySet(models.QuerySet):
+    def latest_for(self, supplier: Supplier, product_type: str):
+        return (
+            self.filter(supplier=supplier, product_type=product_type)
+            .order_by("-taken")
+            .first()
+        )
+
+
+class Snapshot(models.Model):
+    """Manifest entry for one scrape run written to the snapshot store."""
+
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, related_name="snapshots"
+    )
+    product_type = models.CharField(max_length=32)
+    taken = models.DateTimeField()
+    # Relative to SCRAPER_SNAPSHOT_DIR
+    path = models.CharField(max_length=256, unique=True)
+    rows = models.PositiveIntegerField()
+
+    objects = SnapshotQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["supplier", "product_type", "taken"]),
+            models.Index(fields=["taken"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_type} snapshot of {self.supplier} at {self.taken}"
+
+
+class ScrapeRun(models.Model):
+    """Journal of one sweep, or of one link scraped by the scheduler.
+
+    Prices recorded during a run keep its id in ``Pricing.run_id``, so a
+    resumed run never records two prices for the same product and supplier.
+    """
+
+    SWEEP = "sweep"
+    SCHEDULER = "scheduler"
+    TRIGGERS = [(SWEEP, "Sweep"), (SCHEDULER, "Scheduler")]
+
+    trigger = models.CharField(max_length=16, choices=TRIGGERS)
+    started = models.DateTimeField(default=timezone.now, db_index=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.get_trigger_display()} run at {self.started}"
+
+    def prices(self):
+        return Pricing.objects.filter(run_id=self.id)
+
+    def remaining(self):
+        """Tasks that never finished or failed, scraped again on resume."""
+        return self.tasks.filter(status__in=ScrapeTask.RESUMABLE)
+
+
+class ScrapeTask(models.Model):
+    """State, counters and per-stage timings of scraping one link in a run."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    OK = "ok"
+    UNCHANGED = "unchanged"
+    FAILED = "failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (OK, "OK"),
+        (UNCHANGED, "Unchanged"),
+        (FAILED, "Failed"),
+    ]
+    # A task still running when its run is resumed has crashed with it
+    RESUMABLE = [PENDING, RUNNING, FAILED]
+    FINISHED = [OK, UNCHANGED, FAILED]
+
+    run = models.ForeignKey(
+        ScrapeRun,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="tasks",
+    )
+    link = models.ForeignKey(
+        Link, on_delete=models.CASCADE, related_name="scrape_tasks"
+    )
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, related_name="scrape_tasks"
+    )
+    status = models.CharField(max_length=16, choices=STATUSES, default=PENDING)
+    error = models.TextField(blank=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    http_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    bytes = models.PositiveIntegerField(default=0)
+    pages = models.PositiveIntegerField(default=0)
+    items = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    queries = models.PositiveIntegerField(default=0)
+
+    fetch_seconds = models.FloatField(default=0)
+    parse_seconds = models.FloatField(default=0)
+    match_seconds = models.FloatField(default=0)
+    persist_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "link"], name="scrape_task_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["run", "status"]),
+            models.Index(fields=["link", "started"]),
+            models.Index(fields=["supplier", "started"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.status} {self.link} at {self.started}"
+
+    @property
+    def duration(self) -> float | None:
+        if self.started is None or self.finished is None:
+            return None
+        return (self.finished - self.started).total_seconds()
+
+
+class ScrapeTotalQuerySet(models.QuerySet):
+    def add(self, task: ScrapeTask):
+        """Count a finished task in the totals of its supplier and status."""
+        total, _ = self.get_or_create(supplier_id=task.supplier_id, status=task.status)
+        finished = Value(task.finished)
+        self.filter(pk=total.pk).update(
+            tasks=F("tasks") + 1,
+            last_finished=Greatest(Coalesce("last_finished", finished), finished),
+            **{name: F(name) + getattr(task, name) for name in ScrapeTotal.SUMMED},
+        )
+
+
+class ScrapeTotal(models.Model):
+    """Running totals of finished scrape tasks by supplier and status.
+
+    /metrics reads these few rows instead of aggregating the whole task history.
+    """
+
+    SUMMED = [
+        "bytes",
+        "pages",
+        "items",
+        "misses",
+        "inserted",
+        "queries",
+        "fetch_seconds",
+        "parse_seconds",
+        "match_seconds",
+        "persist_seconds",
+    ]
+
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, related_name="scrape_totals"
+    )
+    status = models.CharField(max_length=16, choices=ScrapeTask.STATUSES)
+    tasks = models.PositiveIntegerField(default=0)
+    last_finished = models.DateTimeField(null=True, blank=True)
+
+    bytes = models.PositiveBigIntegerField(default=0)
+    pages = models.PositiveBigIntegerField(default=0)
+    items = models.PositiveBigIntegerField(default=0)
+    misses = models.PositiveBigIntegerField(default=0)
+    inserted = models.PositiveBigIntegerField(default=0)
+    queries = models.PositiveBigIntegerField(default=0)
+
+    fetch_seconds = models.FloatField(default=0)
+    parse_seconds = models.FloatField(default=0)
+    match_seconds = models.FloatField(default=0)
+    persist_seconds = models.FloatField(default=0)
+
+    objects = ScrapeTotalQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["supplier", "status"], name="scrape_total_unique"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tasks} {self.status} tasks at {self.supplier}"
+
+
+class ProductAlias(models.Model):
+    """Extra name the matcher recognises a product by, e.g. a mapped unmatched item."""
+
+    # Normalised like the names the matcher looks up
+    name = models.CharField(max_length=256)
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    product = GenericForeignKey("content_type", "object_id")
+
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "product aliases"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "name"], name="product_alias_unique"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} -> {self.product}"
+
+
+class UnmatchedItemQuerySet(models.QuerySet):
+    def map_to(self, product) -> int:
+        """Resolve these items to ``product`` and make their names aliases of it."""
+        content_type = ContentType.objects.get_for_model(product)
+        names = set(self.values_list("name", flat=True))
+        ProductAlias.objects.bulk_create(
+            [
+                ProductAlias(name=name, content_type=content_type, object_id=product.id)
+                for name in names
+            ],
+            update_conflicts=True,
+            unique_fields=["content_type", "name"],
+            update_fields=["object_id"],
+        )
+        # Bulk writes send no signals, and the scheduler matches in another process
+        bump_catalogue_version()
+        return self.update(content_type=content_type, object_id=product.id)
+
+
+class UnmatchedItem(models.Model):
+    """Listing entry of a supplier that could not be recorded as a price.
+
+    One row per supplier, product type and normalised name, counting every
+    time the entry was seen. ``error`` holds why the last one failed when a
+    product was found but its price was unusable.
+    """
+
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, related_name="unmatched_items"
+    )
+    # Product model the listing holds, and the product the name was mapped to
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    product = GenericForeignKey("content_type", "object_id")
+
+    name = models.CharField(max_length=256)
+    # The last item as scraped
+    raw_name = models.CharField(max_length=256)
+    url = models.URLField(max_length=512, blank=True)
+    error = models.CharField(max_length=256, blank=True)
+
+    occurrences = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+
+    objects = UnmatchedItemQuerySet.as_manager()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["supplier", "content_type", "name"],
+                name="unmatched_item_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["object_id", "-occurrences"]),
+        ]
 
-# class Scraper(models.Model):
-#     name = models.CharField(max_length=128)
-#     url = models.URLField()
+    def __str__(self) -> str:
+        return f"{self.raw_name} at {self.supplier} ({self.occurrences}x)"
@@ -0,0 +1,111 @@
+# Standard Libraries
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# Django Libraries
+from django.utils import timezone
+
+# Project Modules
+from core.models import Link
+
+# App Modules
+from .fetch import AsyncFetcher
+from .models import ScrapeRun, ScrapeTask
+from .scrapers import Scraper
+
+
+@dataclass
+class SweepResult:
+    link: Link
+    scraper: Scraper | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fetch_responses(scrapers: list[Scraper], **fetcher_kwargs) -> list:
+    async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+        return await fetcher.fetch_all(
+            [scraper.url for scraper in scrapers],
+            [scraper.request_headers() for scraper in scrapers],
+        )
+
+
+def sweep(
+    links: Iterable[Link] | None = None,
+    process: bool = True,
+    conditional: bool = True,
+    run: ScrapeRun | None = None,
+    **fetcher_kwargs,
+) -> list[SweepResult]:
+    """Scrape every link, fetching the first pages concurrently before processing.
+
+    Network I/O for the first page of every listing happens on the event loop;
+    parsing, any further pages and the ORM work in ``process_*_list`` run
+    afterwards in the calling thread. Pages that are unchanged since the last
+    run only have their prices re-confirmed.
+
+    Processed links are journaled as tasks of a new ScrapeRun, or of ``run``
+    when resuming one, in which case only its unfinished tasks are scraped.
+    """
+    if links is None:
+        links = Link.objects.select_related("scrape_state").prefetch_related(
+            "content_object"
+        )
+
+    if run is not None:
+        remaining = set(run.remaining().values_list("link_id", flat=True))
+        links = [link for link in links if link.id in remaining]
+    elif process:
+        run = ScrapeRun.objects.create(trigger=ScrapeRun.SWEEP)
+    results: list[SweepResult] = []
+    scrapers: list[Scraper] = []
+    for link in links:
+        try:
+            scraper = Scraper.for_link(link, conditional=conditional, run=run)
+        except LookupError as e:
+            results.append(SweepResult(link, error=e))
+            continue
+        scrapers.append(scraper)
+
+    if run is not None:
+        ScrapeTask.objects.bulk_create(
+            [
+                ScrapeTask(run=run, link=scraper.link, supplier=scraper.supplier)
+                for scraper in scrapers
+            ],
+            ignore_conflicts=True,
+        )
+
+    responses = asyncio.run(fetch_responses(scrapers, **fetcher_kwargs))
+
+    for scraper, response in zip(scrapers, responses):
+        result = SweepResult(scraper.link, scraper)
+        results.append(result)
+        try:
+            if isinstance(response, Exception):
+                raise response
+            # Fetched concurrently, so the time to the response headers is all there is
+            scraper.metrics.timings["fetch"] += response.elapsed.total_seconds()
+            scraper.set_response(response)
+        except Exception as e:
+            result.error = e
+            if run is not None:
+                scraper.record_task(error=e)
+            continue
+
+        try:
+            if run is not None:
+                scraper.scrape()
+            elif not scraper.unchanged:
+                getattr(scraper, f"parse_{scraper.product_name}_list")()
+        except Exception as e:
+            result.error = e
+
+    if run is not None:
+        run.finished = timezone.now()
+        run.save(update_fields=["finished"])
+    return results
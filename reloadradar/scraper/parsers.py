@@ -0,0 +1,184 @@
+"""HTML extraction for the supplier scrapers.
+
+Nothing in here touches Django, so parsers can run wherever the raw HTML is,
+including outside of the ORM context.
+"""
+# Standard Libraries
+import re
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import ClassVar, NamedTuple
+from urllib.parse import urljoin
+
+# Third Party Libraries
+import lxml.html
+from lxml.cssselect import CSSSelector
+from requests_html import HTML
+
+NON_PRICE = re.compile(r"[^\d.]")
+
+
+def parse_price(text: str) -> float:
+    return float(NON_PRICE.sub("", text))
+
+
+class Item(NamedTuple):
+    name: str
+    price: float
+    url: str
+
+
+class Page(NamedTuple):
+    items: list[Item]
+    next_url: str | None
+
+
+class RequestsHTMLBackend:
+    """The original requests-html/pyquery path."""
+
+    def document(self, raw: bytes, url: str):
+        return HTML(html=raw, url=url)
+
+    def select(self, element, selector: str) -> list:
+        return element.find(selector)
+
+    def select_one(self, element, selector: str):
+        return element.find(selector, first=True)
+
+    def text(self, element) -> str:
+        return element.text
+
+    def attr(self, element, name: str) -> str | None:
+        return element.attrs.get(name)
+
+
+@lru_cache(maxsize=None)
+def compile_selector(selector: str) -> CSSSelector:
+    return CSSSelector(selector)
+
+
+class LxmlBackend:
+    """Plain lxml trees queried with XPath compiled once per CSS selector."""
+
+    def document(self, raw: bytes, url: str):
+        return lxml.html.document_fromstring(raw, base_url=url)
+
+    def select(self, element, selector: str) -> list:
+        return compile_selector(selector)(element)
+
+    def select_one(self, element, selector: str):
+        found = compile_selector(selector)(element)
+        return found[0] if found else None
+
+    def text(self, element) -> str:
+        # Collapse whitespace like pyquery's text() does
+        return " ".join(element.text_content().split())
+
+    def attr(self, element, name: str) -> str | None:
+        return element.get(name)
+
+
+BACKENDS = {
+    "requests-html": RequestsHTMLBackend,
+    "lxml": LxmlBackend,
+}
+
+
+class Parser:
+    """Declarative listing parser, configured with CSS selectors per supplier."""
+
+    item_selector: ClassVar[str]
+    name_selector: ClassVar[str]
+    price_selector: ClassVar[str] = ".price"
+    # None means the item element itself is the product link
+    url_selector: ClassVar[str | None] = None
+    unavailable_selector: ClassVar[str | None] = None
+    # Supplier spellings replaced before the name is matched
+    name_mistakes: ClassVar[dict[str, str]] = {}
+
+    def __init__(self, backend: str = "lxml"):
+        self.backend = BACKENDS[backend]()
+
+    def parse(self, raw: bytes, url: str) -> Iterator[Item]:
+        return self.items(self.backend.document(raw, url))
+
+    def parse_page(
+        self, raw: bytes, url: str, next_page_selector: str | None = None
+    ) -> Page:
+        """The items of a listing page and the URL of its next page, if any."""
+        document = self.backend.document(raw, url)
+        next_url = None
+        if next_page_selector:
+            link = self.backend.select_one(document, next_page_selector)
+            href = self.backend.attr(link, "href") if link is not None else None
+            next_url = urljoin(url, href) if href else None
+        return Page(list(self.items(document)), next_url)
+
+    def items(self, document) -> Iterator[Item]:
+        backend = self.backend
+        for element in backend.select(document, self.item_selector):
+            name = backend.text(backend.select_one(element, self.name_selector))
+            price = parse_price(
+                backend.text(backend.select_one(element, self.price_selector))
+            )
+            link = (
+                backend.select_one(element, self.url_selector)
+                if self.url_selector
+                else element
+            )
+            url = backend.attr(link, "href")
+
+            if self.unavailable_selector and backend.select(
+                element, self.unavailable_selector
+            ):
+                continue
+
+            for key, value in self.name_mistakes.items():
+                name = name.replace(key, value)
+
+            yield Item(name, price, url)
+
+
+class MagentoParser(Parser):
+    item_selector = ".product.details.product-item-details"
+    name_selector = "a.product-item-link"
+    url_selector = "a.product-item-link"
+    unavailable_selector = "div.stock.unavailable"
+
+
+class SafariOutdoorParser(MagentoParser):
+    pass
+
+
+class ZimbiParser(Parser):
+    item_selector = "a.woocommerce-LoopProduct-link.woocommerce-loop-product__link"
+    name_selector = "h2"
+
+
+class ShootingStuffParser(MagentoParser):
+    name_mistakes = {
+        "Reloader": "Reloder",
+        "4350": "H4350",
+        "CFE-223": "CFE223",
+        "Ba9.5": "BA 9.5",
+    }
+
+
+@lru_cache
+def get_parser(parser_class: type[Parser], backend: str) -> Parser:
+    return parser_class(backend)
+
+
+def parse_page(
+    parser_class: type[Parser],
+    backend: str,
+    raw: bytes,
+    url: str,
+    next_page_selector: str | None = None,
+) -> Page:
+    """Parse one listing page to plain item tuples and its next page URL.
+
+    A module level function of picklable arguments, so a process pool can run
+    it in workers that never set up Django.
+    """
+    return get_parser(parser_class, backend).parse_page(raw, url, next_page_selector)
@@ -0,0 +1,37 @@
+# Standard Libraries
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Django Libraries
+from django.conf import settings
+
+_pool: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def parse_pool() -> ProcessPoolExecutor | None:
+    """The shared pool parsing pages, or None when parsing happens in process.
+
+    Workers are spawned rather than forked: they only import the Django-free
+    ``scraper.parsers`` and never inherit the parent's database connections.
+    """
+    global _pool
+    if not settings.SCRAPER_PARSE_WORKERS:
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.SCRAPER_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _pool
+
+
+def shutdown_parse_pool():
+    """Stop the workers, the next ``parse_pool`` call starts new ones."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
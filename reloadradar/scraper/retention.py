@@ -0,0 +1,191 @@
+"""Retention policy for the Pricing history.
+
+Raw prices older than ``PRICING_RETENTION`` are archived to compressed files
+in the snapshot store and replaced by one DailyPrice summary per product,
+supplier and day. The current price of every product at every supplier stays
+raw, LatestPrice points at it and ingestion compares new prices against it.
+PriceChange events of the same age are dropped, streams resume from recent ones.
+"""
+# Standard Libraries
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+# Django Libraries
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+# Data Science Libraries
+import pandas as pd
+
+# Project Modules
+from core.cache import bump_data_version
+from core.models import DailyPrice, LatestPrice, PriceChange, Pricing
+
+# App Modules
+from .ingest import batched
+from .snapshots import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = [
+    "id",
+    "content_type",
+    "object_id",
+    "supplier",
+    "run_id",
+    "price",
+    "price_url",
+    "retrieved",
+]
+KEY = ["content_type", "object_id", "supplier", "day"]
+
+
+@dataclass
+class CompactionResult:
+    archived: int = 0
+    summaries: int = 0
+    events: int = 0
+    files: list[Path] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.archived} prices archived into {len(self.files)} files, "
+            f"{self.summaries} daily summaries written, {self.events} events dropped"
+        )
+
+
+def retention_cutoff(retention: timedelta | None = None) -> datetime:
+    """Midnight starting the oldest day kept raw, so only whole days are compacted."""
+    if retention is None:
+        retention = settings.PRICING_RETENTION
+    day = timezone.localdate() - retention
+    return timezone.make_aware(datetime.combine(day, time()))
+
+
+def compactable_prices(cutoff: datetime):
+    return Pricing.objects.filter(retrieved__lt=cutoff).exclude(
+        id__in=LatestPrice.objects.values("pricing_id")
+    )
+
+
+def summarise(frame: pd.DataFrame) -> pd.DataFrame:
+    """One open/low/high/close row per product, supplier and local day."""
+    frame = frame.sort_values(["retrieved", "id"]).assign(
+        day=frame["retrieved"].dt.tz_convert(timezone.get_current_timezone()).dt.date
+    )
+    return (
+        frame.groupby(KEY, dropna=False)["price"]
+        .agg(open="first", low="min", high="max", close="last", samples="size")
+        .reset_index()
+    )
+
+
+def merge_summaries(summary: pd.DataFrame) -> int:
+    """Create or extend the DailyPrice rows of ``summary``.
+
+    Compaction moves forward in time, so anything already summarised for a day
+    is older than the prices being added to it.
+    """
+    existing = {
+        (row.content_type_id, row.object_id, row.supplier_id, row.day): row
+        for row in DailyPrice.objects.filter(
+            content_type__in=summary["content_type"].unique().tolist(),
+            object_id__in=summary["object_id"].unique().tolist(),
+            day__range=(summary["day"].min(), summary["day"].max()),
+        )
+    }
+
+    created, updated = [], []
+    for row in summary.itertuples(index=False):
+        supplier = None if pd.isna(row.supplier) else int(row.supplier)
+        key = (int(row.content_type), int(row.object_id), supplier, row.day)
+        daily = existing.get(key)
+        if daily is None:
+            created.append(
+                DailyPrice(
+                    content_type_id=key[0],
+                    object_id=key[1],
+                    supplier_id=supplier,
+                    day=row.day,
+                    open=row.open,
+                    low=row.low,
+                    high=row.high,
+                    close=row.close,
+                    samples=row.samples,
+                )
+            )
+        else:
+            daily.low = min(daily.low, row.low)
+            daily.high = max(daily.high, row.high)
+            daily.close = row.close
+            daily.samples += row.samples
+            updated.append(daily)
+
+    DailyPrice.objects.bulk_create(created, batch_size=500)
+    DailyPrice.objects.bulk_update(
+        updated, ["low", "high", "close", "samples"], batch_size=500
+    )
+    return len(created) + len(updated)
+
+
+def delete_prices(ids: list[int]):
+    """Delete raw prices, a few queries per batch as prices send no signals."""
+    for batch in batched(ids, 500):
+        Pricing.objects.filter(id__in=batch).delete()
+
+
+def compact_prices(
+    cutoff: datetime,
+    store: SnapshotStore | None = None,
+    window: timedelta = timedelta(days=30),
+    dry_run: bool = False,
+) -> CompactionResult:
+    """Archive and summarise compactable prices retrieved before ``cutoff``.
+
+    Each ``window`` of history is one archive file and one transaction, so an
+    interrupted compaction leaves no window half done.
+    """
+    store = store or SnapshotStore()
+    prices = compactable_prices(cutoff)
+    result = CompactionResult()
+    if not dry_run:
+        result.events, _ = PriceChange.objects.filter(created__lt=cutoff).delete()
+
+    first = prices.aggregate(first=Min("retrieved"))["first"]
+    if first is None:
+        return result
+    start = timezone.make_aware(datetime.combine(timezone.localdate(first), time()))
+    compacted = timezone.now()
+
+    while start < cutoff:
+        end = min(start + window, cutoff)
+        rows = prices.filter(retrieved__gte=start, retrieved__lt=end)
+        if dry_run:
+            result.archived += rows.count()
+            start = end
+            continue
+
+        with transaction.atomic():
+            frame = pd.DataFrame.from_records(
+                rows.order_by("id").values_list(*ARCHIVE_COLUMNS),
+                columns=ARCHIVE_COLUMNS,
+            )
+            if not frame.empty:
+                path = store.archive(
+                    f"pricing/{start:%Y-%m-%d}_{compacted:%Y%m%dT%H%M%S}",
+                    frame.astype({"price": float}),
+                )
+                result.summaries += merge_summaries(summarise(frame))
+                delete_prices(frame["id"].tolist())
+                result.archived += len(frame)
+                result.files.append(path)
+                logger.info("Compacted %d prices into %s", len(frame), path)
+        start = end
+
+    if result.archived and not dry_run:
+        bump_data_version()
+    return result
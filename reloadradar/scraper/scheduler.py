@@ -0,0 +1,158 @@
+# Standard Libraries
+import heapq
+import logging
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+# Django Libraries
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+# Project Modules
+from core.models import Link
+
+# App Modules
+from .models import LinkState, ScrapeRun
+from .scrapers import Scraper
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Long-running scraper keeping a priority queue of links keyed by due time.
+
+    Due links are scraped on a bounded thread pool. After each attempt the next
+    due time is persisted on the link's LinkState: one interval away on success,
+    or an exponentially growing backoff on failure, both with random jitter.
+    """
+
+    def __init__(self, workers: int | None = None, refresh: float = 300):
+        self.workers = workers or settings.SCRAPER_WORKERS
+        # Seconds between re-reading the Link table for added or removed links
+        self.refresh = refresh
+        self.queue: list[tuple[datetime, int]] = []
+        self.link_ids: set[int] = set()
+        self.running: dict[Future, int] = {}
+        self.stopping = threading.Event()
+
+    @staticmethod
+    def jitter(delay: timedelta) -> timedelta:
+        return delay * (1 + random.uniform(-1, 1) * settings.SCRAPER_JITTER)
+
+    @staticmethod
+    def interval(link: Link) -> timedelta:
+        intervals = {
+            Scraper.normalise_supplier_name(name): interval
+            for name, interval in settings.SCRAPER_SUPPLIER_INTERVALS.items()
+        }
+        key = Scraper.normalise_supplier_name(link.content_object.name)
+        return intervals.get(key, settings.SCRAPER_INTERVAL)
+
+    @staticmethod
+    def backoff(failures: int) -> timedelta:
+        return min(
+            settings.SCRAPER_BACKOFF * 2 ** (failures - 1), settings.SCRAPER_MAX_BACKOFF
+        )
+
+    def load(self):
+        """Queue links that are not queued yet and forget the ones that were deleted."""
+        now = timezone.now()
+        links = Link.objects.select_related("scrape_state").prefetch_related(
+            "content_object"
+        )
+        current = set()
+        for link in links:
+            current.add(link.id)
+            if link.id in self.link_ids:
+                continue
+
+            try:
+                due = link.scrape_state.next_due
+            except LinkState.DoesNotExist:
+                due = None
+            if due is None:
+                # Spread never scraped links over an interval instead of all at once
+                due = now + self.interval(link) * random.random()
+            heapq.heappush(self.queue, (due, link.id))
+
+        self.link_ids = current
+
+    def scrape(self, link_id: int) -> datetime | None:
+        """Scrape one link in a worker thread and persist when it is next due."""
+        try:
+            try:
+                link = Link.objects.prefetch_related("content_object").get(id=link_id)
+            except Link.DoesNotExist:
+                return None
+            state, _ = LinkState.objects.get_or_create(link=link)
+
+            run = ScrapeRun.objects.create(trigger=ScrapeRun.SCHEDULER)
+            try:
+                Scraper.for_link(link, run=run).scrape()
+            except Exception as e:
+                logger.exception("Scraping %s failed", link)
+                failures, error = state.failures + 1, repr(e)
+                delay = self.backoff(failures)
+            else:
+                failures, error = 0, ""
+                delay = self.interval(link)
+            run.finished = timezone.now()
+            run.save(update_fields=["finished"])
+
+            next_due = timezone.now() + self.jitter(delay)
+            LinkState.objects.filter(link=link).update(
+                next_due=next_due, failures=failures, last_error=error
+            )
+            return next_due
+        finally:
+            close_old_connections()
+
+    def dispatch(self, pool: ThreadPoolExecutor):
+        now = timezone.now()
+        while (
+            self.queue and self.queue[0][0] <= now and len(self.running) < self.workers
+        ):
+            _, link_id = heapq.heappop(self.queue)
+            if link_id in self.link_ids:
+                self.running[pool.submit(self.scrape, link_id)] = link_id
+
+    def collect(self, done):
+        for future in done:
+            link_id = self.running.pop(future)
+            try:
+                next_due = future.result()
+            except Exception as e:
+                # Losing the link from the queue would silently stop its scrapes
+                logger.error("Scheduling link %s failed: %r", link_id, e)
+                next_due = timezone.now() + self.backoff(1)
+            if next_due is not None:
+                heapq.heappush(self.queue, (next_due, link_id))
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            next_refresh = 0.0
+            while not self.stopping.is_set():
+                if timezone.now().timestamp() >= next_refresh:
+                    self.load()
+                    next_refresh = timezone.now().timestamp() + self.refresh
+
+                self.dispatch(pool)
+
+                timeout = self.refresh
+                if self.queue and len(self.running) < self.workers:
+                    timeout = (self.queue[0][0] - timezone.now()).total_seconds()
+                timeout = min(max(timeout, 0.0), self.refresh)
+
+                if self.running:
+                    done, _ = wait(self.running, timeout, return_when=FIRST_COMPLETED)
+                    self.collect(done)
+                else:
+                    self.stopping.wait(timeout)
+
+            self.collect(wait(self.running).done)
+
+    def stop(self, *args):
+        self.stopping.set()
@@ -1,121 +1,396 @@
 # Standard Libraries
 import csv
+import logging
 import os
+import re
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
-from decimal import Decimal
+from functools import cached_property
+from itertools import islice
 from pathlib import Path
+from typing import ClassVar
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
 # Third Party Libraries
-from requests_html import HTMLSession
+from requests.exceptions import HTTPError
 
 # Django Libraries
 from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 
 # Project Modules
-from core.models import Link, Manufacturer, Pricing, Propellant
+from alerts.engine import evaluate_prices
+from core.models import LatestPrice, Link
+
+# App Modules
+from ..catalogue import PropellantImport
+from ..fetch import get_client
+from ..ingest import ingest_prices, record_misses
+from ..instrumentation import ScrapeMetrics
+from ..matcher import ProductMatcher, get_matcher
+from ..models import LinkState, ScrapeRun, ScrapeTask, ScrapeTotal
+from ..parsers import Page, Parser, parse_page
+from ..pool import parse_pool
+from ..snapshots import SnapshotStore
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class Scraper:
     link: Link
     ready: bool = False
+    # Send the stored validators and skip processing when the page has not changed
+    conditional: bool = True
+    # Run history entry the scrape is recorded under, if any
+    run: ScrapeRun | None = None
+
+    # Subclasses register themselves here, keyed by their normalised supplier name
+    registry: ClassVar[dict[str, type["Scraper"]]] = {}
+    supplier_name: ClassVar[str | None] = None
+    parser_class: ClassVar[type[Parser] | None] = None
+
+    # How a listing paginates: a CSS selector for the "next page" link, or the
+    # query parameter holding the page number. Set at most one of the two.
+    next_page_selector: ClassVar[str | None] = None
+    page_param: ClassVar[str | None] = None
+    max_pages: ClassVar[int] = 50
+    # Pages fetched ahead of the one being processed
+    prefetch_pages: ClassVar[int] = 2
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        name = cls.supplier_name or cls.__name__.removesuffix("Scraper")
+        cls.registry[cls.normalise_supplier_name(name)] = cls
+
+    @staticmethod
+    def normalise_supplier_name(name: str) -> str:
+        return re.sub(r"[^a-z0-9]", "", name.lower())
+
+    @classmethod
+    def for_link(cls, link: Link, **kwargs) -> "Scraper":
+        """Instantiate the registered scraper matching the supplier of ``link``."""
+        key = cls.normalise_supplier_name(link.content_object.name)
+        try:
+            scraper_class = cls.registry[key]
+        except KeyError:
+            raise LookupError(f"No scraper registered for {link.content_object}")
+        return scraper_class(link, **kwargs)
 
     def __post_init__(self):
         self.url = self.link.link_url
         self.product_model = apps.get_model("core", self.link.link_type)
         self.product_name = self.product_model.__name__.lower()
         self.supplier = self.link.content_object
+        self.response = None
+        self.unchanged = False
+        self.ingest_result = None
+        self.metrics = ScrapeMetrics()
+        self.started = timezone.now()
+        setattr(self, f"{self.product_name}_list", None)
+        if self.parser_class:
+            self.parser = self.parser_class(settings.SCRAPER_PARSER_BACKEND)
+
+        try:
+            self.state = self.link.scrape_state
+        except LinkState.DoesNotExist:
+            self.state = LinkState(link=self.link)
 
         self.base_location = Path("./reloadradar/scraper/output")
         self.file_location = (
             self.base_location / self.product_name / str(self.supplier.id)
         )
 
-        print(f"{self} completed PostInit.")
+        logger.debug("%s completed PostInit.", self)
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__} for {self.product_name} at ({self.url})"
 
-    def get_response(self):
-        with HTMLSession() as session:
-            self.response = session.get(self.url)
+    @property
+    def paginated(self) -> bool:
+        return bool(self.next_page_selector or self.page_param)
+
+    @property
+    def use_validators(self) -> bool:
+        """Whether an unchanged first page skips processing the whole listing.
+
+        The validators only describe the first page, so a paginated listing is
+        still scraped in full once its last change is ``SCRAPER_LISTING_REFRESH``
+        old, in case only a later page changed.
+        """
+        if not self.conditional:
+            return False
+        if not self.paginated:
+            return True
+        changed = self.state.last_changed
+        return (
+            changed is not None
+            and timezone.now() - changed < settings.SCRAPER_LISTING_REFRESH
+        )
 
-        # Parse the scraped list into an attribute
-        getattr(self, f"parse_{self.product_name}_list")(),
-        self.ready = True
-        print(f"{self} got {self.response}, {self.ready=}")
+    def request_headers(self) -> dict[str, str]:
+        return self.state.conditional_headers() if self.use_validators else {}
 
-    def scrape(self):
+    def get_response(self):
+        with self.metrics.stage("fetch"):
+            response = get_client().get(self.url, headers=self.request_headers())
+        self.set_response(response)
+
+    def set_response(self, response):
+        """Use a response that was fetched elsewhere, e.g. by the orchestrator.
+
+        Raises HTTPError for anything but a success or 304, retries are spent by
+        then and an error page must not be taken for the listing.
+        """
+        self.response = response
+        self.metrics.record_response(response)
+        if not (200 <= response.status_code < 300 or response.status_code == 304):
+            raise HTTPError(
+                f"{response.status_code} {response.reason} for {response.url}",
+                response=response,
+            )
+        self.unchanged = self.use_validators and self.state.is_unchanged(response)
+        self.ready = True
+        logger.debug("%s got %s, unchanged=%s", self, response, self.unchanged)
+
+    def page_url(self, page: int) -> str:
+        parts = urlsplit(self.url)
+        query = dict(parse_qsl(parts.query))
+        query[self.page_param] = str(page)
+        return parts._replace(query=urlencode(query)).geturl()
+
+    def parse_response(self, response, pool) -> Future:
+        """Parse a fetched page on the parse ``pool``, or right away without one."""
+        page = (response.content, response.url, self.next_page_selector)
+        if pool is not None:
+            return pool.submit(
+                parse_page, self.parser_class, settings.SCRAPER_PARSER_BACKEND, *page
+            )
+        future = Future()
+        with self.metrics.stage("parse"):
+            future.set_result(self.parser.parse_page(*page))
+        return future
+
+    def iter_pages(self) -> Iterator[Page]:
+        """Yield every parsed page of the listing, fetching ahead while pages are consumed.
+
+        Each page is parsed once, by ``parser_class``, which also finds the link
+        to the next page. With a parse pool, up to ``prefetch_pages`` pages are
+        parsed in worker processes ahead of the one being consumed.
+        """
+        pool = parse_pool()
+        fetcher = ThreadPoolExecutor(max_workers=self.prefetch_pages)
+        client = get_client()
+        fetches: deque[Future] = deque()
+        parses: deque[Future] = deque([self.parse_response(self.response, pool)])
+        numbers = iter(range(2, self.max_pages + 1) if self.page_param else ())
+        previous, requested = self.response.content, 1
+
+        def fetch(url: str):
+            nonlocal requested
+            requested += 1
+            fetches.append(fetcher.submit(client.get, url))
+
+        def next_response():
+            nonlocal previous, numbers
+            if not fetches:
+                return None
+            with self.metrics.stage("fetch"):
+                response = fetches.popleft().result()
+            self.metrics.record_response(response)
+            # Some shops serve the last page again for out of range page numbers
+            if response.status_code != 200 or response.content == previous:
+                numbers = iter(())
+                for future in fetches:
+                    future.cancel()
+                fetches.clear()
+                return None
+            previous = response.content
+            if (number := next(numbers, None)) is not None:
+                fetch(self.page_url(number))
+            return response
+
+        def fill(block: bool):
+            # In process parsing happens as pages are needed, a pool parses ahead
+            depth = self.prefetch_pages if pool is not None else 1
+            while len(parses) < depth and (block or fetches and fetches[0].done()):
+                if (response := next_response()) is None:
+                    return
+                parses.append(self.parse_response(response, pool))
+
+        for number in islice(numbers, self.prefetch_pages):
+            fetch(self.page_url(number))
+        try:
+            while True:
+                fill(block=True)
+                if not parses:
+                    return
+                with self.metrics.stage("parse"):
+                    page = parses.popleft().result()
+                # Page numbers past the end of a listing usually render no items
+                if not page.items and self.page_param:
+                    return
+                if page.next_url and requested < self.max_pages:
+                    fetch(page.next_url)
+                if pool is not None:
+                    fill(block=False)
+                yield page
+        finally:
+            fetcher.shutdown(wait=False, cancel_futures=True)
+            for future in parses:
+                future.cancel()
+
+    def iter_items(self) -> Iterator[dict]:
+        """Stream the parsed items of every page straight from the listing."""
+        pages = self.iter_pages()
+        try:
+            for page in pages:
+                for item in page.items:
+                    yield item._asdict()
+        finally:
+            pages.close()
+
+    def scraped_items(self):
+        """The list set by parse_*_list or import_last_csv, else the streamed pages."""
+        items = getattr(self, f"{self.product_name}_list", None)
+        return items if items is not None else self.iter_items()
+
+    def parse_propellant_list(self):
         if not self.ready:
             self.get_response()
 
-        getattr(self, "process_" + self.product_name + "_list")()
+        self.propellant_list = list(self.iter_items())
 
-    def find_product(self, name: str):
-        manufacturer = None
-        name = name.upper().replace("VIHTAVOURI", "VIHTAVUORI")
-        for _man in Manufacturer.objects.all():
-            if _man.name.lower() in name.lower():
-                manufacturer = _man
-                print(f"{manufacturer=} found for {name}")
-                break
-
-        if manufacturer:
-            for _prod in getattr(manufacturer, self.product_name + "s").all():
-                if _prod.name.lower() in name.lower():
-                    return _prod
+    def scrape(self):
+        if self.run is not None:
+            ScrapeTask.objects.update_or_create(
+                run=self.run,
+                link=self.link,
+                defaults={
+                    "supplier": self.supplier,
+                    "status": ScrapeTask.RUNNING,
+                    "started": self.started,
+                },
+            )
+
+        try:
+            with self.metrics.count_queries():
+                if not self.ready:
+                    self.get_response()
+
+                if self.unchanged:
+                    self.confirm_prices()
+                else:
+                    getattr(self, "process_" + self.product_name + "_list")()
+                    self.save_state()
+        except Exception as e:
+            self.record_task(error=e)
+            raise
+        self.record_task()
+
+    def record_task(self, error: Exception | None = None) -> ScrapeTask:
+        """Store the outcome and metrics of this scrape in the run's journal."""
+        if error is not None:
+            status = ScrapeTask.FAILED
+        elif self.unchanged:
+            status = ScrapeTask.UNCHANGED
+        else:
+            status = ScrapeTask.OK
+
+        result = self.ingest_result
+        fields = {
+            "supplier": self.supplier,
+            "status": status,
+            "error": repr(error) if error is not None else "",
+            "started": self.started,
+            "finished": timezone.now(),
+            "http_status": self.metrics.http_status,
+            "bytes": self.metrics.bytes,
+            "pages": self.metrics.pages,
+            "items": result.items if result else 0,
+            "misses": result.unmatched if result else 0,
+            "inserted": result.inserted if result else 0,
+            "queries": self.metrics.queries,
+            **{
+                f"{stage}_seconds": seconds
+                for stage, seconds in self.metrics.timings.items()
+            },
+        }
+        if self.run is None:
+            task = ScrapeTask.objects.create(link=self.link, **fields)
         else:
-            for _prod in self.product_model.objects.all():
-                if _prod.name.lower() in name.lower():
-                    return _prod
+            task, _ = ScrapeTask.objects.update_or_create(
+                run=self.run, link=self.link, defaults=fields
+            )
+        ScrapeTotal.objects.add(task)
+        return task
+
+    def confirm_prices(self):
+        """Mark the prices from the last changed page as still current."""
+        now = timezone.now()
+        LatestPrice.objects.filter(
+            content_type=ContentType.objects.get_for_model(self.product_model),
+            object_id__in=self.state.product_ids,
+            supplier=self.supplier,
+        ).update(last_seen=now)
+
+        self.state.last_confirmed = now
+        self.state.save()
+
+    def save_state(self):
+        if self.response is None:
+            return
+
+        now = timezone.now()
+        self.state.etag = self.response.headers.get("ETag", "")
+        self.state.last_modified = self.response.headers.get("Last-Modified", "")
+        self.state.content_hash = LinkState.hash_content(self.response.content)
+        self.state.product_ids = self.ingest_result.product_ids
+        self.state.last_changed = self.state.last_confirmed = now
+        self.state.save()
+
+    @cached_property
+    def matcher(self) -> ProductMatcher:
+        # Checked once per scrape, the version is a cache read
+        return get_matcher(self.product_model)
 
-        return None
+    def find_product(self, name: str):
+        with self.metrics.stage("match"):
+            return self.matcher.find(name)
 
     def get_last_pricing(self, product):
-        return product.prices.filter(supplier=self.supplier).last()
+        return (
+            product.prices.filter(supplier=self.supplier)
+            .order_by("retrieved", "id")
+            .last()
+        )
 
-    def export_list_to_csv(self):
+    def export_snapshot(self):
         if not self.ready:
             self.get_response()
 
-        file_path = self.file_location / f"{timezone.now().strftime('%Y-%m-%d-%H')}.csv"
-        os.makedirs(self.file_location, exist_ok=True)
-        with open(file_path, "a", newline="") as csv_file:
-            fieldnames = ["name", "price", "url"]
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        if self.unchanged:
+            logger.info("%s is unchanged, nothing to export", self)
+            return
 
-            if os.path.getsize(file_path) == 0:
-                writer.writeheader()
+        return SnapshotStore().write(
+            self.supplier, self.product_name, self.scraped_items()
+        )
 
-            for data in getattr(self, self.product_name + "_list"):
-                writer.writerow(data)
+    def import_last_snapshot(self):
+        frame = SnapshotStore().latest(self.supplier, self.product_name)
+        if frame is None:
+            logger.warning("No snapshot found for %s", self.supplier)
+            return
 
-    def import_last_csv(self):
-        files = os.listdir(self.file_location)
-        file_paths = [
-            os.path.join(self.file_location, file)
-            for file in files
-            if "error" not in file
-            and os.path.isfile(os.path.join(self.file_location, file))
-        ]
-        file_paths.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-        if file_paths:
-            last_updated_file = file_paths[0]
-            print("Last updated file:", last_updated_file)
-            data_list = []
-
-            # Open and read the CSV file
-            with open(last_updated_file) as file:
-                csv_reader = csv.DictReader(file)
-                for row in csv_reader:
-                    data_list.append(row)
-
-            setattr(self, self.product_name + "_list", data_list)
-            print(f"Populated {len(getattr(self, self.product_name + '_list'))} rows")
-            self.ready = True
-        else:
-            print("No files found in the directory")
+        setattr(self, self.product_name + "_list", frame.to_dict("records"))
+        logger.info("Populated %d rows", len(frame))
+        self.ready = True
 
     def import_new_propellants(self):
         files = os.listdir(self.file_location)
@@ -128,61 +403,45 @@ class Scraper:
         file_paths.sort(key=lambda x: os.path.getmtime(x), reverse=True)
         if file_paths:
             last_updated_file = file_paths[0]
-            print("Last updated file:", last_updated_file)
-            data_list = []
-
-            # Open and read the CSV file
-            with open(last_updated_file) as file:
-                csv_reader = csv.DictReader(file)
-                for row in csv_reader:
-                    data_list.append(row)
-
-            for item in data_list:
-                print(f"Importing {item=}")
-                Propellant.objects.get_or_create(
-                    name=item["name"],
-                    weight=item["weight"] or 454,
-                    manufacturer=Manufacturer.objects.get(
-                        name__icontains=item["manufacturer"]
-                    ),
-                )
-        else:
-            print("No files found in the directory")
-
-    def log_to_error_file(self, line: dict):
-        file_path = (
-            self.file_location / f"{timezone.now().strftime('%Y-%m-%d-%H')}-errors.csv"
-        )
-        os.makedirs(self.file_location, exist_ok=True)
-        with open(file_path, "a", newline="") as csv_file:
-            fieldnames = line.keys()
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+            logger.info("Last updated file: %s", last_updated_file)
 
-            if os.path.getsize(file_path) == 0:
-                writer.writeheader()
-
-            writer.writerow(line)
+            with open(last_updated_file, newline="") as file:
+                result = PropellantImport().run(csv.DictReader(file))
+            for reject in result.rejects:
+                logger.warning("Line %d not imported: %s", reject.line, reject.reason)
+            logger.info("Imported propellants: %s", result)
+        else:
+            logger.warning("No files found in %s", self.file_location)
 
     def process_propellant_list(self):
-        for item in self.propellant_list:
-            print(f"Processing {item['name']=}")
-
-            propellant = self.find_product(item["name"])
-
-            if not propellant:
-                print(f"Cannot find {item=}")
-                self.log_to_error_file(item)
-                continue
-
-            last_price = self.get_last_pricing(propellant)
-
-            if not last_price or (
-                last_price and not last_price.price == Decimal(item["price"])
-            ):
-                print(f"Capturing new {item['price']=} for {propellant=}")
-                Pricing.objects.create(
-                    content_object=propellant,
-                    price=item["price"],
-                    supplier=self.supplier,
-                    price_url=item["url"],
+        items = self.scraped_items()
+        # Snapshot freshly scraped items, not ones imported from a snapshot
+        if settings.SCRAPER_SNAPSHOTS and self.propellant_list is None:
+            snapshot = SnapshotStore().writer(self.supplier, self.product_name)
+        else:
+            snapshot = nullcontext()
+
+        with self.metrics.exclusive_stage("persist"):
+            with snapshot as writer:
+                if writer is not None:
+                    items = writer.record(items)
+                self.ingest_result = ingest_prices(
+                    self.product_model,
+                    self.supplier,
+                    items,
+                    self.find_product,
+                    run=self.run,
                 )
+            alerts = evaluate_prices(self.product_model, self.ingest_result.new_prices)
+            misses = record_misses(
+                self.product_model,
+                self.supplier,
+                self.ingest_result.unmatched_items + self.ingest_result.failed_items,
+            )
+
+        if misses:
+            logger.info("%s: %d names added to the unmatched items", self, misses)
+
+        logger.info(
+            "%s processed: %s, %d alerts", self, self.ingest_result, len(alerts)
+        )
@@ -0,0 +1,133 @@
+"""Fuzzy product search over a prebuilt trigram index.
+
+Queries and names go through the scrapers' ``normalise``, so aliases and
+misspellings resolve the same way for search as for scraped items, and the
+product a scraper would match a query to always ranks first.
+"""
+# Standard Libraries
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Project Modules
+from core.cache import catalogue_version
+from core.models import Manufacturer, Propellant
+
+# App Modules
+from .matcher import get_matcher, normalise
+
+TOKEN = re.compile(r"[a-z0-9.]+")
+# Package sizes say nothing about which product is meant
+SIZE = re.compile(r"^\d+(\.\d+)?(lbs?|kg|g|oz)$")
+# Credit for a query trigram found only in the manufacturer's name
+MANUFACTURER_WEIGHT = 0.8
+MIN_SCORE = 0.3
+
+
+def tokens(name: str) -> list[str]:
+    return [
+        token.strip(".")
+        for token in TOKEN.findall(normalise(name))
+        if token.strip(".") and not SIZE.match(token)
+    ]
+
+
+def trigrams(name: str) -> frozenset[str]:
+    """Trigrams of each word, and of adjacent words joined so "h 4350" finds "h4350"."""
+    words = tokens(name)
+    words += [first + second for first, second in zip(words, words[1:])]
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    product: object
+    score: float
+
+
+class SearchIndex:
+    """Inverted trigram index over product names and their manufacturers' names."""
+
+    def __init__(self, product_model):
+        self.product_model = product_model
+        self.products = list(
+            product_model.objects.select_related("manufacturer").order_by("id")
+        )
+        self.positions = {product.id: i for i, product in enumerate(self.products)}
+        self.product_grams = [trigrams(product.name) for product in self.products]
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for position, grams in enumerate(self.product_grams):
+            for gram in grams:
+                self.postings[gram].append(position)
+
+        self.manufacturer_grams = {
+            manufacturer.id: trigrams(manufacturer.name)
+            for manufacturer in Manufacturer.objects.all()
+        }
+        self.by_manufacturer: dict[int, list[int]] = defaultdict(list)
+        for position, product in enumerate(self.products):
+            self.by_manufacturer[product.manufacturer_id].append(position)
+        # Searches consult the scrape matcher too, build it along with the index
+        get_matcher(product_model)
+
+    def search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        matched: dict[int, set[str]] = defaultdict(set)
+        for gram in grams:
+            for position in self.postings.get(gram, ()):
+                matched[position].add(gram)
+        # A manufacturer alone ("hodgdon") still lists its products
+        for manufacturer_id, names in self.manufacturer_grams.items():
+            if names & grams:
+                for position in self.by_manufacturer[manufacturer_id]:
+                    matched.setdefault(position, set())
+
+        ranked = []
+        for position, found in matched.items():
+            product = self.products[position]
+            manufacturer_only = (
+                self.manufacturer_grams.get(product.manufacturer_id, frozenset())
+                & grams
+            ) - found
+            credit = len(found) + MANUFACTURER_WEIGHT * len(manufacturer_only)
+            score = credit / len(grams)
+            if score >= MIN_SCORE:
+                # Among equal scores prefer names the query covers more of
+                coverage = len(found) / len(self.product_grams[position])
+                ranked.append((score, coverage, position))
+        ranked.sort(key=lambda rank: (-rank[0], -rank[1], rank[2]))
+
+        results = [
+            SearchResult(self.products[position], round(score, 3))
+            for score, _, position in ranked[:limit]
+        ]
+        scraped = get_matcher(self.product_model).find(query)
+        if scraped is not None and scraped.id in self.positions:
+            results = [result for result in results if result.product.id != scraped.id]
+            product = self.products[self.positions[scraped.id]]
+            results.insert(0, SearchResult(product, 1.0))
+        return results[:limit]
+
+
+# Indexes by product model, with the catalogue version they were built from
+_indexes: dict[type, tuple[int, SearchIndex]] = {}
+
+
+def get_index(product_model=Propellant) -> SearchIndex:
+    """Return the index for ``product_model``, rebuilt when the catalogue changed.
+
+    Like the matchers it follows the shared catalogue version, so products
+    imported from the command line or created by the scheduler are found too.
+    """
+    version = catalogue_version()
+    cached = _indexes.get(product_model)
+    if cached is None or cached[0] != version:
+        cached = _indexes[product_model] = (version, SearchIndex(product_model))
+    return cached[1]
@@ -0,0 +1,231 @@
+# Standard Libraries
+import gzip
+import operator
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Django Libraries
+from django.conf import settings
+from django.utils import timezone
+
+# Data Science Libraries
+import pandas as pd
+
+# Project Modules
+from core.analytics import PRICE_COLUMNS, with_products
+from core.models import Propellant
+
+# App Modules
+from .matcher import get_matcher
+from .models import Snapshot
+
+# Parquet needs pyarrow, without it snapshots fall back to gzipped CSV
+try:
+    # Third Party Libraries
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    PARQUET = False
+else:
+    PARQUET = True
+
+COLUMNS = ["name", "price", "url"]
+if PARQUET:
+    PARQUET_SCHEMA = pyarrow.schema(
+        [
+            ("name", pyarrow.string()),
+            ("price", pyarrow.float64()),
+            ("url", pyarrow.string()),
+        ]
+    )
+
+OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda column, values: column.isin(values),
+    "not in": lambda column, values: ~column.isin(values),
+}
+
+
+def apply_filters(frame: pd.DataFrame, filters) -> pd.DataFrame:
+    """Apply pyarrow style DNF filters to an already loaded frame."""
+    if not filters:
+        return frame
+    if isinstance(filters[0], tuple):
+        filters = [filters]
+
+    mask = pd.Series(False, index=frame.index)
+    for conjunction in filters:
+        matches = pd.Series(True, index=frame.index)
+        for column, op, value in conjunction:
+            matches &= OPERATORS[op](frame[column], value)
+        mask |= matches
+    return frame[mask]
+
+
+class SnapshotWriter:
+    """Appends the items passed through ``record`` to a file, ``batch_size`` at a time.
+
+    Only one batch is held in memory, however long the listing.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch: list[dict] = []
+        self.rows = 0
+        self.file = None
+        # Set once the snapshot is complete and in the manifest
+        self.snapshot: Snapshot | None = None
+
+    def record(self, items: Iterable[dict]) -> Iterator[dict]:
+        """Pass ``items`` through while writing them."""
+        for item in items:
+            self.batch.append(item)
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+            yield item
+
+    def flush(self):
+        frame = pd.DataFrame(self.batch, columns=COLUMNS).astype({"price": float})
+        if PARQUET:
+            # An explicit schema, a batch of missing urls would otherwise be typed null
+            table = pyarrow.Table.from_pandas(
+                frame, schema=PARQUET_SCHEMA, preserve_index=False
+            )
+            if self.file is None:
+                self.file = pyarrow.parquet.ParquetWriter(
+                    self.path, PARQUET_SCHEMA, compression="zstd"
+                )
+            self.file.write_table(table)
+        else:
+            header = self.file is None
+            if header:
+                self.file = gzip.open(self.path, "wt", newline="")
+            frame.to_csv(self.file, header=header, index=False)
+        self.rows += len(frame)
+        self.batch = []
+
+    def close(self):
+        if self.batch or self.file is None:
+            self.flush()
+        self.file.close()
+
+
+class SnapshotStore:
+    """Compressed columnar files, one per scrape run, indexed by the Snapshot table.
+
+    The manifest makes "latest snapshot for a supplier" a single indexed query,
+    and narrows multi-snapshot reads by supplier and time before any file is
+    opened. Filters on the file contents are pushed down to the Parquet reader.
+    """
+
+    def __init__(self, root: Path | None = None):
+        self.root = Path(root or settings.SCRAPER_SNAPSHOT_DIR)
+
+    @contextmanager
+    def writer(
+        self,
+        supplier,
+        product_type: str,
+        taken: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[SnapshotWriter]:
+        """Stream a snapshot to its file, listed in the manifest once complete.
+
+        The file is removed again if the block raises.
+        """
+        taken = taken or timezone.now()
+        extension = "parquet" if PARQUET else "csv.gz"
+        relative = (
+            Path(product_type)
+            / str(supplier.id)
+            / f"{taken:%Y-%m-%dT%H%M%S.%f}.{extension}"
+        )
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        writer = SnapshotWriter(path, batch_size)
+        try:
+            yield writer
+            writer.close()
+        except BaseException:
+            if writer.file is not None:
+                writer.file.close()
+            path.unlink(missing_ok=True)
+            raise
+
+        writer.snapshot = Snapshot.objects.create(
+            supplier=supplier,
+            product_type=product_type,
+            taken=taken,
+            path=str(relative),
+            rows=writer.rows,
+        )
+
+    def write(
+        self,
+        supplier,
+        product_type: str,
+        items: Iterable[dict],
+        taken: datetime | None = None,
+    ) -> Snapshot:
+        with self.writer(supplier, product_type, taken) as writer:
+            for _ in writer.record(items):
+                pass
+        return writer.snapshot
+
+    def archive(self, name: str, frame: pd.DataFrame) -> Path:
+        """Write ``frame`` under ``archive/``, outside the Snapshot manifest."""
+        path = self.root / "archive" / f"{name}.{'parquet' if PARQUET else 'csv.gz'}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if PARQUET:
+            frame.to_parquet(path, compression="zstd", index=False)
+        else:
+            frame.to_csv(path, compression="gzip", index=False)
+        return path
+
+    def read(self, snapshot: Snapshot, columns=None, filters=None) -> pd.DataFrame:
+        path = self.root / snapshot.path
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path, columns=columns, filters=filters)
+
+        frame = apply_filters(pd.read_csv(path, compression="gzip"), filters)
+        return frame[columns] if columns else frame
+
+    def read_many(self, snapshots, columns=None, filters=None) -> pd.DataFrame:
+        """Concatenate many snapshots, tagged with their supplier and time taken."""
+        frames = [
+            self.read(snapshot, columns, filters).assign(
+                supplier=snapshot.supplier_id, taken=snapshot.taken
+            )
+            for snapshot in snapshots
+        ]
+        if not frames:
+            return pd.DataFrame(columns=(columns or COLUMNS) + ["supplier", "taken"])
+        return pd.concat(frames, ignore_index=True)
+
+    def latest(self, supplier, product_type: str) -> pd.DataFrame | None:
+        snapshot = Snapshot.objects.latest_for(supplier, product_type)
+        return self.read(snapshot) if snapshot else None
+
+    def prices_frame(self, snapshots) -> pd.DataFrame:
+        """Propellant snapshots in the shape of ``core.analytics.load_prices``."""
+        frame = self.read_many(snapshots.filter(product_type="propellant"))
+        matcher = get_matcher(Propellant)
+        products = {
+            name: getattr(matcher.find(name), "id", None)
+            for name in frame["name"].unique()
+        }
+        frame = frame.assign(
+            product=frame["name"].map(products), retrieved=frame["taken"]
+        ).dropna(subset=["product"])
+        frame["product"] = frame["product"].astype(int)
+        return with_products(frame[PRICE_COLUMNS])
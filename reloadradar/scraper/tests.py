@@ -1,2 +1,703 @@
+# Standard Libraries
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+# Third Party Libraries
+from requests.exceptions import HTTPError
+
 # Django Libraries
-# from django.test import TestCase
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+# Project Modules
+from core.cache import CATALOGUE_VERSION_KEY, bump_versions, catalogue_version
+from core.models import (
+    DailyPrice,
+    LatestPrice,
+    Link,
+    Manufacturer,
+    Pricing,
+    Propellant,
+    Supplier,
+)
+
+# App Modules
+from .benchmarks.catalogue import fixture_products
+from .benchmarks.parsers import FIXTURES
+from .benchmarks.server import StubSupplierServer
+from .benchmarks.suite import nearest_rank
+from .catalogue import PropellantImport
+from .fetch import FetchClient
+from .ingest import ingest_prices, record_misses
+from .matcher import Automaton, get_matcher, normalise
+from .models import (
+    LinkState,
+    ProductAlias,
+    ScrapeRun,
+    ScrapeTask,
+    ScrapeTotal,
+    Snapshot,
+    UnmatchedItem,
+)
+from .orchestrator import sweep
+from .parsers import ZimbiParser
+from .pool import shutdown_parse_pool
+from .retention import compact_prices, retention_cutoff
+from .scheduler import Scheduler
+from .scrapers import Scraper
+from .snapshots import SnapshotStore
+
+
+class MetricsTests(TestCase):
+    def test_prometheus_text(self):
+        supplier = Supplier.objects.create(name='Say "Cheese"')
+        link = Link.objects.create(
+            link_type="propellant",
+            link_url="https://example.com",
+            content_object=supplier,
+        )
+        now = timezone.now()
+        for status in (ScrapeTask.OK, ScrapeTask.OK, ScrapeTask.FAILED):
+            task = ScrapeTask.objects.create(
+                link=link,
+                supplier=supplier,
+                status=status,
+                started=now,
+                finished=now,
+                items=10,
+                fetch_seconds=0.5,
+            )
+            ScrapeTotal.objects.add(task)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4")
+        lines = response.content.decode().splitlines()
+        labels = r'supplier="Say \"Cheese\"",status="ok"'
+        self.assertIn(f"reloadradar_scrape_tasks_total{{{labels}}} 2", lines)
+        self.assertIn(f"reloadradar_scrape_items_total{{{labels}}} 20", lines)
+        self.assertIn(
+            f'reloadradar_scrape_stage_seconds_total{{{labels},stage="fetch"}} 1.0',
+            lines,
+        )
+        self.assertIn(
+            'reloadradar_scrape_last_success_timestamp_seconds{supplier="Say \\"Cheese\\""}'
+            f" {now.timestamp()}",
+            lines,
+        )
+
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, 403)
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        self.assertEqual(nearest_rank([7], 0.95), 7)
+        self.assertEqual(nearest_rank(list(range(1, 21)), 0.95), 19)
+        self.assertEqual(nearest_rank(list(range(1, 101)), 0.95), 95)
+        self.assertEqual(nearest_rank(list(range(1, 11)), 0.95), 10)
+
+
+class MatcherTests(TestCase):
+    def setUp(self):
+        self.hodgdon = Manufacturer.objects.create(name="Hodgdon")
+        self.alliant = Manufacturer.objects.create(name="Alliant")
+        self.vihtavuori = Manufacturer.objects.create(name="Vihtavuori")
+        self.products = {
+            name: Propellant.objects.create(name=name, manufacturer=manufacturer)
+            for name, manufacturer in (
+                ("H4350", self.hodgdon),
+                ("H4", self.hodgdon),
+                ("Red Dot", self.alliant),
+                ("Reloder 16", self.alliant),
+                ("N140", self.vihtavuori),
+            )
+        }
+
+    def test_automaton_longest_overlapping_match(self):
+        automaton = Automaton({"he": 1, "she": 2, "hers": 3, "his": 4, "": 5})
+        self.assertEqual(automaton.longest("ushers"), 3)
+        # Of equally long matches the first one in the text wins
+        self.assertEqual(automaton.longest("ahishe"), 4)
+        self.assertIsNone(automaton.longest("xyz"))
+
+    def test_normalise_aliases(self):
+        self.assertEqual(normalise("  VihtaVouri  N140 "), "vihtavuori n140")
+        self.assertEqual(normalise("Alliant RL-16 1lb"), "alliant reloder 16 1lb")
+        self.assertEqual(normalise("Reloader 16"), "reloder 16")
+
+    def test_find(self):
+        matcher = get_matcher(Propellant)
+        self.assertEqual(matcher.find("Hodgdon H4350 1lb"), self.products["H4350"])
+        self.assertEqual(matcher.find("Hodgdon H4 8lb"), self.products["H4"])
+        self.assertEqual(matcher.find("Alliant RL-16 1lb"), self.products["Reloder 16"])
+        self.assertEqual(matcher.find("Vihtavouri N140"), self.products["N140"])
+        # A named manufacturer only matches its own products
+        self.assertIsNone(matcher.find("Hodgdon Red Dot 1lb"))
+        self.assertEqual(matcher.find("Red Dot 1lb"), self.products["Red Dot"])
+
+    def test_cache_invalidation(self):
+        matcher = get_matcher(Propellant)
+        self.assertIs(get_matcher(Propellant), matcher)
+        self.assertIsNone(matcher.find("Hodgdon Varget 1lb"))
+
+        varget = Propellant.objects.create(name="Varget", manufacturer=self.hodgdon)
+        self.assertEqual(get_matcher(Propellant).find("Hodgdon Varget 1lb"), varget)
+
+        ProductAlias.objects.create(name="vgt", product=varget)
+        self.assertEqual(get_matcher(Propellant).find("Hodgdon VGT 1lb"), varget)
+
+    def test_change_in_another_process(self):
+        matcher = get_matcher(Propellant)
+        # Sends no signal here, as if written by another process
+        Propellant.objects.bulk_create(
+            [Propellant(name="Varget", manufacturer=self.hodgdon)]
+        )
+        self.assertIs(get_matcher(Propellant), matcher)
+
+        # That process bumps the shared version, this one only reads it
+        bump_versions(CATALOGUE_VERSION_KEY)
+        self.assertEqual(
+            get_matcher(Propellant).find("Hodgdon Varget 1lb").name, "Varget"
+        )
+
+
+class FetchClientTests(SimpleTestCase):
+    def setUp(self):
+        requests = self.requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                requests.append((self.path, self.client_address))
+                status, body = 200, b"<html><body>ok</body></html>"
+                if self.path == "/robots.txt":
+                    body = b"User-agent: *\nCrawl-delay: 1\n"
+                elif requests.count((self.path, self.client_address)) == 1:
+                    status, body = 503, b"busy"
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = "http://{}:{}".format(*server.server_address)
+
+    @override_settings(SCRAPER_HOST_DELAY=0, SCRAPER_RETRY_BACKOFF=0)
+    def test_polite_pooled_retried(self):
+        client = FetchClient()
+        start = time.monotonic()
+        first = client.get(f"{self.base_url}/first")
+        second = client.get(f"{self.base_url}/second")
+        elapsed = time.monotonic() - start
+
+        self.assertEqual([first.status_code, second.status_code], [200, 200])
+        self.assertEqual(second.html.find("body", first=True).text, "ok")
+        self.assertEqual(
+            [path for path, _ in self.requests],
+            ["/robots.txt", "/first", "/first", "/second", "/second"],
+        )
+        # One keep-alive connection, and the second page waited for the crawl delay
+        self.assertEqual(len({address for _, address in self.requests}), 1)
+        self.assertGreaterEqual(elapsed, 1)
+
+
+@override_settings(SCRAPER_HOST_DELAY=0, SCRAPER_SNAPSHOTS=False)
+class ConditionalScrapeTests(TestCase):
+    def test_unchanged_listing_skips_ingestion(self):
+        items = ZimbiParser().parse((FIXTURES / "zimbi.html").read_bytes(), "")
+        for name, products in fixture_products({"zimbi": items}).items():
+            manufacturer = Manufacturer.objects.create(name=name)
+            for product in products:
+                Propellant.objects.create(name=product, manufacturer=manufacturer)
+        supplier = Supplier.objects.create(name="Zimbi")
+
+        def scrape() -> ScrapeTask:
+            link = Link.objects.select_related("scrape_state").get(
+                link_url=server.url("zimbi")
+            )
+            run = ScrapeRun.objects.create(trigger=ScrapeRun.SWEEP)
+            scraper = Scraper.for_link(link, run=run)
+            self.assertTrue(scraper.paginated)
+            scraper.scrape()
+            return run.tasks.get()
+
+        with StubSupplierServer(FIXTURES) as server:
+            Link.objects.create(
+                link_type="propellant",
+                link_url=server.url("zimbi"),
+                content_object=supplier,
+            )
+            self.assertEqual(scrape().status, ScrapeTask.OK)
+            prices = Pricing.objects.count()
+            self.assertTrue(prices)
+
+            task = scrape()
+            self.assertEqual(
+                (task.status, task.http_status), (ScrapeTask.UNCHANGED, 304)
+            )
+            self.assertEqual(Pricing.objects.count(), prices)
+
+            # Later pages could have changed, so the listing is rescraped now and then
+            LinkState.objects.update(last_changed=timezone.now() - timedelta(days=1))
+            task = scrape()
+            self.assertEqual((task.status, task.http_status), (ScrapeTask.OK, 200))
+
+
+@override_settings(SCRAPER_HOST_DELAY=0)
+class ParsePoolTests(TestCase):
+    def test_pool_parses_like_in_process(self):
+        self.addCleanup(shutdown_parse_pool)
+
+        def parse(link: Link) -> list[dict]:
+            scraper = Scraper.for_link(link)
+            scraper.parse_propellant_list()
+            return scraper.propellant_list
+
+        with StubSupplierServer(FIXTURES) as server:
+            for path in sorted(FIXTURES.glob("*.html")):
+                with self.subTest(supplier=path.stem):
+                    link = Link.objects.create(
+                        link_type="propellant",
+                        link_url=server.url(path.stem),
+                        content_object=Supplier.objects.create(name=path.stem),
+                    )
+                    in_process = parse(link)
+                    with override_settings(SCRAPER_PARSE_WORKERS=2):
+                        self.assertEqual(parse(link), in_process)
+                    self.assertTrue(in_process)
+
+
+class IngestTests(TestCase):
+    def test_one_price_per_run(self):
+        supplier = Supplier.objects.create(name="Zimbi")
+        manufacturer = Manufacturer.objects.create(name="Hodgdon")
+        products = {
+            "H4350": Propellant.objects.create(name="H4350", manufacturer=manufacturer)
+        }
+        run = ScrapeRun.objects.create(trigger=ScrapeRun.SWEEP)
+
+        def ingest(*prices, run=run):
+            items = [
+                {"name": "H4350", "price": price, "url": "https://example.com"}
+                for price in prices
+            ]
+            return ingest_prices(Propellant, supplier, items, products.get, run=run)
+
+        # Listed twice, then scraped again after a crash
+        self.assertEqual(ingest(40, 41).inserted, 1)
+        result = ingest(42)
+        self.assertEqual((result.inserted, result.updated), (0, 1))
+        self.assertEqual(list(Pricing.objects.values_list("price", flat=True)), [42])
+        self.assertEqual(list(run.prices().values_list("price", flat=True)), [42])
+
+        self.assertEqual(ingest(43, run=None).inserted, 1)
+
+
+class RetentionTests(TestCase):
+    def test_compact_keeps_latest_price(self):
+        supplier = Supplier.objects.create(name="Zimbi")
+        manufacturer = Manufacturer.objects.create(name="Hodgdon")
+        product = Propellant.objects.create(name="H4350", manufacturer=manufacturer)
+        now = timezone.now()
+        for days, price in ((400, 40), (400, 38), (399, 45), (300, 42)):
+            ingest_prices(
+                Propellant,
+                supplier,
+                [{"name": "H4350", "price": price, "url": "https://example.com"}],
+                {"H4350": product}.get,
+            )
+            Pricing.objects.filter(id=Pricing.objects.latest("id").id).update(
+                retrieved=now - timedelta(days=days)
+            )
+
+        with tempfile.TemporaryDirectory() as root:
+            result = compact_prices(retention_cutoff(), SnapshotStore(root))
+            self.assertEqual(len(result.files), 1)
+            self.assertTrue(all(path.exists() for path in result.files))
+
+        self.assertEqual(result.archived, 3)
+        self.assertEqual(LatestPrice.objects.get().pricing.price, 42)
+        self.assertEqual(
+            list(DailyPrice.objects.values_list("open", "low", "high", "close")),
+            [(40, 38, 40, 38), (45, 45, 45, 45)],
+        )
+
+
+class ResumeTests(TestCase):
+    def test_only_latest_sweep_resumed(self):
+        supplier = Supplier.objects.create(name="Zimbi")
+        link = Link.objects.create(
+            link_type="propellant",
+            link_url="https://example.com",
+            content_object=supplier,
+        )
+        for status in (ScrapeTask.FAILED, ScrapeTask.OK):
+            run = ScrapeRun.objects.create(trigger=ScrapeRun.SWEEP)
+            ScrapeTask.objects.create(
+                run=run, link=link, supplier=supplier, status=status
+            )
+
+        # The failure of the older sweep is not picked up again
+        with self.assertRaisesMessage(CommandError, "No unfinished sweep"):
+            call_command("scrape", "--resume")
+
+
+@override_settings(SCRAPER_HOST_DELAY=0, SCRAPER_SNAPSHOTS=False)
+class SweepTests(TestCase):
+    def test_journal_and_resume(self):
+        with StubSupplierServer(FIXTURES) as server:
+            links = {
+                name: Link.objects.create(
+                    link_type="propellant",
+                    link_url=server.url(name),
+                    content_object=Supplier.objects.create(name=name),
+                )
+                for name in ("zimbi", "safarioutdoor", "unknown")
+            }
+            results = {result.link: result for result in sweep()}
+            self.assertTrue(results[links["zimbi"]].ok)
+            self.assertTrue(results[links["safarioutdoor"]].ok)
+            self.assertIsInstance(results[links["unknown"]].error, LookupError)
+
+            # Links without a scraper are not journaled
+            run = ScrapeRun.objects.get()
+            self.assertIsNotNone(run.finished)
+            self.assertEqual(
+                dict(run.tasks.values_list("link__link_url", "status")),
+                {
+                    server.url("zimbi"): ScrapeTask.OK,
+                    server.url("safarioutdoor"): ScrapeTask.OK,
+                },
+            )
+
+            run.tasks.filter(link=links["zimbi"]).update(status=ScrapeTask.FAILED)
+            results = sweep(run=run, conditional=False)
+            self.assertEqual([result.link for result in results], [links["zimbi"]])
+            self.assertEqual(ScrapeRun.objects.count(), 1)
+            self.assertEqual(run.tasks.get(link=links["zimbi"]).status, ScrapeTask.OK)
+
+    @override_settings(SCRAPER_RETRIES=0)
+    def test_error_page_fails_task(self):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = b"User-agent: *\n" if self.path == "/robots.txt" else b"busy"
+                self.send_response(200 if self.path == "/robots.txt" else 503)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        link = Link.objects.create(
+            link_type="propellant",
+            link_url="http://{}:{}/zimbi".format(*server.server_address),
+            content_object=Supplier.objects.create(name="Zimbi"),
+        )
+        state = LinkState.objects.create(
+            link=link, etag='"v1"', content_hash="abc", product_ids=[1, 2]
+        )
+        [result] = sweep(client=FetchClient())
+        self.assertFalse(result.ok)
+
+        task = ScrapeTask.objects.get(link=link)
+        self.assertEqual((task.status, task.http_status), (ScrapeTask.FAILED, 503))
+        self.assertIn("503", task.error)
+        state.refresh_from_db()
+        self.assertEqual(
+            (state.etag, state.content_hash, state.product_ids, state.last_changed),
+            ('"v1"', "abc", [1, 2], None),
+        )
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    def now(self) -> datetime:
+        return self.time
+
+
+class ImmediatePool:
+    """Runs submitted work right away in the calling thread."""
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@override_settings(
+    SCRAPER_INTERVAL=timedelta(hours=1),
+    SCRAPER_SUPPLIER_INTERVALS={"Zimbi": timedelta(minutes=30)},
+    SCRAPER_BACKOFF=timedelta(minutes=5),
+    SCRAPER_MAX_BACKOFF=timedelta(hours=1),
+    SCRAPER_JITTER=0,
+)
+class SchedulerTests(TransactionTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scraped = []
+        self.failing = set()
+
+        def for_link(link, run=None):
+            def scrape():
+                self.scraped.append(link.id)
+                if link.id in self.failing:
+                    raise HTTPError(f"503 Service Unavailable for {link.link_url}")
+
+            return SimpleNamespace(scrape=scrape)
+
+        for patcher in (
+            mock.patch.object(Scraper, "for_link", for_link),
+            mock.patch("scraper.scheduler.timezone", self.clock),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.links = {
+            name: Link.objects.create(
+                link_type="propellant",
+                link_url=f"https://example.com/{name}",
+                content_object=Supplier.objects.create(name=name),
+            )
+            for name in ("Zimbi", "Safari Outdoor", "Shooting Stuff")
+        }
+
+    def minutes(self, minutes: float) -> datetime:
+        return self.clock.time + timedelta(minutes=minutes)
+
+    def test_backoff_doubles_up_to_cap(self):
+        self.assertEqual(
+            [Scheduler.backoff(failures) for failures in range(1, 6)],
+            [timedelta(minutes=minutes) for minutes in (5, 10, 20, 40, 60)],
+        )
+
+    @override_settings(SCRAPER_JITTER=0.1)
+    def test_jitter_bounds(self):
+        hour = timedelta(hours=1)
+        with mock.patch("scraper.scheduler.random.uniform", return_value=-1):
+            self.assertEqual(Scheduler.jitter(hour), timedelta(minutes=54))
+        with mock.patch("scraper.scheduler.random.uniform", return_value=1):
+            self.assertEqual(Scheduler.jitter(hour), timedelta(minutes=66))
+        for _ in range(100):
+            delay = Scheduler.jitter(hour)
+            self.assertTrue(timedelta(minutes=54) <= delay <= timedelta(minutes=66))
+
+    def test_failures_back_off_and_success_resets(self):
+        link = self.links["Zimbi"]
+        scheduler = Scheduler()
+        self.failing.add(link.id)
+        for failures, minutes in [(1, 5), (2, 10), (3, 20)]:
+            with self.assertLogs("scraper.scheduler", "ERROR"):
+                next_due = scheduler.scrape(link.id)
+            self.assertEqual(next_due, self.minutes(minutes))
+            state = LinkState.objects.get(link=link)
+            self.assertEqual((state.failures, state.next_due), (failures, next_due))
+            self.assertIn("503", state.last_error)
+
+        self.failing.clear()
+        # Back on the supplier's own interval
+        self.assertEqual(scheduler.scrape(link.id), self.minutes(30))
+        state = LinkState.objects.get(link=link)
+        self.assertEqual((state.failures, state.last_error), (0, ""))
+        self.assertEqual(ScrapeRun.objects.filter(finished__isnull=False).count(), 4)
+
+    def test_resume_after_restart(self):
+        zimbi, safari = self.links["Zimbi"], self.links["Safari Outdoor"]
+        LinkState.objects.create(link=zimbi, next_due=self.minutes(10))
+        scheduler = Scheduler()
+        scheduler.load()
+
+        due = {link_id: due for due, link_id in scheduler.queue}
+        self.assertEqual(due[zimbi.id], self.minutes(10))
+        # Never scraped links are spread over their interval
+        self.assertTrue(self.clock.time <= due[safari.id] <= self.minutes(60))
+
+        self.links["Shooting Stuff"].delete()
+        scheduler.load()
+        self.assertEqual(scheduler.link_ids, {zimbi.id, safari.id})
+
+    def test_dispatch_and_collect(self):
+        zimbi, safari, shooting = self.links.values()
+        LinkState.objects.create(link=zimbi, next_due=self.minutes(-2))
+        LinkState.objects.create(link=shooting, next_due=self.minutes(-1))
+        LinkState.objects.create(link=safari, next_due=self.minutes(10))
+        scheduler = Scheduler(workers=1)
+        scheduler.load()
+
+        # Earliest due first, no more at once than there are workers
+        scheduler.dispatch(ImmediatePool())
+        self.assertEqual(self.scraped, [zimbi.id])
+        scheduler.collect(list(scheduler.running))
+        self.assertEqual(scheduler.running, {})
+        self.assertIn((self.minutes(30), zimbi.id), scheduler.queue)
+
+        # A link whose scheduling broke stays queued, one backoff away
+        broken = RuntimeError("database went away")
+        with mock.patch.object(scheduler, "scrape", side_effect=broken):
+            scheduler.dispatch(ImmediatePool())
+        self.assertEqual(list(scheduler.running.values()), [shooting.id])
+        with self.assertLogs("scraper.scheduler", "ERROR"):
+            scheduler.collect(list(scheduler.running))
+        self.assertIn((self.minutes(5), shooting.id), scheduler.queue)
+
+        # Links deleted meanwhile are dropped once due
+        safari_id = safari.id
+        safari.delete()
+        self.clock.time += timedelta(minutes=15)
+        scheduler.workers = 2
+        scheduler.dispatch(ImmediatePool())
+        self.assertEqual(set(scheduler.running.values()), {shooting.id, safari_id})
+        scheduler.collect(list(scheduler.running))
+        self.assertEqual(self.scraped, [zimbi.id, shooting.id])
+        self.assertEqual(
+            sorted(link_id for _, link_id in scheduler.queue), [zimbi.id, shooting.id]
+        )
+
+
+class SnapshotTests(TestCase):
+    def test_streamed_in_batches(self):
+        supplier = Supplier.objects.create(name="Zimbi")
+        items = [
+            {"name": f"H{i}", "price": i, "url": None if i < 2 else f"https://x/{i}"}
+            for i in range(5)
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            store = SnapshotStore(root)
+            with store.writer(supplier, "propellant", batch_size=2) as writer:
+                self.assertEqual(list(writer.record(items)), items)
+                self.assertEqual(writer.rows, 4)
+            self.assertEqual(writer.snapshot.rows, 5)
+            frame = store.latest(supplier, "propellant")
+            self.assertEqual(list(frame["name"]), [item["name"] for item in items])
+            self.assertEqual(frame["url"].isna().sum(), 2)
+
+            with self.assertRaises(ValueError):
+                with store.writer(supplier, "propellant", batch_size=2) as writer:
+                    list(writer.record(items))
+                    raise ValueError
+            self.assertFalse(writer.path.exists())
+            self.assertEqual(Snapshot.objects.count(), 1)
+
+
+class CatalogueImportTests(TestCase):
+    def test_propellant_upsert_and_rejects(self):
+        hodgdon = Manufacturer.objects.create(name="Hodgdon")
+        vihtavuori = Manufacturer.objects.create(name="Vihtavuori")
+        Propellant.objects.create(name="N140", weight=500, manufacturer=hodgdon)
+
+        result = PropellantImport().run(
+            [
+                {"name": "n140", "weight": "500", "manufacturer": "VihtaVouri"},
+                {"name": "H4350", "weight": "", "manufacturer": "hodg"},
+                {"name": "H4350", "weight": "454", "manufacturer": "Hodgdon"},
+                {"name": "Varget", "weight": "1lb", "manufacturer": "Hodgdon"},
+                {"name": "Unknown", "weight": "", "manufacturer": "Nobody"},
+            ]
+        )
+
+        self.assertEqual((result.created, result.updated, result.unchanged), (1, 1, 0))
+        self.assertEqual(
+            [(reject.line, reject.reason) for reject in result.rejects],
+            [
+                (3, "repeats line 2"),
+                (4, "invalid weight '1lb'"),
+                (5, "unknown manufacturer 'Nobody'"),
+            ],
+        )
+        self.assertEqual(
+            Propellant.objects.get(name="n140").manufacturer_id, vihtavuori.id
+        )
+        self.assertEqual(Propellant.objects.get(name="H4350").weight, 454)
+
+
+class UnmatchedItemTests(TestCase):
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name="Zimbi")
+        manufacturer = Manufacturer.objects.create(name="Hodgdon")
+        self.h4350 = Propellant.objects.create(name="H4350", manufacturer=manufacturer)
+
+    def test_mapping_reaches_another_process(self):
+        self.scrape()
+        # The scheduler's matcher, built before the mapping in the web process
+        generation = catalogue_version()
+        self.assertIsNone(get_matcher(Propellant).find("Hodgdon Retumbo 1lb"))
+
+        UnmatchedItem.objects.filter(name="hodgdon retumbo 1lb").map_to(self.h4350)
+        self.assertNotEqual(catalogue_version(), generation)
+        self.assertEqual(
+            get_matcher(Propellant).find("Hodgdon Retumbo 1lb"), self.h4350
+        )
+        self.assertEqual(self.scrape().unmatched, 0)
+
+    def scrape(self):
+        items = [
+            {"name": "Hodgdon Retumbo 1lb", "price": 40, "url": "https://example.com"},
+            {"name": "HODGDON  RETUMBO 1LB", "price": 41, "url": "https://example.com"},
+            {"name": "Hodgdon H4350 1lb", "price": "N/A", "url": "https://example.com"},
+        ]
+        result = ingest_prices(
+            Propellant, self.supplier, items, get_matcher(Propellant).find
+        )
+        record_misses(
+            Propellant, self.supplier, result.unmatched_items + result.failed_items
+        )
+        return result
+
+    def test_ledger_and_alias(self):
+        self.scrape()
+        result = self.scrape()
+        self.assertEqual((result.unmatched, result.failed), (2, 1))
+        self.assertEqual(
+            list(
+                UnmatchedItem.objects.order_by("name").values_list(
+                    "name", "occurrences", "error"
+                )
+            ),
+            [
+                ("hodgdon h4350 1lb", 2, "invalid price 'N/A'"),
+                ("hodgdon retumbo 1lb", 4, ""),
+            ],
+        )
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "admin")
+        )
+        unmatched = UnmatchedItem.objects.get(name="hodgdon retumbo 1lb")
+        form = {"action": "map_to_product", ACTION_CHECKBOX_NAME: [unmatched.pk]}
+        url = "/admin/scraper/unmatcheditem/"
+        self.assertContains(self.client.post(url, form), "H4350")
+        self.client.post(url, {**form, "apply": "Map", "product": self.h4350.pk})
+
+        unmatched.refresh_from_db()
+        self.assertEqual(unmatched.product, self.h4350)
+        self.assertEqual(
+            get_matcher(Propellant).find("Hodgdon Retumbo 1lb"), self.h4350
+        )
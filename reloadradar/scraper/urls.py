@@ -0,0 +1,9 @@
+# Django Libraries
+from django.urls import path
+
+# App Modules
+from .views import metrics
+
+urlpatterns = [
+    path("metrics", metrics, name="Metrics"),
+]
@@ -1,2 +1,103 @@
+# Standard Libraries
+from ipaddress import ip_address, ip_network
+
 # Django Libraries
-# from django.shortcuts import render
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# App Modules
+from .instrumentation import STAGES
+from .models import ScrapeTask, ScrapeTotal
+
+COUNTERS = {
+    "bytes": "Bytes downloaded from supplier pages.",
+    "pages": "Listing pages fetched.",
+    "items": "Items parsed from listings.",
+    "misses": "Parsed items that matched no product.",
+    "inserted": "Prices recorded.",
+    "queries": "Database queries run while scraping.",
+}
+
+
+def label_value(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def labels(**values) -> str:
+    return ",".join(f'{key}="{label_value(value)}"' for key, value in values.items())
+
+
+def may_read_metrics(request) -> bool:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return True
+    address = ip_address(request.META.get("REMOTE_ADDR", "0.0.0.0"))
+    return any(
+        address in ip_network(allowed) for allowed in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics(request):
+    """Scrape totals in the Prometheus text exposition format.
+
+    Only staff and the addresses in ``METRICS_ALLOWED_IPS`` may read them.
+    """
+    if not may_read_metrics(request):
+        return HttpResponseForbidden()
+
+    per_status = list(
+        ScrapeTotal.objects.values(
+            "supplier__name", "status", "tasks", "last_finished", *ScrapeTotal.SUMMED
+        ).order_by("supplier__name", "status")
+    )
+
+    lines = [
+        "# HELP reloadradar_scrape_tasks_total Links scraped, by outcome.",
+        "# TYPE reloadradar_scrape_tasks_total counter",
+    ]
+    for row in per_status:
+        tags = labels(supplier=row["supplier__name"], status=row["status"])
+        lines.append(f"reloadradar_scrape_tasks_total{{{tags}}} {row['tasks']}")
+
+    lines += [
+        "# HELP reloadradar_scrape_stage_seconds_total Time spent per scrape stage.",
+        "# TYPE reloadradar_scrape_stage_seconds_total counter",
+    ]
+    for row in per_status:
+        for stage in STAGES:
+            tags = labels(
+                supplier=row["supplier__name"], status=row["status"], stage=stage
+            )
+            lines.append(
+                f"reloadradar_scrape_stage_seconds_total{{{tags}}} "
+                f"{row[f'{stage}_seconds']}"
+            )
+
+    for counter, description in COUNTERS.items():
+        name = f"reloadradar_scrape_{counter}_total"
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        for row in per_status:
+            tags = labels(supplier=row["supplier__name"], status=row["status"])
+            lines.append(f"{name}{{{tags}}} {row[counter]}")
+
+    last_success = {}
+    for row in per_status:
+        if row["status"] != ScrapeTask.FAILED and row["last_finished"]:
+            name = row["supplier__name"]
+            last_success[name] = max(
+                row["last_finished"], last_success.get(name, row["last_finished"])
+            )
+    lines += [
+        "# HELP reloadradar_scrape_last_success_timestamp_seconds "
+        "When a link of the supplier was last scraped successfully.",
+        "# TYPE reloadradar_scrape_last_success_timestamp_seconds gauge",
+    ]
+    for name, last in sorted(last_success.items()):
+        lines.append(
+            "reloadradar_scrape_last_success_timestamp_seconds"
+            f"{{{labels(supplier=name)}}} {last.timestamp()}"
+        )
+
+    return HttpResponse(
+        "\n".join(lines) + "\n", content_type="text/plain; version=0.0.4"
+    )